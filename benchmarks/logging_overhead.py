@@ -0,0 +1,111 @@
+"""Per-call cost of `logger.log` on the calling thread.
+
+Usage: python benchmarks/logging_overhead.py [--calls 20000] [--threads 1]
+
+Compares the queued session logger against a synchronous FileHandler
+writing the same format to the same kind of file, and reports the caller's
+cost per call (mean, p50/p99 over batches of 100 calls), the time the
+background listener needs to drain afterwards, and whether every message
+reached the file.
+"""
+
+import argparse
+import json
+import logging
+import sys
+import tempfile
+import threading
+import time
+from pathlib import Path
+from typing import Callable, Dict, List, Optional
+
+SRC = Path(__file__).resolve().parent.parent / "src"
+sys.path.insert(0, str(SRC))
+
+import logger  # noqa: E402
+from stats import summarize  # noqa: E402
+
+BATCH = 100
+
+
+def _run_calls(emit: Callable[[str], None], calls: int, threads: int) -> List[float]:
+    """Return per-call microseconds, averaged over batches of BATCH calls."""
+    samples: List[float] = []
+    lock = threading.Lock()
+
+    def worker(worker_id: int) -> None:
+        local: List[float] = []
+        for start in range(0, calls // threads, BATCH):
+            started = time.perf_counter()
+            for index in range(start, start + BATCH):
+                emit(f"worker {worker_id} open: C:/Users/user/Desktop/item-{index}.lnk")
+            local.append((time.perf_counter() - started) * 1e6 / BATCH)
+        with lock:
+            samples.extend(local)
+
+    workers = [threading.Thread(target=worker, args=(n,)) for n in range(threads)]
+    for thread in workers:
+        thread.start()
+    for thread in workers:
+        thread.join()
+    return samples
+
+
+def _report(samples: List[float], path: Path, expected: int, drain_ms: float) -> Dict[str, object]:
+    written = sum(part.read_text(encoding="utf-8").count(" open: ") for part in path.parent.glob(path.name + "*"))
+    return {
+        "mean_us": sum(samples) / len(samples),
+        **{f"{key}_us": value for key, value in summarize(samples, (50, 99)).items()},
+        "drain_ms": drain_ms,
+        "written": written,
+        "lost": expected - written,
+    }
+
+
+def bench_sync(directory: Path, calls: int, threads: int) -> Dict[str, object]:
+    path = directory / "sync.log"
+    sync_logger = logging.getLogger("benchmark.sync")
+    sync_logger.propagate = False
+    sync_logger.setLevel(logging.INFO)
+    handler = logging.FileHandler(path, encoding="utf-8")
+    handler.setFormatter(logging.Formatter("%(asctime)s [%(levelname)s] %(message)s"))
+    sync_logger.addHandler(handler)
+    try:
+        samples = _run_calls(sync_logger.info, calls, threads)
+    finally:
+        sync_logger.removeHandler(handler)
+        handler.close()
+    return _report(samples, path, calls // threads * threads, 0.0)
+
+
+def bench_queued(directory: Path, calls: int, threads: int) -> Dict[str, object]:
+    path = directory / "session-queued.log"
+    logger.LOG_MAX_BYTES = 0  # rotation would measure the disk, not the call
+    logger.init_logger(path)
+    samples = _run_calls(logger.log, calls, threads)
+    started = time.perf_counter()
+    logger.shutdown_logger()
+    drain_ms = (time.perf_counter() - started) * 1000
+    return _report(samples, path, calls // threads * threads, drain_ms)
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="Logging per-call overhead")
+    parser.add_argument("--calls", type=int, default=20000)
+    parser.add_argument("--threads", type=int, default=1)
+    args = parser.parse_args(argv)
+
+    with tempfile.TemporaryDirectory() as root:
+        directory = Path(root)
+        report = {
+            "calls": args.calls,
+            "threads": args.threads,
+            "sync_file_handler": bench_sync(directory, args.calls, args.threads),
+            "queued": bench_queued(directory, args.calls, args.threads),
+        }
+    print(json.dumps(report, indent=2))
+    return 1 if report["queued"]["lost"] else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,103 @@
+"""Local stand-in for an OpenAI-compatible chat-completions endpoint.
+
+Usage: python benchmarks/mock_llm.py [--port 8765] [--latency-ms 300]
+       AI_API_BASE=http://127.0.0.1:8765/v1 AI_API_KEY=mock python src/cli.py
+
+Every POST to .../chat/completions sleeps for the configured latency and
+answers with a fixed plan (a `get` step by default), so end-to-end timings
+measure our side of the round-trip without network noise.
+"""
+
+import argparse
+import json
+import sys
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import List, Optional
+
+DEFAULT_PLAN = [{"action": "get", "args": {"filter": "item-1"}}]
+
+
+class MockChatServer:
+    """A chat-completions server on 127.0.0.1 running on a background thread."""
+
+    def __init__(self, latency_ms: float = 0.0, plan: Optional[list] = None, port: int = 0):
+        self.latency_ms = latency_ms
+        self.plan = plan if plan is not None else DEFAULT_PLAN
+        self.requests = 0
+        server = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"  # keep-alive, like the real API
+            disable_nagle_algorithm = True  # headers and body go out in separate writes
+
+            def do_POST(self):
+                length = int(self.headers.get("Content-Length", "0"))
+                self.rfile.read(length)
+                if not self.path.endswith("/chat/completions"):
+                    self.send_error(404)
+                    return
+                server.requests += 1
+                if server.latency_ms:
+                    time.sleep(server.latency_ms / 1000)
+                content = json.dumps(server.plan, ensure_ascii=False)
+                body = json.dumps({
+                    "id": "mock",
+                    "object": "chat.completion",
+                    "choices": [{"index": 0, "message": {"role": "assistant", "content": content}}],
+                }).encode("utf-8")
+                self.send_response(200)
+                self.send_header("Content-Type", "application/json")
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, format, *args):
+                pass
+
+        self._httpd = ThreadingHTTPServer(("127.0.0.1", port), Handler)
+        self._httpd.daemon_threads = True
+        self._thread = threading.Thread(target=self._httpd.serve_forever, name="mock-llm", daemon=True)
+
+    @property
+    def base_url(self) -> str:
+        host, port = self._httpd.server_address[:2]
+        return f"http://{host}:{port}/v1"
+
+    def start(self) -> "MockChatServer":
+        self._thread.start()
+        return self
+
+    def stop(self) -> None:
+        self._httpd.shutdown()
+        self._httpd.server_close()
+        self._thread.join(timeout=2)
+
+    def __enter__(self) -> "MockChatServer":
+        return self.start()
+
+    def __exit__(self, *exc) -> None:
+        self.stop()
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="Mock chat-completions server")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--latency-ms", type=float, default=0.0)
+    parser.add_argument("--plan", help="JSON array returned as the model's answer")
+    args = parser.parse_args(argv)
+
+    plan = json.loads(args.plan) if args.plan else None
+    with MockChatServer(args.latency_ms, plan, args.port) as server:
+        print(f"Listening on {server.base_url}", flush=True)
+        try:
+            while True:
+                time.sleep(3600)
+        except KeyboardInterrupt:
+            pass
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,171 @@
+"""Cold-start budget for the headless text path.
+
+Usage: python benchmarks/startup.py [--runs 5] [--import-budget-ms 150] [--wall-budget-ms 600]
+                                    [--local-wall-budget-ms 1000]
+
+Runs `python -X importtime` on the modules a text command needs and takes
+the median of the summed cumulative import times over --runs runs, then
+times full `main.py --headless` round-trips. One untimed run goes first so
+bytecode and the OS file cache are warm; a single cold outlier no longer
+decides the verdict.
+
+Scenarios:
+  rules        AI_API_KEY="" (rule-based planner), command "help"
+  default_key  the shipped configuration (AI_API_KEY left to its default),
+               LLM endpoint pointed at a local mock server, command "help"
+  local_model  the same configuration with a free-form request that the
+               rule-based parser does not match, so the intent classifier
+               (numpy) plans it
+
+For the first two, every module imported while the command runs is
+checked: no GUI/speech module (PyQt6, numpy, sounddevice, whisper, torch,
+edge_tts) and no requests. local_model is expected to load numpy and only
+has a wall-time budget. Prints a JSON report and exits with 1 when a
+budget is exceeded.
+"""
+
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+from typing import Dict, List, Optional
+
+ROOT = Path(__file__).resolve().parent
+SRC = ROOT.parent / "src"
+sys.path.insert(0, str(ROOT))
+
+from mock_llm import MockChatServer  # noqa: E402
+
+TEXT_PATH_MODULES = ("main", "cli", "orchestrator", "llm_parser")
+FORBIDDEN = ("PyQt6", "numpy", "sounddevice", "whisper", "torch", "edge_tts", "requests")
+LOCAL_MODEL_COMMAND = "покажи пожалуйста все мои файлы"
+
+
+def _env(desktop_root: str, api_key: Optional[str], api_base: Optional[str] = None) -> Dict[str, str]:
+    env = dict(os.environ)
+    env.update({
+        "USERPROFILE": desktop_root,
+        "PUBLIC": os.path.join(desktop_root, "Public"),
+    })
+    env.pop("AI_API_KEY", None)
+    if api_key is not None:
+        env["AI_API_KEY"] = api_key
+    if api_base is not None:
+        env["AI_API_BASE"] = api_base
+    return env
+
+
+def _parse_importtime(stderr: str) -> Dict[str, int]:
+    """Top-level module -> cumulative microseconds, plus every imported module name."""
+    top_level: Dict[str, int] = {}
+    for line in stderr.splitlines():
+        if not line.startswith("import time:") or "[us]" in line:
+            continue
+        fields = line[len("import time:"):].split("|")
+        raw_name = fields[2].rstrip()
+        top_level.setdefault(raw_name.strip(), 0)
+        if raw_name.startswith(" ") and not raw_name.startswith("  "):
+            top_level[raw_name.strip()] = int(fields[1].strip())
+    return top_level
+
+
+def measure_imports(env: Dict[str, str], runs: int) -> Dict[str, object]:
+    code = "; ".join(f"import {name}" for name in TEXT_PATH_MODULES)
+    totals: List[float] = []
+    top_level: Dict[str, int] = {}
+    for _ in range(runs + 1):  # the first run only warms bytecode and file caches
+        proc = subprocess.run(
+            [sys.executable, "-X", "importtime", "-c", code],
+            cwd=SRC, env=env, capture_output=True, text=True, check=True,
+        )
+        top_level = _parse_importtime(proc.stderr)
+        # Interpreter start-up (site, encodings) is not ours to optimize.
+        totals.append(sum(top_level.get(name, 0) for name in TEXT_PATH_MODULES) / 1000)
+    totals = totals[1:]
+    slowest = sorted(top_level.items(), key=lambda item: item[1], reverse=True)[:10]
+    return {
+        "median_ms": statistics.median(totals),
+        "min_ms": min(totals),
+        "max_ms": max(totals),
+        "modules": len(top_level),
+        "slowest_ms": {name: us / 1000 for name, us in slowest},
+    }
+
+
+def _run_command(env: Dict[str, str], command: str, importtime: bool = False) -> subprocess.CompletedProcess:
+    flags = ["-X", "importtime"] if importtime else []
+    return subprocess.run(
+        [sys.executable, *flags, str(SRC / "main.py"), "--headless"],
+        cwd=env["USERPROFILE"], env=env, input=command + "\n",
+        capture_output=True, text=True, check=True,
+    )
+
+
+def heavy_modules(env: Dict[str, str], command: str) -> List[str]:
+    """Forbidden top-level packages imported while running `command`."""
+    modules = _parse_importtime(_run_command(env, command, importtime=True).stderr)
+    return sorted({name.split(".")[0] for name in modules} & set(FORBIDDEN))
+
+
+def measure_wall(env: Dict[str, str], command: str, runs: int) -> Dict[str, Optional[float]]:
+    _run_command(env, command)  # warm-up
+    samples: List[float] = []
+    for _ in range(runs):
+        started = time.perf_counter()
+        _run_command(env, command)
+        samples.append((time.perf_counter() - started) * 1000)
+    return {"median_ms": statistics.median(samples), "min_ms": min(samples), "max_ms": max(samples)}
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="Headless cold-start budget check")
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument("--import-budget-ms", type=float, default=150.0)
+    parser.add_argument("--wall-budget-ms", type=float, default=600.0)
+    parser.add_argument("--local-wall-budget-ms", type=float, default=1000.0,
+                        help="budget for a command planned by the local intent classifier")
+    args = parser.parse_args(argv)
+
+    failures = []
+    report: Dict[str, object] = {}
+    with tempfile.TemporaryDirectory() as root, MockChatServer() as server:
+        os.makedirs(os.path.join(root, "Desktop"))
+        scenarios = {
+            "rules": (_env(root, ""), "help", args.wall_budget_ms, True),
+            "default_key": (_env(root, None, server.base_url), "help", args.wall_budget_ms, True),
+            "local_model": (_env(root, None, server.base_url), LOCAL_MODEL_COMMAND, args.local_wall_budget_ms, False),
+        }
+        imports = measure_imports(scenarios["rules"][0], args.runs)
+        report["imports"] = imports
+        if imports["median_ms"] > args.import_budget_ms:
+            failures.append(f"imports took {imports['median_ms']:.1f} ms > {args.import_budget_ms} ms")
+        for name, (env, command, budget, light) in scenarios.items():
+            wall = measure_wall(env, command, args.runs)
+            entry: Dict[str, object] = {"command": command, "cold_start": wall, "budget_ms": budget}
+            if light:
+                heavy = heavy_modules(env, command)
+                entry["forbidden_imported"] = heavy
+                if heavy:
+                    failures.append(f"{name}: heavy modules imported: {', '.join(heavy)}")
+            if wall["median_ms"] > budget:
+                failures.append(f"{name}: cold start took {wall['median_ms']:.1f} ms > {budget} ms")
+            report[name] = entry
+        report["llm_requests"] = server.requests
+
+    report["budget"] = {
+        "import_ms": args.import_budget_ms,
+        "wall_ms": args.wall_budget_ms,
+        "local_wall_ms": args.local_wall_budget_ms,
+    }
+    report["failures"] = failures
+    print(json.dumps(report, ensure_ascii=False, indent=2))
+    return 1 if failures else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
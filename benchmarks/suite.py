@@ -0,0 +1,220 @@
+"""Hot-path benchmarks over synthetic desktops.
+
+Usage:
+    python benchmarks/suite.py run [--sizes 100,10000,100000] [--llm-latency-ms 50] [--output results.json]
+    python benchmarks/suite.py run --save-baseline
+    python benchmarks/suite.py compare [--baseline benchmarks/baseline.json] results.json [--threshold 0.25]
+
+For each size a temporary profile is filled with that many desktop entries
+(files, folders and .lnk stubs, split between the user and Public desktops)
+and pointed to by USERPROFILE/PUBLIC. Timed in-process: get_desktop_items
+(cold scan and cached), resolve_item, list_items, parse_command,
+_build_prompt, _extract_json, and parse_and_run end to end through the LLM
+path against a local mock chat-completions server (mock_llm.py).
+
+`compare` flags every benchmark whose p50 grew by more than the threshold
+(relative, and by at least --min-delta-ms) and exits with 1 if any did.
+"""
+
+import argparse
+import json
+import os
+import platform
+import sys
+import tempfile
+import time
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional
+
+ROOT = Path(__file__).resolve().parent
+SRC = ROOT.parent / "src"
+sys.path.insert(0, str(SRC))
+sys.path.insert(0, str(ROOT))
+
+from mock_llm import MockChatServer  # noqa: E402
+from stats import summarize  # noqa: E402
+
+DEFAULT_SIZES = (100, 10_000, 100_000)
+DEFAULT_BASELINE = ROOT / "baseline.json"
+FILE_EXTENSIONS = ("txt", "docx", "md", "json", "pdf", "xlsx")
+
+LLM_RESPONSE = '[{"action": "open", "args": {"target": "item-42"}}, {"action": "get", "args": {"filter": "report"}}]'
+CHATTY_LLM_RESPONSE = "Sure! Here is the plan:\n```json\n" + LLM_RESPONSE + "\n```\nLet me know if you need more."
+
+
+def make_desktop(root: Path, size: int) -> None:
+    """Create `size` entries: 60% files, 20% folders, 20% .lnk stubs; 10% on Public."""
+    user_desktop = root / "Desktop"
+    public_desktop = root / "Public" / "Desktop"
+    user_desktop.mkdir(parents=True)
+    public_desktop.mkdir(parents=True)
+    for index in range(size):
+        desktop = public_desktop if index % 10 == 9 else user_desktop
+        kind = index % 5
+        if kind == 3:
+            (desktop / f"item-{index}").mkdir()
+        elif kind == 4:
+            (desktop / f"item-{index}.lnk").write_bytes(b"L\x00\x00\x00")
+        else:
+            (desktop / f"item-{index}.{FILE_EXTENSIONS[index % len(FILE_EXTENSIONS)]}").touch()
+
+
+def use_desktop(root: Path) -> None:
+    import dekstop_ops
+
+    os.environ["USERPROFILE"] = str(root)
+    os.environ["PUBLIC"] = str(root / "Public")
+    dekstop_ops._items_cache = None
+
+
+def measure(fn: Callable[[], Any], min_runs: int = 5, max_runs: int = 1000, budget_sec: float = 1.0,
+            setup: Optional[Callable[[], None]] = None) -> Dict[str, Any]:
+    """Run `fn` until `max_runs` or the time budget (after at least `min_runs`)."""
+    samples: List[float] = []
+    deadline = time.perf_counter() + budget_sec
+    while len(samples) < max_runs and (len(samples) < min_runs or time.perf_counter() < deadline):
+        if setup is not None:
+            setup()
+        started = time.perf_counter()
+        fn()
+        samples.append((time.perf_counter() - started) * 1000)
+    return {"runs": len(samples), "mean_ms": sum(samples) / len(samples), **summarize(samples, (50, 95, 99))}
+
+
+def bench_size(size: int, server: MockChatServer, budget_sec: float) -> Dict[str, Dict[str, Any]]:
+    import dekstop_ops
+    import llm_parser
+    from core.desktop import parse_command
+    from main import parse_and_run
+
+    results: Dict[str, Dict[str, Any]] = {}
+    with tempfile.TemporaryDirectory(prefix=f"bench-{size}-") as tmp:
+        root = Path(tmp)
+        started = time.perf_counter()
+        make_desktop(root, size)
+        print(f"[{size}] desktop created in {time.perf_counter() - started:.1f} s", file=sys.stderr)
+        use_desktop(root)
+        target = f"item-{size // 2 - size // 2 % 10 + 4}"  # a user-desktop .lnk, matched by its stem
+
+        def reset_cache():
+            dekstop_ops._items_cache = None
+
+        results["get_desktop_items.cold"] = measure(
+            dekstop_ops.get_desktop_items, min_runs=3, max_runs=50, budget_sec=budget_sec, setup=reset_cache
+        )
+        dekstop_ops.get_desktop_items()
+        results["get_desktop_items.cached"] = measure(dekstop_ops.get_desktop_items, budget_sec=budget_sec)
+        results["resolve_item"] = measure(lambda: dekstop_ops.resolve_item(target), budget_sec=budget_sec)
+        results["list_items.all"] = measure(dekstop_ops.list_items, max_runs=200, budget_sec=budget_sec)
+        results["list_items.filter"] = measure(lambda: dekstop_ops.list_items("item-99"), max_runs=200, budget_sec=budget_sec)
+        results["parse_command"] = measure(lambda: parse_command(f"открой {target}"), budget_sec=budget_sec)
+        results["_build_prompt"] = measure(
+            lambda: llm_parser._build_prompt(f"открой {target}"), max_runs=200, budget_sec=budget_sec
+        )
+
+        saved = (llm_parser.API_KEY, llm_parser.API_BASE, llm_parser.INTENT_ENABLED, llm_parser.PLAN_CACHE_SIZE)
+        llm_parser.API_KEY, llm_parser.API_BASE = "mock", server.base_url
+        llm_parser.INTENT_ENABLED = False  # always take the LLM path
+        llm_parser.PLAN_CACHE_SIZE = 0
+        try:
+            results["parse_and_run.e2e"] = measure(
+                lambda: parse_and_run("что на рабочем столе item-1"),
+                min_runs=3, max_runs=100, budget_sec=budget_sec * 2,
+            )
+        finally:
+            llm_parser.API_KEY, llm_parser.API_BASE, llm_parser.INTENT_ENABLED, llm_parser.PLAN_CACHE_SIZE = saved
+        use_desktop(Path(tempfile.gettempdir()) / "bench-none")
+    return results
+
+
+def run(args: argparse.Namespace) -> int:
+    import llm_parser
+    from logger import init_logger
+
+    sizes = [int(size) for size in args.sizes.split(",")]
+    with tempfile.TemporaryDirectory() as logs:
+        init_logger(Path(logs) / "bench.log")
+        report: Dict[str, Any] = {
+            "meta": {
+                "python": platform.python_version(),
+                "platform": platform.platform(),
+                "time": time.strftime("%Y-%m-%dT%H:%M:%S"),
+                "llm_latency_ms": args.llm_latency_ms,
+            },
+            "results": {},
+        }
+        report["results"]["_extract_json"] = {
+            "plain": measure(lambda: llm_parser._extract_json(LLM_RESPONSE), budget_sec=args.budget),
+            "chatty": measure(lambda: llm_parser._extract_json(CHATTY_LLM_RESPONSE), budget_sec=args.budget),
+        }
+        with MockChatServer(latency_ms=args.llm_latency_ms) as server:
+            for size in sizes:
+                report["results"][str(size)] = bench_size(size, server, args.budget)
+
+    text = json.dumps(report, ensure_ascii=False, indent=2)
+    output = DEFAULT_BASELINE if args.save_baseline else args.output
+    if output:
+        Path(output).write_text(text + "\n", encoding="utf-8")
+        print(f"Saved {output}", file=sys.stderr)
+    else:
+        print(text)
+    return 0
+
+
+def _flatten(report: Dict[str, Any]) -> Dict[str, Dict[str, Any]]:
+    flat: Dict[str, Dict[str, Any]] = {}
+    for group, benches in report.get("results", {}).items():
+        for name, row in benches.items():
+            flat[f"{group}/{name}"] = row
+    return flat
+
+
+def compare(args: argparse.Namespace) -> int:
+    if not Path(args.baseline).is_file():
+        # Baselines are machine-specific, so none is committed.
+        print(
+            f"Нет базы {args.baseline}: сохраните её на этой машине командой "
+            "`python benchmarks/suite.py run --save-baseline` или укажите --baseline",
+            file=sys.stderr,
+        )
+        return 2
+    baseline = _flatten(json.loads(Path(args.baseline).read_text(encoding="utf-8")))
+    current = _flatten(json.loads(Path(args.current).read_text(encoding="utf-8")))
+    regressions = []
+    print(f"{'benchmark':<42} {'base p50':>10} {'now p50':>10} {'change':>8}")
+    for name in sorted(set(baseline) & set(current)):
+        before, after = baseline[name]["p50"], current[name]["p50"]
+        change = (after - before) / before if before else 0.0
+        flag = ""
+        if change > args.threshold and after - before >= args.min_delta_ms:
+            regressions.append(name)
+            flag = "  REGRESSION"
+        print(f"{name:<42} {before:>10.3f} {after:>10.3f} {change:>+8.1%}{flag}")
+    for name in sorted(set(baseline) ^ set(current)):
+        print(f"{name:<42} {'только в ' + ('базе' if name in baseline else 'новом'):>30}")
+    if regressions:
+        print(f"\nРегрессии ({len(regressions)}): {', '.join(regressions)}")
+        return 1
+    return 0
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="Hot-path benchmark suite")
+    sub = parser.add_subparsers(dest="command", required=True)
+    run_cmd = sub.add_parser("run", help="run the benchmarks")
+    run_cmd.add_argument("--sizes", default=",".join(str(size) for size in DEFAULT_SIZES))
+    run_cmd.add_argument("--llm-latency-ms", type=float, default=50.0, help="mock LLM response delay")
+    run_cmd.add_argument("--budget", type=float, default=1.0, help="seconds per benchmark")
+    run_cmd.add_argument("--output", help="write JSON here instead of stdout")
+    run_cmd.add_argument("--save-baseline", action="store_true", help=f"write to {DEFAULT_BASELINE.name}")
+    compare_cmd = sub.add_parser("compare", help="flag regressions against a baseline")
+    compare_cmd.add_argument("current")
+    compare_cmd.add_argument("--baseline", default=str(DEFAULT_BASELINE))
+    compare_cmd.add_argument("--threshold", type=float, default=0.25, help="allowed relative p50 growth")
+    compare_cmd.add_argument("--min-delta-ms", type=float, default=0.05, help="ignore smaller absolute changes")
+    args = parser.parse_args(argv)
+    return run(args) if args.command == "run" else compare(args)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -1,53 +1,79 @@
-"""Speech-to-text via Whisper (lazy-loaded)."""
+"""Speech-to-text via Whisper (lazy-loaded).
+
+sounddevice and whisper (which pulls in torch) are imported on first use,
+so importing this module stays cheap for tools that never record or decode.
+"""
 
 import os
 import tempfile
 import shutil
-from typing import Optional
+import threading
+import time
+from typing import Callable, List, Optional
 
 import numpy as np
-import sounddevice as sd
 
-try:
-    import whisper  # type: ignore
-except ImportError:
-    whisper = None
+from audio_buffer import RingBuffer
+from pipeline import TranscriptionError
+from tracing import traced
 
 MODEL_NAME = os.environ.get("WHISPER_MODEL", "small")
 SAMPLE_RATE = 16000
+PREROLL_SEC = float(os.environ.get("PTT_PREROLL_SEC", "0.5"))
+MAX_UTTERANCE_SEC = 30.0
 
-_model = None
+FFMPEG_MISSING = "ffmpeg не найден в PATH — установите ffmpeg и перезапустите"
 
+_model = None
 
 def _load_model():
     global _model
-    if whisper is None:
-        raise ImportError("whisper не установлен. pip install openai-whisper")
     if _model is None:
+        try:
+            import whisper  # type: ignore
+        except ImportError:
+            raise ImportError("whisper не установлен. pip install openai-whisper") from None
         _model = whisper.load_model(MODEL_NAME)
     return _model
 
 
+@traced("asr.record")
 def _record_audio(duration_sec: float) -> np.ndarray:
+    import sounddevice as sd
+
     frames = int(duration_sec * SAMPLE_RATE)
     audio = sd.rec(frames, samplerate=SAMPLE_RATE, channels=1, dtype="float32")
     sd.wait()
     return audio.reshape(-1)
 
 
+@traced("asr.transcribe_once")
 def transcribe_once(timeout_sec: Optional[int] = 10) -> str:
-    """Record up to timeout_sec seconds and transcribe with Whisper."""
+    """Record up to timeout_sec seconds and transcribe with Whisper.
+
+    Raises TranscriptionError if recording or transcription cannot run.
+    """
     if shutil.which("ffmpeg") is None:
-        return "ffmpeg не найден в PATH — установите ffmpeg и перезапустите"
+        raise TranscriptionError(FFMPEG_MISSING)
     try:
         audio = _record_audio(timeout_sec or 10)
     except Exception as exc:
-        return f"Ошибка записи аудио: {exc}"
+        raise TranscriptionError(f"Ошибка записи аудио: {exc}") from exc
+    return transcribe_audio(audio)
+
+
+@traced("asr.transcribe")
+def transcribe_audio(audio: np.ndarray) -> str:
+    """Transcribe a mono float32 SAMPLE_RATE buffer with Whisper.
 
+    Raises TranscriptionError if ffmpeg or the model is missing.
+    """
+    if shutil.which("ffmpeg") is None:
+        raise TranscriptionError(FFMPEG_MISSING)
     try:
         model = _load_model()
     except Exception as exc:
-        return f"Ошибка загрузки модели Whisper: {exc}"
+        raise TranscriptionError(f"Ошибка загрузки модели Whisper: {exc}") from exc
 
     # Convert float32 [-1,1] to int16 WAV bytes
     int16_audio = np.clip(audio, -1.0, 1.0)
@@ -72,4 +98,199 @@ def transcribe_once(timeout_sec: Optional[int] = 10) -> str:
         try:
             os.remove(tmp_path)
         except OSError:
-            pass
\ No newline at end of file
+            pass
+
+
+class PushToTalk:
+    """Always-open input stream feeding a ring buffer with pre-roll.
+
+    The stream runs continuously so pressing the hotkey costs no device
+    start-up; `release` returns audio from `preroll_sec` before `press`
+    up to now. The returned array is a view into a reusable buffer and is
+    only valid until the next `release`.
+    """
+
+    def __init__(
+        self,
+        preroll_sec: float = PREROLL_SEC,
+        max_duration_sec: float = MAX_UTTERANCE_SEC,
+        block_size: int = 1024,
+    ):
+        capacity = int((preroll_sec + max_duration_sec) * SAMPLE_RATE)
+        self._ring = RingBuffer(capacity)
+        self._out = np.zeros(capacity, dtype=np.float32)
+        self._preroll = int(preroll_sec * SAMPLE_RATE)
+        self._block_size = block_size
+        self._mark: Optional[int] = None
+        self._lock = threading.Lock()
+        self._stream = None
+
+    @property
+    def ring(self) -> RingBuffer:
+        return self._ring
+
+    @property
+    def active(self) -> bool:
+        return self._mark is not None
+
+    @property
+    def capture_start(self) -> Optional[int]:
+        """Absolute ring position where the current capture begins."""
+        mark = self._mark
+        if mark is None:
+            return None
+        return max(mark - self._preroll, self._ring.oldest)
+
+    def start(self) -> None:
+        if self._stream is not None:
+            return
+        import sounddevice as sd
+
+        self._stream = sd.InputStream(
+            samplerate=SAMPLE_RATE,
+            channels=1,
+            dtype="float32",
+            blocksize=self._block_size,
+            callback=self._callback,
+        )
+        self._stream.start()
+
+    def close(self) -> None:
+        if self._stream is None:
+            return
+        self._stream.stop()
+        self._stream.close()
+        self._stream = None
+
+    def _callback(self, indata, frames, time_info, status) -> None:
+        self._ring.write(indata[:, 0])
+
+    def press(self) -> None:
+        """Mark the start of an utterance; repeated key events are ignored."""
+        with self._lock:
+            if self._mark is None:
+                self._mark = self._ring.position
+
+    def release(self) -> np.ndarray:
+        """Return audio from the pre-roll window before `press` until now."""
+        with self._lock:
+            mark, self._mark = self._mark, None
+        if mark is None:
+            return self._out[:0]
+        return self._ring.read(mark - self._preroll, out=self._out)
+
+
+def _decode(model, audio: np.ndarray, prompt: str = "") -> dict:
+    # Whisper accepts 16 kHz float32 arrays directly, no WAV round-trip.
+    return model.transcribe(
+        audio,
+        language="ru",
+        fp16=False,
+        initial_prompt=prompt or None,
+        condition_on_previous_text=False,
+    )
+
+
+class StreamingTranscriber:
+    """Transcribe a push-to-talk capture in overlapping windows while it runs.
+
+    Every `step_sec` the audio after the committed prefix is decoded.
+    Segments ending more than `overlap_sec` before the live edge are
+    committed (their text is final and their audio is never decoded again);
+    the rest is shown as a tentative tail. `finish` decodes only the audio
+    after the committed prefix, prompting Whisper with the committed text.
+    """
+
+    def __init__(
+        self,
+        ptt: PushToTalk,
+        on_partial: Optional[Callable[[str, str], None]] = None,
+        step_sec: float = 1.0,
+        overlap_sec: float = 1.0,
+        min_window_sec: float = 1.5,
+    ):
+        self._ptt = ptt
+        self._on_partial = on_partial
+        self._step = step_sec
+        self._overlap = overlap_sec
+        self._min_frames = int(min_window_sec * SAMPLE_RATE)
+        self._window = np.zeros(ptt.ring.capacity, dtype=np.float32)
+        self._committed: List[str] = []
+        self._committed_pos = 0
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+        self.released_at: Optional[float] = None
+
+    @property
+    def committed_text(self) -> str:
+        return " ".join(self._committed)
+
+    def begin(self) -> None:
+        """Start capturing; ignored until the previous capture is finished.
+
+        The final decode reads the PushToTalk buffer without copying it, so
+        a new capture must not start (and later release over it) meanwhile.
+        """
+        if self._thread is not None:
+            return
+        self._ptt.press()
+        self._committed = []
+        self._committed_pos = self._ptt.capture_start or 0
+        self._stop.clear()
+        self.released_at = None
+        self._thread = threading.Thread(target=self._loop, daemon=True)
+        self._thread.start()
+
+    def finish(self) -> str:
+        """Stop capturing and return the full transcript.
+
+        Raises TranscriptionError if the model cannot be loaded.
+        """
+        self.released_at = time.perf_counter()
+        start = self._ptt.capture_start
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join()
+        try:
+            audio = self._ptt.release()
+            if start is None:
+                return self.committed_text
+
+            try:
+                model = _load_model()
+            except Exception as exc:
+                raise TranscriptionError(f"Ошибка загрузки модели Whisper: {exc}") from exc
+            tail = audio[max(0, self._committed_pos - start):]
+            if tail.shape[0]:
+                text = _decode(model, tail, self.committed_text).get("text", "").strip()
+                if text:
+                    self._committed.append(text)
+            return self.committed_text
+        finally:
+            self._thread = None
+
+    def _loop(self) -> None:
+        try:
+            model = _load_model()
+        except Exception:
+            return  # finish() reports the error
+        while not self._stop.wait(self._step):
+            end = self._ptt.ring.position
+            if end - self._committed_pos < self._min_frames:
+                continue
+            window = self._ptt.ring.read(self._committed_pos, end, out=self._window)
+            result = _decode(model, window, self.committed_text)
+            horizon = window.shape[0] / SAMPLE_RATE - self._overlap
+            tentative: List[str] = []
+            stable_end = 0.0
+            for segment in result.get("segments", []):
+                text = segment.get("text", "").strip()
+                if segment.get("end", 0.0) <= horizon and not tentative:
+                    if text:
+                        self._committed.append(text)
+                    stable_end = segment["end"]
+                elif text:
+                    tentative.append(text)
+            self._committed_pos += int(stable_end * SAMPLE_RATE)
+            if self._on_partial is not None:
+                self._on_partial(self.committed_text, " ".join(tentative))
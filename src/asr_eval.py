@@ -0,0 +1,165 @@
+"""Offline batch transcription and ASR accuracy/latency evaluation.
+
+Usage: python src/asr_eval.py <dir> [--workers N] [--model NAME] [--output report.json]
+
+The directory holds `<name>.wav` files, each with a reference transcript in
+`<name>.txt` next to it. Files are transcribed by a process pool (one
+Whisper model per worker) and a JSON report with WER, real-time factor and
+p50/p95 latency is printed or written to --output.
+"""
+
+import argparse
+import json
+import os
+import re
+import sys
+import time
+import wave
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+from typing import Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+import asr
+from asr import SAMPLE_RATE
+from stats import summarize
+
+_WORD_RE = re.compile(r"\w+")
+
+
+def normalize_words(text: str) -> List[str]:
+    """Lowercase, drop punctuation and fold ё into е before scoring."""
+    return _WORD_RE.findall(text.lower().replace("ё", "е"))
+
+
+def word_errors(reference: Sequence[str], hypothesis: Sequence[str]) -> int:
+    """Levenshtein distance between two word sequences."""
+    previous = list(range(len(hypothesis) + 1))
+    for i, ref_word in enumerate(reference, 1):
+        current = [i]
+        for j, hyp_word in enumerate(hypothesis, 1):
+            current.append(min(
+                previous[j] + 1,
+                current[j - 1] + 1,
+                previous[j - 1] + (ref_word != hyp_word),
+            ))
+        previous = current
+    return previous[-1]
+
+
+def load_wav(path: Path) -> np.ndarray:
+    """Read a PCM WAV as mono float32 at SAMPLE_RATE."""
+    with wave.open(str(path), "rb") as wf:
+        channels = wf.getnchannels()
+        width = wf.getsampwidth()
+        rate = wf.getframerate()
+        raw = wf.readframes(wf.getnframes())
+
+    if width == 2:
+        audio = np.frombuffer(raw, dtype=np.int16).astype(np.float32) / 32768.0
+    elif width == 4:
+        audio = np.frombuffer(raw, dtype=np.int32).astype(np.float32) / 2147483648.0
+    elif width == 1:
+        audio = (np.frombuffer(raw, dtype=np.uint8).astype(np.float32) - 128.0) / 128.0
+    else:
+        raise ValueError(f"{path.name}: unsupported sample width {width}")
+
+    if channels > 1:
+        audio = audio.reshape(-1, channels).mean(axis=1)
+    if rate != SAMPLE_RATE:
+        target = int(round(audio.shape[0] * SAMPLE_RATE / rate))
+        audio = np.interp(
+            np.linspace(0, audio.shape[0], target, endpoint=False),
+            np.arange(audio.shape[0]),
+            audio,
+        ).astype(np.float32)
+    return audio
+
+
+def collect_dataset(directory: Path) -> List[Tuple[Path, str]]:
+    """Return (wav, reference) pairs for every WAV with a matching .txt."""
+    pairs: List[Tuple[Path, str]] = []
+    for wav_path in sorted(directory.glob("*.wav")):
+        ref_path = wav_path.with_suffix(".txt")
+        if ref_path.exists():
+            pairs.append((wav_path, ref_path.read_text(encoding="utf-8").strip()))
+    return pairs
+
+
+def _init_worker(model_name: str) -> None:
+    asr.MODEL_NAME = model_name
+    asr._load_model()
+
+
+def _transcribe_file(wav_path: str) -> Dict[str, float]:
+    audio = load_wav(Path(wav_path))
+    model = asr._load_model()
+    started = time.perf_counter()
+    text = asr._decode(model, audio).get("text", "").strip()
+    elapsed = time.perf_counter() - started
+    return {
+        "hypothesis": text,
+        "duration_sec": audio.shape[0] / SAMPLE_RATE,
+        "latency_ms": elapsed * 1000,
+    }
+
+
+def evaluate(directory: Path, workers: int = 1, model_name: str = asr.MODEL_NAME) -> dict:
+    dataset = collect_dataset(directory)
+    items: List[dict] = []
+    with ProcessPoolExecutor(
+        max_workers=workers,
+        initializer=_init_worker,
+        initargs=(model_name,),
+    ) as pool:
+        outputs = pool.map(_transcribe_file, [str(path) for path, _ in dataset])
+        for (wav_path, reference), output in zip(dataset, outputs):
+            ref_words = normalize_words(reference)
+            errors = word_errors(ref_words, normalize_words(output["hypothesis"]))
+            items.append({
+                "file": wav_path.name,
+                "reference": reference,
+                **output,
+                "errors": errors,
+                "ref_words": len(ref_words),
+                "wer": errors / len(ref_words) if ref_words else float(errors > 0),
+            })
+
+    total_words = sum(item["ref_words"] for item in items)
+    total_audio = sum(item["duration_sec"] for item in items)
+    latencies = [item["latency_ms"] for item in items]
+    return {
+        "model": model_name,
+        "workers": workers,
+        "files": len(items),
+        "wer": sum(item["errors"] for item in items) / total_words if total_words else None,
+        "rtf": sum(latencies) / 1000 / total_audio if total_audio else None,
+        "latency_ms": summarize(latencies),
+        "items": items,
+    }
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="Batch ASR evaluation over a WAV directory")
+    parser.add_argument("directory", type=Path)
+    parser.add_argument("--workers", type=int, default=max(1, (os.cpu_count() or 2) // 2))
+    parser.add_argument("--model", default=asr.MODEL_NAME)
+    parser.add_argument("--output", type=Path, help="write the JSON report here instead of stdout")
+    args = parser.parse_args(argv)
+
+    if not args.directory.is_dir():
+        print(f"Нет такой папки: {args.directory}", file=sys.stderr)
+        return 2
+
+    report = evaluate(args.directory, workers=args.workers, model_name=args.model)
+    text = json.dumps(report, ensure_ascii=False, indent=2)
+    if args.output:
+        args.output.write_text(text, encoding="utf-8")
+    else:
+        print(text)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
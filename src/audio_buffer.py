@@ -0,0 +1,73 @@
+"""Fixed-size audio ring buffer used for push-to-talk pre-roll.
+
+Pure NumPy and free of any audio device: the input stream callback feeds
+blocks through `write`, the push-to-talk logic remembers absolute frame
+positions and copies a window back out with `read`.
+"""
+
+import threading
+from typing import Optional
+
+import numpy as np
+
+
+class RingBuffer:
+    """Preallocated mono sample buffer addressed by absolute frame position."""
+
+    def __init__(self, capacity: int, dtype=np.float32):
+        if capacity <= 0:
+            raise ValueError("capacity must be positive")
+        self.capacity = capacity
+        self._data = np.zeros(capacity, dtype=dtype)
+        self._written = 0  # total frames ever written
+        self._lock = threading.Lock()
+
+    @property
+    def position(self) -> int:
+        """Absolute index of the next frame to be written."""
+        return self._written
+
+    @property
+    def oldest(self) -> int:
+        """Absolute index of the oldest frame still held in the buffer."""
+        return max(0, self._written - self.capacity)
+
+    def write(self, frames: np.ndarray) -> None:
+        """Append frames, overwriting the oldest ones once full."""
+        frames = np.asarray(frames).reshape(-1)
+        count = frames.shape[0]
+        if count == 0:
+            return
+        kept = frames[-self.capacity:]
+        with self._lock:
+            start = (self._written + count - kept.shape[0]) % self.capacity
+            first = min(kept.shape[0], self.capacity - start)
+            self._data[start:start + first] = kept[:first]
+            if first < kept.shape[0]:
+                self._data[:kept.shape[0] - first] = kept[first:]
+            self._written += count
+
+    def read(self, start: int, stop: Optional[int] = None, out: Optional[np.ndarray] = None) -> np.ndarray:
+        """Copy frames [start, stop) into `out` and return the filled view.
+
+        Positions already overwritten are clipped away, as is anything past
+        `out`'s length (the newest frames win). Without `out` a new array is
+        allocated; callers on a hot path should pass a reusable one.
+        """
+        with self._lock:
+            stop = self._written if stop is None else min(stop, self._written)
+            start = max(start, self._written - self.capacity, 0)
+            if out is not None:
+                start = max(start, stop - out.shape[0])
+            count = max(0, stop - start)
+            if out is None:
+                out = np.empty(count, dtype=self._data.dtype)
+            if count == 0:
+                return out[:0]
+
+            begin = start % self.capacity
+            first = min(count, self.capacity - begin)
+            out[:first] = self._data[begin:begin + first]
+            if first < count:
+                out[first:count] = self._data[:count - first]
+        return out[:count]
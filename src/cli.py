@@ -0,0 +1,151 @@
+"""Headless front-end driving the same orchestrator as the GUI.
+
+Usage:
+    python src/cli.py                      # REPL (or one command per stdin line)
+    python src/cli.py -c "открой telegram"  # single command
+    python src/cli.py --script commands.txt [--json]
+
+`--json` prints one JSON object per command with the result and timings
+(total and per pipeline stage), which makes the CLI usable for load tests;
+`--home` points the desktop scan at a synthetic profile directory.
+`--profile [N]` profiles every Nth command (see profiling.py); in the REPL
+":profile N" and ":profile off" toggle it at runtime.
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import sys
+import time
+from pathlib import Path
+from typing import Iterable, List, Optional
+
+from logger import init_logger, log, new_session_log_path, shutdown_logger
+import profiling
+from orchestrator import Orchestrator
+from tracing import close_tracing, init_tracing, trace_path_for
+
+EXIT_RESULTS = ("exit",)
+
+
+def _is_exit(result: str) -> bool:
+    return result in EXIT_RESULTS or result.endswith("\nexit")
+
+
+def read_script(path: str) -> List[str]:
+    """Return commands from a script file ('-' for stdin), skipping blanks and # comments."""
+    text = sys.stdin.read() if path == "-" else Path(path).read_text(encoding="utf-8")
+    return [line.strip() for line in text.splitlines() if line.strip() and not line.lstrip().startswith("#")]
+
+
+def toggle_profiling(arg: str) -> str:
+    """Handle ":profile N|off" (no argument shows the current state)."""
+    if arg == "off":
+        profiling.disable()
+    elif arg:
+        try:
+            profiling.enable(int(arg))
+        except ValueError:
+            return "Использование: :profile N | :profile off"
+    state = profiling.status()
+    if not state["every"]:
+        return "Профилирование выключено"
+    return f"Профилируется каждая {state['every']}-я команда"
+
+
+class Session:
+    def __init__(self, orchestrator: Orchestrator, as_json: bool = False):
+        self.orchestrator = orchestrator
+        self.as_json = as_json
+
+    async def run_command(self, text: str) -> str:
+        started = time.perf_counter()
+        request = await self.orchestrator.submit_text(text)
+        result = await request.future
+        total_ms = (time.perf_counter() - started) * 1000
+        if self.as_json:
+            print(json.dumps({
+                "command": text,
+                "result": result,
+                "ms": round(total_ms, 3),
+                "stages_ms": {name: round(sec * 1000, 3) for name, sec in request.timings.items()},
+            }, ensure_ascii=False), flush=True)
+        elif not _is_exit(result):
+            print(result, flush=True)
+        return result
+
+    async def run_many(self, commands: Iterable[str]) -> None:
+        for text in commands:
+            if _is_exit(await self.run_command(text)):
+                break
+
+    async def repl(self) -> None:
+        loop = asyncio.get_running_loop()
+        interactive = sys.stdin.isatty() and not self.as_json
+        while True:
+            try:
+                line = await loop.run_in_executor(None, input, "> " if interactive else "")
+            except EOFError:
+                break
+            if not line.strip():
+                continue
+            if line.startswith(":profile"):
+                print(toggle_profiling(line[len(":profile"):].strip()), flush=True)
+                continue
+            if _is_exit(await self.run_command(line)):
+                break
+
+
+async def run(args: argparse.Namespace) -> None:
+    orchestrator = Orchestrator()
+    await orchestrator.start()
+    session = Session(orchestrator, as_json=args.json)
+    try:
+        if args.command is not None:
+            await session.run_many(args.command)
+        elif args.script is not None:
+            await session.run_many(read_script(args.script))
+        else:
+            await session.repl()
+    finally:
+        await orchestrator.stop()
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="Headless voice assistant (text commands)")
+    mode = parser.add_mutually_exclusive_group()
+    mode.add_argument("-c", dest="command", action="append", metavar="TEXT", help="run a command and exit (repeatable)")
+    mode.add_argument("--script", metavar="FILE", help="run commands from a file, one per line ('-' for stdin)")
+    parser.add_argument("--json", action="store_true", help="print one JSON object per command")
+    parser.add_argument("--home", metavar="DIR", help="use DIR as USERPROFILE and PUBLIC (synthetic desktops)")
+    parser.add_argument("--profile", nargs="?", type=int, const=1, metavar="N",
+                        help="profile every Nth command into logs/profile-<session>")
+    args = parser.parse_args(argv)
+
+    if args.home:
+        os.environ["USERPROFILE"] = args.home
+        os.environ["PUBLIC"] = os.path.join(args.home, "Public")
+
+    log_path = new_session_log_path()
+    init_logger(log_path)
+    init_tracing(trace_path_for(log_path))
+    if args.profile:
+        profiling.enable(args.profile)
+    log("CLI started")
+    try:
+        asyncio.run(run(args))
+    except KeyboardInterrupt:
+        pass
+    except FileNotFoundError as exc:
+        print(f"Файл не найден: {exc.filename}", file=sys.stderr)
+        return 2
+    finally:
+        # Flush the trace and log queues before the process exits.
+        close_tracing()
+        shutdown_logger()
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
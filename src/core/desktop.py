@@ -1,24 +1,47 @@
 from dataclasses import dataclass
 from typing import Dict, Optional, Union
 
-from dekstop_ops import (
-    create_command,
-    delete_item,
-    list_items,
-    open_item,
-    rename_item,
-)
+from core import registry
+from core.registry import Args
 
 OPEN_WORDS = ("открой", "запусти", "open", "start")
 RENAME_WORDS = ("переименуй", "переименовать", "rename")
 DELETE_WORDS = ("удали", "удалить", "delete", "remove")
 CREATE_WORDS = ("создай", "создать", "create")
+CLOSE_WORDS = ("закрой", "закрыть", "close")
 EXIT_WORDS = ("выход", "exit", "quit", "q")
 GET_WORDS = ("что", "какие", "get", "list")
 HELP_WORDS = ("help",)
 
+FOLDER_WORDS = ("folder", "папка", "папку")
+FILE_WORDS = ("file", "файл")
 ALLOWED_KINDS = ("file", "folder")
 
+NO_OPEN_TARGET = "Не указано, что открывать"
+NO_DELETE_TARGET = "Не указано, что удалять"
+NO_CLOSE_TARGET = "Не указано, что закрывать"
+RENAME_ARGS_MISSING = "Недостаточно аргументов для переименования"
+BAD_KIND = "Тип должен быть file или folder"
+FILE_ARGS_MISSING = "Для файла укажите имя и расширение"
+FOLDER_NAME_MISSING = "Укажите имя папки"
+UNKNOWN_COMMAND = "Команда не распознана"
+EMPTY_COMMAND = "Пустая команда"
+INVALID_COMMAND = "Неверная команда. Напишите 'help' для списка команд."
+
+# Responses without variable parts; pre-synthesized by the TTS phrase cache.
+FIXED_RESPONSES = (
+    NO_OPEN_TARGET,
+    NO_DELETE_TARGET,
+    NO_CLOSE_TARGET,
+    RENAME_ARGS_MISSING,
+    BAD_KIND,
+    FILE_ARGS_MISSING,
+    FOLDER_NAME_MISSING,
+    UNKNOWN_COMMAND,
+    EMPTY_COMMAND,
+    INVALID_COMMAND,
+)
+
 
 @dataclass
 class Command:
@@ -26,43 +49,17 @@ class Command:
     args: Dict[str, Union[str, bool, None]]
 
     def validate(self) -> Optional[str]:
-        if self.action == "open" and not self.args.get("target"):
-            return "Не указано, что открывать"
-        if self.action == "rename" and (not self.args.get("old") or not self.args.get("new")):
-            return "Недостаточно аргументов для переименования"
-        if self.action == "delete" and not self.args.get("target"):
-            return "Не указано, что удалять"
-        if self.action == "create":
-            kind = self.args.get("kind")
-            if kind not in ALLOWED_KINDS:
-                return "Тип должен быть file или folder"
-            if kind == "file" and (not self.args.get("name") or not self.args.get("ext")):
-                return "Для файла укажите имя и расширение"
-            if kind == "folder" and not self.args.get("name"):
-                return "Укажите имя папки"
-        return None
+        action = registry.get_action(self.action)
+        if action is None or action.validate is None:
+            return None
+        return action.validate(self.args)
 
 
 def execute(cmd: Command) -> str:
-    if cmd.action == "open":
-        return open_item(cmd.args.get("target", ""))
-    if cmd.action == "rename":
-        return rename_item(cmd.args.get("old", ""), cmd.args.get("new", ""))
-    if cmd.action == "delete":
-        return delete_item(cmd.args.get("target", ""), confirm=bool(cmd.args.get("confirm", False)))
-    if cmd.action == "create":
-        return create_command(
-            cmd.args.get("kind", ""),
-            cmd.args.get("name", ""),
-            cmd.args.get("ext"),
-        )
-    if cmd.action == "get":
-        return list_items(cmd.args.get("filter"))
-    if cmd.action == "help":
-        return help_text()
-    if cmd.action == "exit":
-        return "exit"
-    return "Команда не распознана"
+    action = registry.get_action(cmd.action)
+    if action is None:
+        return UNKNOWN_COMMAND
+    return action.run(cmd.args)
 
 
 def help_text() -> str:
@@ -74,6 +71,7 @@ def help_text() -> str:
         "- create folder <имя> — создать папку\n"
         "- create file <имя> <расширение> — создать файл\n"
         "- get/что/какие [фильтр] — показать элементы рабочего стола\n"
+        "- close/закрой <программа> — закрыть запущенную программу\n"
         "- help — показать справку\n"
         "- exit/выход — закрыть ассистент"
     )
@@ -82,64 +80,153 @@ def help_text() -> str:
 def parse_command(text: str) -> Union[Command, str]:
     raw = text.strip()
     if not raw:
-        return "Пустая команда"
+        return EMPTY_COMMAND
 
-    normalized = raw.lower()
-    if normalized in EXIT_WORDS:
-        return Command("exit", {})
+    words = raw.lower().split()
+    found = registry.match(words)
+    if found is None:
+        return INVALID_COMMAND
 
-    words = normalized.split()
-    raw_words = raw.split()
-    if not words:
-        return "Пустая команда"
+    parts = raw.split(None, found.consumed)
+    remainder = parts[found.consumed].strip() if len(parts) > found.consumed else ""
+    args = found.preset
+    if found.action.parse_args is not None:
+        args = found.action.parse_args(remainder, args)
+    return Command(found.action.name, args)
 
-    command_lower = words[0]
-    command_raw = raw_words[0]
 
-    if command_lower in HELP_WORDS:
-        return Command("help", {})
+# Argument parsers: (text after the trigger, preset args from the trigger) -> args
 
-    if command_lower in OPEN_WORDS:
-        target = " ".join(raw_words[1:]).strip()
-        return Command("open", {"target": target or None})
 
-    if command_lower in RENAME_WORDS:
-        args_raw = raw[len(command_raw):].strip()
-        old_raw = None
-        new_raw = None
-        if "->" in args_raw:
-            old_raw, new_raw = [part.strip() for part in args_raw.split("->", 1)]
-        else:
-            parts = args_raw.split(None, 1)
-            if parts:
-                old_raw = parts[0]
-            if len(parts) > 1:
-                new_raw = parts[1].strip()
-        return Command("rename", {"old": old_raw, "new": new_raw})
-
-    if command_lower in DELETE_WORDS:
-        target_raw = raw[len(command_raw):].strip()
-        confirm = False
-        if target_raw.lower().endswith(" ok"):
-            confirm = True
-            target_raw = target_raw[:-3].rstrip()
-        return Command("delete", {"target": target_raw or None, "confirm": confirm})
-
-    if command_lower in CREATE_WORDS:
-        args_raw = raw[len(command_raw):].strip()
-        parts = args_raw.split()
+def _parse_open(rest: str, preset: Args) -> Args:
+    return {"target": " ".join(rest.split()) or None}
+
+
+def _parse_rename(rest: str, preset: Args) -> Args:
+    old_raw = None
+    new_raw = None
+    if "->" in rest:
+        old_raw, new_raw = [part.strip() for part in rest.split("->", 1)]
+    else:
+        parts = rest.split(None, 1)
+        if parts:
+            old_raw = parts[0]
+        if len(parts) > 1:
+            new_raw = parts[1].strip()
+    return {"old": old_raw, "new": new_raw}
+
+
+def _parse_delete(rest: str, preset: Args) -> Args:
+    confirm = False
+    if rest.lower().endswith(" ok"):
+        confirm = True
+        rest = rest[:-3].rstrip()
+    return {"target": rest or None, "confirm": confirm}
+
+
+def _parse_create(rest: str, preset: Args) -> Args:
+    parts = rest.split()
+    kind = preset.get("kind")
+    if kind is None:
         kind_token = parts[0].lower() if parts else None
-        if kind_token in ("folder", "папка", "папку"):
-            name = " ".join(parts[1:]).strip() if len(parts) > 1 else None
-            return Command("create", {"kind": "folder", "name": name, "ext": None})
-        if kind_token in ("file", "файл"):
-            name = " ".join(parts[1:-1]).strip() if len(parts) >= 3 else None
-            ext = parts[-1] if len(parts) >= 3 else None
-            return Command("create", {"kind": "file", "name": name, "ext": ext})
-        return Command("create", {"kind": None, "name": None, "ext": None})
-
-    if command_lower in GET_WORDS:
-        filter_raw = raw[len(command_raw):].strip()
-        return Command("get", {"filter": filter_raw or None})
-
-    return "Неверная команда. Напишите 'help' для списка команд."
\ No newline at end of file
+        if kind_token in FOLDER_WORDS:
+            kind = "folder"
+        elif kind_token in FILE_WORDS:
+            kind = "file"
+        else:
+            return {"kind": None, "name": None, "ext": None}
+        parts = parts[1:]
+    if kind == "folder":
+        return {"kind": "folder", "name": " ".join(parts).strip() or None, "ext": None}
+    name = " ".join(parts[:-1]).strip() if len(parts) >= 2 else None
+    ext = parts[-1] if len(parts) >= 2 else None
+    return {"kind": "file", "name": name, "ext": ext}
+
+
+def _parse_get(rest: str, preset: Args) -> Args:
+    return {"filter": rest or None}
+
+
+def _parse_close(rest: str, preset: Args) -> Args:
+    return {"target": " ".join(rest.split()) or None}
+
+
+# Validators
+
+
+def _validate_open(args: Args) -> Optional[str]:
+    if not args.get("target"):
+        return NO_OPEN_TARGET
+    return None
+
+
+def _validate_rename(args: Args) -> Optional[str]:
+    if not args.get("old") or not args.get("new"):
+        return RENAME_ARGS_MISSING
+    return None
+
+
+def _validate_delete(args: Args) -> Optional[str]:
+    if not args.get("target"):
+        return NO_DELETE_TARGET
+    return None
+
+
+def _validate_close(args: Args) -> Optional[str]:
+    if not args.get("target"):
+        return NO_CLOSE_TARGET
+    return None
+
+
+def _validate_create(args: Args) -> Optional[str]:
+    kind = args.get("kind")
+    if kind not in ALLOWED_KINDS:
+        return BAD_KIND
+    if kind == "file" and (not args.get("name") or not args.get("ext")):
+        return FILE_ARGS_MISSING
+    if kind == "folder" and not args.get("name"):
+        return FOLDER_NAME_MISSING
+    return None
+
+
+def _folder_triggers(*phrases: str):
+    return [(phrase, {"kind": "folder"}) for phrase in phrases]
+
+
+def _file_triggers(*phrases: str):
+    return [(phrase, {"kind": "file"}) for phrase in phrases]
+
+
+registry.register(
+    "open", "core.handlers:open_action", OPEN_WORDS,
+    parse_args=_parse_open, validate=_validate_open,
+)
+registry.register(
+    "rename", "core.handlers:rename_action", RENAME_WORDS,
+    parse_args=_parse_rename, validate=_validate_rename,
+)
+registry.register(
+    "delete", "core.handlers:delete_action", DELETE_WORDS,
+    parse_args=_parse_delete, validate=_validate_delete,
+)
+registry.register(
+    "create", "core.handlers:create_action",
+    CREATE_WORDS
+    + tuple(_folder_triggers("создай папку", "создать папку", "новая папка", "create folder", "new folder"))
+    + tuple(_file_triggers("создай файл", "создать файл", "новый файл", "create file", "new file")),
+    parse_args=_parse_create, validate=_validate_create,
+)
+registry.register(
+    "get", "core.handlers:get_action",
+    GET_WORDS + ("что на рабочем столе", "покажи рабочий стол", "list desktop"),
+    parse_args=_parse_get,
+)
+registry.register(
+    "close", "core.handlers:close_action", CLOSE_WORDS,
+    parse_args=_parse_close, validate=_validate_close,
+)
+registry.register("help", "core.handlers:help_action", HELP_WORDS + ("помощь", "справка"))
+registry.register(
+    "exit", "core.handlers:exit_action",
+    EXIT_WORDS + ("закрой ассистент", "close assistant"), exact=True,
+)
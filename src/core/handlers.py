@@ -0,0 +1,50 @@
+"""Action handlers: adapt parsed Command args to desktop operations.
+
+Imported lazily by the action registry on the first execution of an
+action, so parsing a command never loads the filesystem layer.
+"""
+
+from core.registry import Args
+from dekstop_ops import (
+    create_command,
+    delete_item,
+    list_items,
+    open_item,
+    rename_item,
+)
+
+
+def open_action(args: Args) -> str:
+    return open_item(args.get("target", ""))
+
+
+def rename_action(args: Args) -> str:
+    return rename_item(args.get("old", ""), args.get("new", ""))
+
+
+def delete_action(args: Args) -> str:
+    return delete_item(args.get("target", ""), confirm=bool(args.get("confirm", False)))
+
+
+def create_action(args: Args) -> str:
+    return create_command(args.get("kind", ""), args.get("name", ""), args.get("ext"))
+
+
+def get_action(args: Args) -> str:
+    return list_items(args.get("filter"))
+
+
+def close_action(args: Args) -> str:
+    from process_ops import close_app
+
+    return close_app(args.get("target", ""))
+
+
+def help_action(args: Args) -> str:
+    from core.desktop import help_text
+
+    return help_text()
+
+
+def exit_action(args: Args) -> str:
+    return "exit"
@@ -0,0 +1,157 @@
+"""Action registry and trigger-phrase trie.
+
+Every action registers once: its trigger phrases (any language, one or more
+words), an argument parser, a validator and a handler. Handlers are given
+as "module:function" strings and imported on first execution, so parsing
+never loads the modules that do the work.
+
+Triggers are compiled into a word-level trie; `match` walks it once along
+the input and returns the longest trigger that prefixes it, so the cost of
+matching does not grow with the number of registered actions.
+"""
+
+import importlib
+import threading
+from dataclasses import dataclass, field
+from typing import Callable, Dict, Iterable, List, Optional, Tuple, Union
+
+Args = Dict[str, Union[str, bool, None]]
+ArgParser = Callable[[str, Args], Args]
+Validator = Callable[[Args], Optional[str]]
+Handler = Callable[[Args], str]
+
+
+@dataclass
+class Action:
+    name: str
+    handler: Union[str, Handler]
+    parse_args: Optional[ArgParser] = None
+    validate: Optional[Validator] = None
+    _resolved: Optional[Handler] = field(default=None, repr=False)
+
+    def run(self, args: Args) -> str:
+        if self._resolved is None:
+            if callable(self.handler):
+                self._resolved = self.handler
+            else:
+                module_name, _, attr = self.handler.partition(":")
+                self._resolved = getattr(importlib.import_module(module_name), attr)
+        return self._resolved(args)
+
+
+@dataclass(frozen=True)
+class Trigger:
+    action: str
+    preset: Tuple[Tuple[str, Union[str, bool, None]], ...] = ()
+    exact: bool = False  # only when the phrase is the whole input
+
+
+@dataclass
+class Match:
+    action: Action
+    preset: Args
+    consumed: int  # number of input words covered by the trigger
+
+
+class _Node:
+    __slots__ = ("children", "trigger")
+
+    def __init__(self):
+        self.children: Dict[str, "_Node"] = {}
+        self.trigger: Optional[Trigger] = None
+
+
+class TriggerTrie:
+    def __init__(self):
+        self._root = _Node()
+
+    def insert(self, words: Iterable[str], trigger: Trigger) -> None:
+        """Add a trigger phrase; a phrase can belong to one trigger only."""
+        words = tuple(words)
+        node = self._root
+        for word in words:
+            node = node.children.setdefault(word, _Node())
+        if node.trigger is not None:
+            raise ValueError(f"Trigger {' '.join(words)!r} is already registered for {node.trigger.action!r}")
+        node.trigger = trigger
+
+    def longest_prefix(self, words: List[str]) -> Optional[Tuple[Trigger, int]]:
+        """Return the longest trigger matching a prefix of `words`."""
+        node = self._root
+        best: Optional[Tuple[Trigger, int]] = None
+        for index, word in enumerate(words):
+            node = node.children.get(word)
+            if node is None:
+                break
+            trigger = node.trigger
+            if trigger is not None and (not trigger.exact or index + 1 == len(words)):
+                best = (trigger, index + 1)
+        return best
+
+
+_actions: Dict[str, Action] = {}
+_triggers: List[Tuple[Tuple[str, ...], Trigger]] = []
+_trie: Optional[TriggerTrie] = None
+_lock = threading.Lock()
+
+
+def register(
+    name: str,
+    handler: Union[str, Handler],
+    triggers: Iterable[Union[str, Tuple[str, Args]]] = (),
+    parse_args: Optional[ArgParser] = None,
+    validate: Optional[Validator] = None,
+    exact: bool = False,
+) -> Action:
+    """Register an action; a trigger is a phrase or (phrase, preset args).
+
+    Raises ValueError if a phrase already triggers another action, so two
+    handlers cannot silently shadow each other.
+    """
+    global _trie
+    action = Action(name, handler, parse_args, validate)
+    compiled: List[Tuple[Tuple[str, ...], Trigger]] = []
+    for trigger in triggers:
+        phrase, preset = (trigger, {}) if isinstance(trigger, str) else trigger
+        compiled.append((tuple(phrase.lower().split()), Trigger(name, tuple(preset.items()), exact)))
+    with _lock:
+        taken = {words: existing.action for words, existing in _triggers}
+        for words, _trigger in compiled:
+            if words in taken:
+                raise ValueError(f"Trigger {' '.join(words)!r} is already registered for {taken[words]!r}")
+            taken[words] = name
+        _actions[name] = action
+        _triggers.extend(compiled)
+        _trie = None  # recompiled on the next match
+    return action
+
+
+def get_action(name: str) -> Optional[Action]:
+    return _actions.get(name)
+
+
+def action_names() -> Tuple[str, ...]:
+    return tuple(_actions)
+
+
+def _compiled() -> TriggerTrie:
+    global _trie
+    trie = _trie
+    if trie is None:
+        with _lock:
+            if _trie is None:
+                trie = TriggerTrie()
+                for words, trigger in _triggers:
+                    trie.insert(words, trigger)
+                _trie = trie
+            trie = _trie
+    return trie
+
+
+def match(words: List[str]) -> Optional[Match]:
+    """Match lowercased input words against all registered triggers."""
+    found = _compiled().longest_prefix(words)
+    if found is None:
+        return None
+    trigger, consumed = found
+    return Match(_actions[trigger.action], dict(trigger.preset), consumed)
@@ -0,0 +1,194 @@
+"""Resident assistant daemon with a local IPC endpoint.
+
+Usage: python src/daemon.py [--address PATH] [--preload-asr]
+
+Keeps the interpreter, the orchestrator, the desktop inventory cache, the
+LLM plan cache and its pooled HTTP session warm, and serves commands sent
+by `daemon_client.py` over a Unix socket (a named pipe on Windows).
+
+Requests: {"cmd": "run", "text": ...}, {"cmd": "ping"}, {"cmd": "shutdown"},
+{"cmd": "profile", "every": N} (0 turns sampled profiling off).
+Replies: {"ok": true, "result": ..., "ms": ...} or {"ok": false, "error": ...};
+malformed requests get an error reply and the connection stays open.
+"""
+
+import argparse
+import os
+import sys
+import threading
+import time
+from multiprocessing import AuthenticationError
+from multiprocessing.connection import Client, Connection, Listener
+from typing import Any, Dict, List, Optional
+
+from daemon_client import address_family, default_address, load_authkey, recv_message, send_message
+from dekstop_ops import get_desktop_items
+from logger import init_logger, log, new_session_log_path
+import profiling
+from orchestrator import OrchestratorThread
+from tracing import init_tracing, trace_path_for
+
+
+class AssistantDaemon:
+    def __init__(self, address: Optional[str] = None, preload_asr: bool = False):
+        self.address = address or default_address()
+        self.preload_asr = preload_asr
+        self._authkey: Optional[bytes] = None
+        self._listener: Optional[Listener] = None
+        self._orchestrator: Optional[OrchestratorThread] = None
+        self._stopping = threading.Event()
+        self.ready = threading.Event()  # set once clients can connect
+
+    def warm_up(self) -> None:
+        get_desktop_items()
+        from llm_parser import INTENT_ENABLED
+
+        if INTENT_ENABLED:
+            from intent import get_classifier
+
+            get_classifier()
+        if self.preload_asr:
+            from asr import _load_model
+
+            _load_model()
+
+    def _clear_stale_socket(self) -> None:
+        if address_family(self.address) != "AF_UNIX" or not os.path.exists(self.address):
+            return
+        from daemon_client import DaemonClient
+
+        try:
+            DaemonClient(self.address, self._authkey).close()
+        except AuthenticationError:
+            pass  # something answers, but not with our key
+        except OSError:
+            os.unlink(self.address)  # left behind by a crashed daemon
+            return
+        raise RuntimeError(f"Daemon already running at {self.address}")
+
+    def serve_forever(self) -> None:
+        self._authkey = load_authkey(create=True)
+        self._clear_stale_socket()
+        self._orchestrator = OrchestratorThread()
+        self.warm_up()
+        # The key also guards the Windows pipe, which has no file mode.
+        self._listener = Listener(self.address, family=address_family(self.address), authkey=self._authkey)
+        if address_family(self.address) == "AF_UNIX":
+            os.chmod(self.address, 0o600)
+        log(f"Daemon listening on {self.address}")
+        self.ready.set()
+        try:
+            while True:
+                try:
+                    conn = self._listener.accept()
+                except (AuthenticationError, EOFError, ConnectionError) as exc:
+                    log(f"Daemon rejected a connection: {exc!r}")
+                    if self._stopping.is_set():
+                        break
+                    continue
+                if self._stopping.is_set():
+                    conn.close()
+                    break
+                threading.Thread(target=self._serve_connection, args=(conn,), daemon=True).start()
+        finally:
+            self._close()
+
+    def stop(self) -> None:
+        """Ask serve_forever to return; safe to call from any thread."""
+        if self._stopping.is_set():
+            return
+        self._stopping.set()
+        try:
+            # accept() is not interrupted by closing the listener; wake it up.
+            Client(self.address, family=address_family(self.address), authkey=self._authkey).close()
+        except OSError:
+            pass
+
+    def _close(self) -> None:
+        listener, self._listener = self._listener, None
+        if listener is not None:
+            listener.close()
+        orchestrator, self._orchestrator = self._orchestrator, None
+        if orchestrator is not None:
+            orchestrator.close()
+        log("Daemon stopped")
+
+    def _serve_connection(self, conn: Connection) -> None:
+        with conn:
+            while True:
+                try:
+                    message: Any = recv_message(conn)
+                except (EOFError, OSError):
+                    return
+                except ValueError:
+                    message = None  # not JSON; handle() replies with an error
+                reply = self.handle(message)
+                try:
+                    send_message(conn, reply)
+                except OSError:
+                    return
+                if reply.get("ok") and message.get("cmd") == "shutdown":
+                    self.stop()
+                    return
+
+    def handle(self, message: Any) -> Dict[str, Any]:
+        if not isinstance(message, dict):
+            return {"ok": False, "error": "Некорректный запрос к демону"}
+        cmd = message.get("cmd")
+        if cmd == "ping":
+            return {"ok": True, "result": "pong"}
+        if cmd == "shutdown":
+            return {"ok": True, "result": ""}
+        if cmd == "profile":
+            every = message.get("every")
+            if every is not None:
+                try:
+                    every = int(every)
+                except (TypeError, ValueError):
+                    return {"ok": False, "error": f"Некорректное значение every: {every!r}"}
+                if every > 0:
+                    profiling.enable(every)
+                else:
+                    profiling.disable()
+            return {"ok": True, "result": profiling.status()}
+        if cmd != "run":
+            return {"ok": False, "error": f"Неизвестная команда демона: {cmd}"}
+
+        orchestrator = self._orchestrator
+        if orchestrator is None:
+            return {"ok": False, "error": "Демон останавливается"}
+        started = time.perf_counter()
+        try:
+            result = orchestrator.run_text(str(message.get("text", "")))
+        except Exception as exc:
+            log(f"Unhandled error (daemon): {exc}")
+            return {"ok": False, "error": "Произошла ошибка"}
+        return {"ok": True, "result": result, "ms": (time.perf_counter() - started) * 1000}
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="Resident voice assistant daemon")
+    parser.add_argument("--address", default=None, help="socket path or pipe name")
+    parser.add_argument("--preload-asr", action="store_true", help="load the Whisper model at start")
+    parser.add_argument("--profile", nargs="?", type=int, const=1, metavar="N",
+                        help="profile every Nth command into logs/profile-<session>")
+    args = parser.parse_args(argv)
+
+    log_path = new_session_log_path()
+    init_logger(log_path)
+    init_tracing(trace_path_for(log_path))
+    if args.profile:
+        profiling.enable(args.profile)
+    daemon = AssistantDaemon(args.address, preload_asr=args.preload_asr)
+    try:
+        daemon.serve_forever()
+    except RuntimeError as exc:
+        print(exc, file=sys.stderr)
+        return 1
+    except KeyboardInterrupt:
+        pass
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,195 @@
+"""Tiny client for the resident assistant daemon.
+
+Only the standard library is imported, so hotkeys and scripts can call it
+with negligible start-up cost:
+
+    python src/daemon_client.py "открой telegram"
+    python src/daemon_client.py --bench 2000 --concurrency 4
+
+Messages are JSON objects sent as length-prefixed frames over a Unix socket
+(Linux/macOS) or a named pipe (Windows). Connections are authenticated with
+a per-user key stored in a file only its owner can read (`authkey_path`);
+the daemon creates it on first start.
+"""
+
+import argparse
+import getpass
+import json
+import os
+import sys
+import tempfile
+import threading
+import time
+from multiprocessing import AuthenticationError
+from multiprocessing.connection import Client, Connection
+from typing import Any, Dict, List, Optional
+
+
+def default_address() -> str:
+    override = os.environ.get("ASSISTANT_SOCKET")
+    if override:
+        return override
+    user = getpass.getuser()
+    if sys.platform == "win32":
+        return rf"\\.\pipe\pc-assistant-{user}"
+    runtime_dir = os.environ.get("XDG_RUNTIME_DIR") or tempfile.gettempdir()
+    return os.path.join(runtime_dir, f"pc-assistant-{user}.sock")
+
+
+def authkey_path() -> str:
+    override = os.environ.get("ASSISTANT_AUTHKEY_FILE")
+    if override:
+        return override
+    if sys.platform == "win32":
+        base = os.environ.get("LOCALAPPDATA") or os.path.expanduser("~")
+    else:
+        base = os.environ.get("XDG_CONFIG_HOME") or os.path.join(os.path.expanduser("~"), ".config")
+    return os.path.join(base, "pc-assistant", "daemon.key")
+
+
+def load_authkey(create: bool = False) -> bytes:
+    """Read the shared daemon key; with `create`, make it (mode 0600) if missing."""
+    path = authkey_path()
+    try:
+        with open(path, "rb") as handle:
+            return handle.read()
+    except FileNotFoundError:
+        if not create:
+            raise
+    import secrets
+
+    os.makedirs(os.path.dirname(path), mode=0o700, exist_ok=True)
+    try:
+        fd = os.open(path, os.O_WRONLY | os.O_CREAT | os.O_EXCL | getattr(os, "O_BINARY", 0), 0o600)
+    except FileExistsError:  # created by a concurrent start
+        return load_authkey()
+    key = secrets.token_bytes(32)
+    with os.fdopen(fd, "wb") as handle:
+        handle.write(key)
+    return key
+
+
+def address_family(address: str) -> str:
+    return "AF_PIPE" if address.startswith("\\\\") else "AF_UNIX"
+
+
+def send_message(conn: Connection, message: Dict[str, Any]) -> None:
+    conn.send_bytes(json.dumps(message, ensure_ascii=False).encode("utf-8"))
+
+
+def recv_message(conn: Connection) -> Dict[str, Any]:
+    return json.loads(conn.recv_bytes().decode("utf-8"))
+
+
+class DaemonClient:
+    """A persistent connection to the daemon; reuse it for many requests."""
+
+    def __init__(self, address: Optional[str] = None, authkey: Optional[bytes] = None):
+        address = address or default_address()
+        self._conn = Client(address, family=address_family(address), authkey=authkey or load_authkey())
+
+    def request(self, message: Dict[str, Any]) -> Dict[str, Any]:
+        send_message(self._conn, message)
+        return recv_message(self._conn)
+
+    def run(self, text: str) -> str:
+        reply = self.request({"cmd": "run", "text": text})
+        if not reply.get("ok"):
+            raise RuntimeError(reply.get("error", "daemon error"))
+        return reply["result"]
+
+    def close(self) -> None:
+        self._conn.close()
+
+    def __enter__(self) -> "DaemonClient":
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.close()
+
+
+def benchmark(total: int, concurrency: int, message: Dict[str, Any], address: Optional[str] = None) -> Dict[str, Any]:
+    """Send `total` requests over `concurrency` persistent connections."""
+    from stats import summarize
+
+    latencies: List[float] = []
+    lock = threading.Lock()
+    per_worker = [total // concurrency + (1 if i < total % concurrency else 0) for i in range(concurrency)]
+
+    def worker(count: int) -> None:
+        local: List[float] = []
+        with DaemonClient(address) as client:
+            for _ in range(count):
+                started = time.perf_counter()
+                client.request(message)
+                local.append((time.perf_counter() - started) * 1000)
+        with lock:
+            latencies.extend(local)
+
+    threads = [threading.Thread(target=worker, args=(count,)) for count in per_worker if count]
+    started = time.perf_counter()
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    elapsed = time.perf_counter() - started
+    return {
+        "message": message,
+        "commands": len(latencies),
+        "concurrency": concurrency,
+        "seconds": elapsed,
+        "per_sec": len(latencies) / elapsed if elapsed else None,
+        "latency_ms": summarize(latencies, (50, 95, 99)),
+    }
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="Send commands to the assistant daemon")
+    parser.add_argument("text", nargs="*", help="command text")
+    parser.add_argument("--address", default=None)
+    parser.add_argument("--json", action="store_true", help="print the raw JSON reply")
+    parser.add_argument("--shutdown", action="store_true", help="stop the daemon")
+    parser.add_argument("--bench", type=int, metavar="N", help="send N commands and report throughput")
+    parser.add_argument("--concurrency", type=int, default=1)
+    parser.add_argument("--ping", action="store_true", help="benchmark transport only (no command execution)")
+    parser.add_argument("--profile", metavar="N|off", help="profile every Nth command in the daemon ('off' to stop)")
+    args = parser.parse_args(argv)
+
+    try:
+        if args.bench:
+            message = {"cmd": "ping"} if args.ping else {"cmd": "run", "text": " ".join(args.text) or "help"}
+            report = benchmark(args.bench, max(1, args.concurrency), message, args.address)
+            print(json.dumps(report, ensure_ascii=False, indent=2))
+            return 0
+
+        with DaemonClient(args.address) as client:
+            if args.shutdown:
+                reply = client.request({"cmd": "shutdown"})
+            elif args.profile is not None:
+                every = 0 if args.profile == "off" else int(args.profile)
+                reply = client.request({"cmd": "profile", "every": every})
+            else:
+                reply = client.request({"cmd": "run", "text": " ".join(args.text)})
+    except (FileNotFoundError, ConnectionRefusedError) as exc:
+        print(f"Демон не запущен: {exc}", file=sys.stderr)
+        return 2
+    except AuthenticationError:
+        print(f"Демон отклонил ключ из {authkey_path()}", file=sys.stderr)
+        return 2
+
+    if args.json:
+        print(json.dumps(reply, ensure_ascii=False))
+    elif reply.get("ok"):
+        result = reply.get("result")
+        if isinstance(result, dict):
+            print(json.dumps(result, ensure_ascii=False))
+        elif result:
+            print(result)
+    else:
+        print(reply.get("error", "Ошибка демона"), file=sys.stderr)
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
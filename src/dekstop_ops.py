@@ -1,12 +1,43 @@
 import os
 import shutil
 import subprocess
+import threading
 from pathlib import Path
-from typing import Dict, Iterable, Optional
+from typing import Dict, Iterable, Optional, Tuple
+from core.desktop import BAD_KIND, FILE_ARGS_MISSING, FOLDER_NAME_MISSING, NO_DELETE_TARGET, RENAME_ARGS_MISSING
 from logger import log
+from tracing import span, traced
 
 EXTENSION_ALLOWLIST = ("txt", "doc", "docx", "md", "json")
 
+OPENED = "Открыл"
+OPEN_FAILED = "Не удалось открыть"
+NOT_FOUND = "Не найдено на рабочем столе"
+NAME_TAKEN = "Файл с таким именем уже существует"
+DELETED = "Удалено"
+ITEM_EXISTS = "Элемент с таким именем уже существует"
+DESKTOP_NOT_FOUND = "Рабочий стол не найден"
+NO_MATCHING_ITEMS = "Элементы не найдены"
+DESKTOP_EMPTY = "Рабочий стол пуст"
+
+# Responses without variable parts; pre-synthesized by the TTS phrase cache.
+FIXED_RESPONSES = (
+    OPENED,
+    OPEN_FAILED,
+    NOT_FOUND,
+    NAME_TAKEN,
+    DELETED,
+    ITEM_EXISTS,
+    DESKTOP_NOT_FOUND,
+    NO_MATCHING_ITEMS,
+    DESKTOP_EMPTY,
+    RENAME_ARGS_MISSING,
+    NO_DELETE_TARGET,
+    BAD_KIND,
+    FOLDER_NAME_MISSING,
+    FILE_ARGS_MISSING,
+)
+
 # Desktop discovery
 def candidate_desktops() -> Iterable[Path]:
     """Yield desktop folders: user Desktop/"Рабочий стол" and Public Desktop."""
@@ -28,10 +59,44 @@ def first_desktop() -> Optional[Path]:
     return next(candidate_desktops(), None)
 
 
+_items_cache: Optional[Tuple[tuple, Dict[str, Path]]] = None
+_items_lock = threading.Lock()
+
+
+def _desktops_signature() -> tuple:
+    # A directory's mtime changes whenever an entry is added, removed or renamed.
+    signature = []
+    for desktop in candidate_desktops():
+        try:
+            signature.append((desktop, desktop.stat().st_mtime_ns))
+        except OSError:
+            continue
+    return tuple(signature)
+
+
 def get_desktop_items() -> Dict[str, Path]:
-    """Return mapping from visible names to full paths for desktop items."""
+    """Return mapping from visible names to full paths for desktop items.
+
+    The scan is reused until one of the desktop folders changes; treat the
+    returned mapping as read-only.
+    """
+    global _items_cache
+    with span("desktop.get_items") as current:
+        signature = _desktops_signature()
+        with _items_lock:
+            if _items_cache is not None and _items_cache[0] == signature:
+                current.set(cached=True)
+                return _items_cache[1]
+        items = _scan_desktops(desktop for desktop, _ in signature)
+        with _items_lock:
+            _items_cache = (signature, items)
+        current.set(cached=False, items=len(items))
+        return items
+
+
+def _scan_desktops(desktops: Iterable[Path]) -> Dict[str, Path]:
     items: Dict[str, Path] = {}
-    for desktop in candidate_desktops():
+    for desktop in desktops:
         for entry in desktop.iterdir():
             if entry.name.startswith("."):
                 continue
@@ -44,9 +109,60 @@ def get_desktop_items() -> Dict[str, Path]:
     return items
 
 
+# Shortcuts
+
+
+_LNK_HAS_ID_LIST = 0x01
+_LNK_HAS_LINK_INFO = 0x02
+_shortcut_targets: Dict[Tuple[Path, int], Optional[str]] = {}
+
+
+def shortcut_target(path: Path) -> Optional[str]:
+    """Return the local target path stored in a .lnk file, or None.
+
+    Reads the LinkInfo block of the Shell Link format directly, so no COM or
+    pywin32 is needed; results are cached per file modification time.
+    """
+    try:
+        key = (path, path.stat().st_mtime_ns)
+    except OSError:
+        return None
+    if key not in _shortcut_targets:
+        try:
+            _shortcut_targets[key] = _read_lnk_target(path.read_bytes())
+        except (OSError, ValueError, IndexError):
+            _shortcut_targets[key] = None
+    return _shortcut_targets[key]
+
+
+def _read_lnk_target(data: bytes) -> Optional[str]:
+    if len(data) < 76 or int.from_bytes(data[:4], "little") != 0x4C:
+        return None
+    flags = int.from_bytes(data[20:24], "little")
+    offset = 76
+    if flags & _LNK_HAS_ID_LIST:
+        offset += 2 + int.from_bytes(data[offset:offset + 2], "little")
+    if not flags & _LNK_HAS_LINK_INFO:
+        return None
+    info = data[offset:]
+    header_size = int.from_bytes(info[4:8], "little")
+    if not int.from_bytes(info[8:12], "little") & 0x01:  # VolumeIDAndLocalBasePath
+        return None
+    unicode_start = int.from_bytes(info[28:32], "little") if header_size >= 0x24 else 0
+    if unicode_start:
+        end = unicode_start
+        while end + 1 < len(info) and info[end:end + 2] != b"\x00\x00":
+            end += 2
+        return info[unicode_start:end].decode("utf-16-le") or None
+    start = int.from_bytes(info[16:20], "little")
+    end = info.index(b"\x00", start)
+    return info[start:end].decode("mbcs" if os.name == "nt" else "cp1252") or None
+
+
 # File operations
 
 
+@traced("desktop.open_path")
 def open_path(path: Path) -> bool:
     """Open a file/shortcut via shell; try os.startfile first, then start command."""
     resolved = path.resolve()
@@ -104,7 +220,7 @@ def create_item(kind: str, name: str, extension: Optional[str] = None) -> Path:
         new_path.touch(exist_ok=False)
         return new_path
 
-    raise ValueError("Тип должен быть file или folder")
+    raise ValueError(BAD_KIND)
 
 
 # High-level command helpers
@@ -120,24 +236,24 @@ def resolve_item(name: str) -> Optional[Path]:
 def open_item(name: str) -> str:
     path = resolve_item(name)
     if not path:
-        return "Не найдено на рабочем столе"
+        return NOT_FOUND
     if open_path(path):
         log(f"open: {path}")
-        return "Открыл"
-    return "Не удалось открыть"
+        return OPENED
+    return OPEN_FAILED
 
 
 def rename_item(old_name: str, new_name: str) -> str:
     if not old_name or not new_name:
-        return "Недостаточно аргументов для переименования"
+        return RENAME_ARGS_MISSING
     desktop_items = get_desktop_items()
     path = desktop_items.get(old_name.lower())
     if not path:
-        return "Не найдено на рабочем столе"
+        return NOT_FOUND
 
     new_path = path.with_name(new_name)
     if new_path.exists():
-        return "Файл с таким именем уже существует"
+        return NAME_TAKEN
 
     new_path = rename_path(path, new_name)
     log(f"rename: {path} -> {new_path}")
@@ -146,47 +262,47 @@ def rename_item(old_name: str, new_name: str) -> str:
 
 def delete_item(name: str, confirm: bool = False) -> str:
     if not name:
-        return "Не указано, что удалять"
+        return NO_DELETE_TARGET
     path = resolve_item(name)
     if not path:
-        return "Не найдено на рабочем столе"
+        return NOT_FOUND
 
     try:
         delete_path(path, confirm=confirm)
     except (PermissionError, IsADirectoryError) as err:
         return str(err)
     log(f"delete: {path}")
-    return "Удалено"
+    return DELETED
 
 
 def create_command(kind: str, name: str, ext: Optional[str] = None) -> str:
     kind_l = kind.lower()
     if kind_l not in ("file", "folder"):
-        return "Тип должен быть file или folder"
+        return BAD_KIND
 
     if kind_l == "folder":
         if not name:
-            return "Укажите имя папки"
+            return FOLDER_NAME_MISSING
         try:
             new_item = create_item("folder", name)
         except FileExistsError:
-            return "Элемент с таким именем уже существует"
+            return ITEM_EXISTS
         except FileNotFoundError:
-            return "Рабочий стол не найден"
+            return DESKTOP_NOT_FOUND
         log(f"create folder: {new_item}")
         return f"Создана папка {new_item.name}"
 
     if not name or not ext:
-        return "Для файла укажите имя и расширение"
+        return FILE_ARGS_MISSING
     ext_l = ext.lower()
     if ext_l not in EXTENSION_ALLOWLIST:
         return f"Недопустимое расширение файла. Допустимые: {', '.join(EXTENSION_ALLOWLIST)}"
     try:
         new_item = create_item("file", name, ext_l)
     except FileExistsError:
-        return "Элемент с таким именем уже существует"
+        return ITEM_EXISTS
     except FileNotFoundError:
-        return "Рабочий стол не найден"
+        return DESKTOP_NOT_FOUND
     except ValueError as err:
         return str(err)
     log(f"create file: {new_item}")
@@ -202,6 +318,6 @@ def list_items(filter_text: Optional[str] = None) -> str:
         item_names = sorted({item.name for item in desktop_items.values()})
 
     if not item_names:
-        return "Элементы не найдены" if filter_text else "Рабочий стол пуст"
+        return NO_MATCHING_ITEMS if filter_text else DESKTOP_EMPTY
     return "Элементы на рабочем столе:\n" + "\n".join(item_names)
         
\ No newline at end of file
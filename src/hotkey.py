@@ -1,6 +1,7 @@
 """Global hotkey hook.
 
-Call `register_hotkey` with a callback to start voice capture.
+Call `register_hotkey` with a callback to start voice capture, or
+`register_push_to_talk` to get separate press/release callbacks.
 """
 
 import keyboard
@@ -10,5 +11,11 @@ def register_hotkey(hotkey: str, callback) -> None:
     keyboard.add_hotkey(hotkey, callback)
 
 
+def register_push_to_talk(key: str, on_press, on_release) -> None:
+    """Call on_press while `key` is held (auto-repeats) and on_release once."""
+    keyboard.on_press_key(key, lambda _event: on_press())
+    keyboard.on_release_key(key, lambda _event: on_release())
+
+
 def clear_hotkeys() -> None:
-    keyboard.unhook_all_hotkeys()
+    keyboard.unhook_all()
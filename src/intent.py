@@ -0,0 +1,389 @@
+"""Offline intent classifier: character n-gram TF-IDF + cosine similarity.
+
+Labeled example utterances per action (data/intents.json) are vectorized
+into L2-normalized TF-IDF rows; a request is assigned the action of its
+most similar example. Slots are then filled from the request text and the
+desktop index, giving a ready `Command` in a few milliseconds with no
+network. `plan_locally` returns None when confidence is below the
+threshold or a required slot is missing, so the caller escalates to the
+LLM.
+
+A misread destructive command cannot be undone, so the classifier only
+plans LOCAL_ACTIONS. delete, rename, close and exit run locally only when
+the rule-based parser matches them exactly (an existing item, "->" for
+rename); requests with a negation or a second verb always go to the LLM.
+The rule-based check needs no numpy, so exact commands skip the model.
+
+Usage: python src/intent.py eval [--threshold 0.08]
+       python src/intent.py train [--output models/intent.npz]
+       python src/intent.py predict "открой телеграм"
+"""
+
+import argparse
+import json
+import math
+import os
+import re
+import sys
+import threading
+import time
+from collections import Counter
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Dict, List, Optional, Sequence, Tuple
+
+from core.desktop import Command
+from tracing import span
+
+EXAMPLES_PATH = Path(__file__).resolve().parent / "data" / "intents.json"
+MODEL_PATH = Path(os.environ.get("INTENT_MODEL", Path(__file__).resolve().parent.parent / "models" / "intent.npz"))
+THRESHOLD = float(os.environ.get("INTENT_THRESHOLD", "0.08"))
+NGRAM_RANGE = (2, 4)
+TOP_K = 2  # a label's score is the mean of its K most similar examples
+# Actions the classifier may plan on its own.
+LOCAL_ACTIONS = ("open", "create", "get", "help")
+NEGATIONS = frozenset(("не", "ни", "нет", "нельзя", "not", "no", "never", "don't", "dont", "n't"))
+CONJUNCTIONS = frozenset(("и", "and"))
+
+_NON_WORD = re.compile(r"[^\w.\->]+")
+_TOKEN = re.compile(r"[\w']+")
+
+
+def normalize(text: str) -> str:
+    return " " + _NON_WORD.sub(" ", text.lower().replace("ё", "е")).strip() + " "
+
+
+def char_ngrams(text: str, ngram_range: Tuple[int, int] = NGRAM_RANGE) -> Counter:
+    padded = normalize(text)
+    grams: Counter = Counter()
+    low, high = ngram_range
+    for size in range(low, high + 1):
+        for start in range(len(padded) - size + 1):
+            grams[padded[start:start + size]] += 1
+    return grams
+
+
+def features(text: str) -> Counter:
+    """N-grams of the whole request, with the leading word counted twice.
+
+    Requests are verb-first ("открой ...", "rename ..."), while the rest is
+    mostly slot values shared by every action, so the verb gets extra weight.
+    """
+    grams = char_ngrams(text)
+    words = normalize(text).split()
+    if words:
+        grams.update(char_ngrams(words[0]))
+    return grams
+
+
+def load_examples(path: Path = EXAMPLES_PATH) -> Tuple[List[str], List[str]]:
+    data = json.loads(path.read_text(encoding="utf-8"))
+    texts: List[str] = []
+    labels: List[str] = []
+    for label, utterances in data.items():
+        texts.extend(utterances)
+        labels.extend([label] * len(utterances))
+    return texts, labels
+
+
+class IntentClassifier:
+    """Nearest-example classifier over TF-IDF character n-grams."""
+
+    def __init__(self):
+        self.vocab: Dict[str, int] = {}
+        self.idf = None
+        self.matrix = None
+        self.labels: List[str] = []
+
+    def fit(self, texts: Sequence[str], labels: Sequence[str]) -> "IntentClassifier":
+        import numpy as np
+
+        counts = [features(text) for text in texts]
+        document_freq: Counter = Counter()
+        for grams in counts:
+            document_freq.update(grams.keys())
+        self.vocab = {gram: index for index, gram in enumerate(sorted(document_freq))}
+        total = len(texts)
+        self.idf = np.array(
+            [math.log((1 + total) / (1 + document_freq[gram])) + 1 for gram in sorted(document_freq)],
+            dtype=np.float32,
+        )
+        self.matrix = np.vstack([self._vector(grams) for grams in counts])
+        self.labels = list(labels)
+        return self
+
+    def _vector(self, grams: Counter):
+        import numpy as np
+
+        vector = np.zeros(len(self.vocab), dtype=np.float32)
+        for gram, count in grams.items():
+            index = self.vocab.get(gram)
+            if index is not None:
+                vector[index] = 1 + math.log(count)
+        vector *= self.idf
+        norm = float(np.linalg.norm(vector))
+        return vector / norm if norm else vector
+
+    def scores(self, text: str) -> Dict[str, float]:
+        """Mean cosine similarity of the TOP_K nearest examples, per label."""
+        similarities = self.matrix @ self._vector(features(text))
+        per_label: Dict[str, List[float]] = {}
+        for label, score in zip(self.labels, similarities.tolist()):
+            per_label.setdefault(label, []).append(score)
+        return {
+            label: sum(sorted(values, reverse=True)[:TOP_K]) / min(TOP_K, len(values))
+            for label, values in per_label.items()
+        }
+
+    def predict(self, text: str) -> Tuple[str, float]:
+        """Return the best label and its confidence.
+
+        Confidence is the margin over the runner-up label: absolute cosine
+        values depend on request length, the margin is what separates
+        "clearly open" from "open or delete?".
+        """
+        ranked = sorted(self.scores(text).items(), key=lambda item: item[1], reverse=True)
+        label, score = ranked[0]
+        runner_up = ranked[1][1] if len(ranked) > 1 else 0.0
+        return label, score - runner_up
+
+    def save(self, path: Path) -> None:
+        import numpy as np
+
+        path.parent.mkdir(parents=True, exist_ok=True)
+        vocab = sorted(self.vocab, key=self.vocab.get)
+        np.savez_compressed(
+            path,
+            vocab=np.array(vocab),
+            idf=self.idf,
+            matrix=self.matrix,
+            labels=np.array(self.labels),
+        )
+
+    @classmethod
+    def load(cls, path: Path) -> "IntentClassifier":
+        import numpy as np
+
+        data = np.load(path)
+        model = cls()
+        model.vocab = {gram: index for index, gram in enumerate(data["vocab"].tolist())}
+        model.idf = data["idf"]
+        model.matrix = data["matrix"]
+        model.labels = data["labels"].tolist()
+        return model
+
+
+_classifier: Optional[IntentClassifier] = None
+_classifier_lock = threading.Lock()
+
+
+def get_classifier() -> IntentClassifier:
+    """Load the trained model if present, otherwise fit on the bundled examples."""
+    global _classifier
+    with _classifier_lock:
+        if _classifier is None:
+            with span("intent.load", trained=MODEL_PATH.exists()):
+                if MODEL_PATH.exists():
+                    _classifier = IntentClassifier.load(MODEL_PATH)
+                else:
+                    _classifier = IntentClassifier().fit(*load_examples())
+        return _classifier
+
+
+# Slot extraction
+
+_KIND_WORDS = {
+    "folder": ("папк", "folder", "каталог", "директори"),
+    "file": ("файл", "file", "документ"),
+}
+_RENAME_SEPARATORS = re.compile(r"\s*->\s*|\s+(?:в|на|to|into)\s+", re.IGNORECASE)
+
+
+def find_desktop_item(text: str) -> Optional[str]:
+    """Return the longest desktop item name mentioned in `text`."""
+    from dekstop_ops import get_desktop_items
+
+    lowered = normalize(text)
+    best: Optional[str] = None
+    for key in get_desktop_items():
+        if normalize(key) in lowered and (best is None or len(key) > len(best)):
+            best = key
+    return best
+
+
+def _extract_create(text: str) -> Optional[dict]:
+    from dekstop_ops import EXTENSION_ALLOWLIST
+
+    words = text.split()
+    for index, word in enumerate(words):
+        lowered = word.lower()
+        kind = next((k for k, stems in _KIND_WORDS.items() if lowered.startswith(stems)), None)
+        if kind is None:
+            continue
+        rest = [w for w in words[index + 1:] if w.lower() not in ("для", "с", "под", "named", "called")]
+        if kind == "folder":
+            return {"kind": "folder", "name": " ".join(rest), "ext": None} if rest else None
+        if len(rest) == 1 and "." in rest[0]:
+            name, _, ext = rest[0].rpartition(".")
+            rest = [name, ext]
+        if len(rest) >= 2 and rest[-1].lower().lstrip(".") in EXTENSION_ALLOWLIST:
+            return {"kind": "file", "name": " ".join(rest[:-1]), "ext": rest[-1].lower().lstrip(".")}
+        return None
+    return None
+
+
+def _extract_rename(text: str) -> Optional[dict]:
+    old = find_desktop_item(text)
+    if old is None:
+        return None
+    parts = _RENAME_SEPARATORS.split(text)
+    new = parts[-1].strip() if len(parts) > 1 else ""
+    if not new or normalize(old) in normalize(new):
+        return None
+    return {"old": old, "new": new}
+
+
+_CLOSE_FILLERS = ("программу", "приложение", "процесс", "app", "the", "program", "application")
+
+
+def _extract_close(text: str) -> Optional[dict]:
+    target = find_desktop_item(text)
+    if target is None:
+        rest = [word for word in normalize(text).split()[1:] if word not in _CLOSE_FILLERS]
+        target = " ".join(rest)
+    return {"target": target} if target else None
+
+
+def extract_slots(action: str, text: str) -> Optional[dict]:
+    """Fill Command args for `action` from the request; None if a slot is missing."""
+    if action in ("open", "delete"):
+        target = find_desktop_item(text)
+        if target is None:
+            return None
+        args: dict = {"target": target}
+        if action == "delete":
+            args["confirm"] = text.lower().rstrip().endswith(" ok")
+        return args
+    if action == "rename":
+        return _extract_rename(text)
+    if action == "create":
+        return _extract_create(text)
+    if action == "get":
+        return {"filter": None}
+    if action == "close":
+        return _extract_close(text)
+    if action in ("help", "exit"):
+        return {}
+    return None
+
+
+@dataclass
+class LocalPlan:
+    command: Optional[Command]
+    action: str
+    confidence: float
+
+
+def classify(text: str) -> LocalPlan:
+    action, confidence = get_classifier().predict(text)
+    args = extract_slots(action, text)
+    command = Command(action, args) if args is not None else None
+    if command is not None and command.validate():
+        command = None
+    return LocalPlan(command, action, confidence)
+
+
+def _tokens(text: str) -> List[str]:
+    tokens = _TOKEN.findall(text.lower().replace("\u2019", "'"))
+    return tokens + [token[-3:] for token in tokens if token.endswith("n't")]
+
+
+def exact_command(text: str) -> Optional[Command]:
+    """The rule-based parse of `text` when it is exact enough to run as is."""
+    from core.desktop import parse_command
+    from dekstop_ops import resolve_item
+
+    parsed = parse_command(text)
+    if not isinstance(parsed, Command) or parsed.validate():
+        return None
+    if parsed.action in ("open", "delete") and resolve_item(parsed.args["target"]) is None:
+        return None
+    if parsed.action == "rename" and ("->" not in text or resolve_item(parsed.args["old"]) is None):
+        return None
+    return parsed
+
+
+def plan_locally(text: str, threshold: float = THRESHOLD) -> Optional[Command]:
+    """Return a Command that is safe to run without the LLM, else None."""
+    tokens = set(_tokens(text))
+    if tokens & NEGATIONS or tokens & CONJUNCTIONS:
+        return None
+    exact = exact_command(text)
+    if exact is not None:
+        return exact
+    plan = classify(text)
+    if plan.action not in LOCAL_ACTIONS or plan.command is None or plan.confidence < threshold:
+        return None
+    return plan.command
+
+
+def evaluate(threshold: float = THRESHOLD) -> dict:
+    """Leave-one-out accuracy and coverage of the bundled examples."""
+    from stats import summarize
+
+    texts, labels = load_examples()
+    correct = covered = covered_correct = 0
+    latencies: List[float] = []
+    for index, (text, label) in enumerate(zip(texts, labels)):
+        model = IntentClassifier().fit(texts[:index] + texts[index + 1:], labels[:index] + labels[index + 1:])
+        started = time.perf_counter()
+        predicted, confidence = model.predict(text)
+        latencies.append((time.perf_counter() - started) * 1000)
+        correct += predicted == label
+        if confidence >= threshold:
+            covered += 1
+            covered_correct += predicted == label
+    total = len(texts)
+    return {
+        "examples": total,
+        "accuracy": correct / total if total else None,
+        "threshold": threshold,
+        "coverage": covered / total if total else None,
+        "precision_above_threshold": covered_correct / covered if covered else None,
+        "predict_ms": summarize(latencies, (50, 95, 99)),
+    }
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="Offline intent classifier tools")
+    sub = parser.add_subparsers(dest="command", required=True)
+    train = sub.add_parser("train", help="fit on data/intents.json and save the model")
+    train.add_argument("--output", type=Path, default=MODEL_PATH)
+    evaluate_cmd = sub.add_parser("eval", help="leave-one-out evaluation")
+    evaluate_cmd.add_argument("--threshold", type=float, default=THRESHOLD)
+    predict = sub.add_parser("predict", help="classify one request")
+    predict.add_argument("text", nargs="+")
+    args = parser.parse_args(argv)
+
+    if args.command == "train":
+        IntentClassifier().fit(*load_examples()).save(args.output)
+        print(f"Saved {args.output}")
+    elif args.command == "eval":
+        print(json.dumps(evaluate(args.threshold), ensure_ascii=False, indent=2))
+    else:
+        text = " ".join(args.text)
+        get_classifier()
+        started = time.perf_counter()
+        plan = classify(text)
+        elapsed = (time.perf_counter() - started) * 1000
+        print(json.dumps({
+            "action": plan.action,
+            "confidence": plan.confidence,
+            "command": plan.command.__dict__ if plan.command else None,
+            "ms": elapsed,
+        }, ensure_ascii=False))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
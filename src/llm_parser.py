@@ -8,18 +8,60 @@ fallback to the rule-based parser.
 import json
 import os
 import re
-from typing import List, Union
+import threading
+from collections import OrderedDict
+from typing import List, Optional, Union
 
-import requests
-
-from core.desktop import Command, parse_command
+from core.desktop import EMPTY_COMMAND, Command, parse_command
 from dekstop_ops import get_desktop_items
+from pipeline import split_clauses
+from tracing import span
 
 API_KEY = os.environ.get("AI_API_KEY", "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")
 API_BASE = os.environ.get("AI_API_BASE", "https://openrouter.ai/api/v1")
 MODEL_NAME = os.environ.get("AI_MODEL", "allenai/molmo-2-8b:free")
 OR_REFERER = os.environ.get("AI_HTTP_REFERER")
 OR_TITLE = os.environ.get("AI_HTTP_TITLE")
+PLAN_CACHE_SIZE = int(os.environ.get("AI_PLAN_CACHE_SIZE", "128"))
+# Safe single-step requests are planned locally (see intent.py) before
+# falling back to the LLM; the threshold itself is INTENT_THRESHOLD.
+INTENT_ENABLED = os.environ.get("INTENT_ENABLED", "1") != "0"
+
+# One pooled session keeps TLS connections to the API alive between calls;
+# created on first use so text commands without an API key never import requests.
+_session = None
+_session_lock = threading.Lock()
+# Prompt (request text + desktop inventory) -> parsed steps.
+_plan_cache: "OrderedDict[str, List[dict]]" = OrderedDict()
+_plan_cache_lock = threading.Lock()
+
+
+def _get_session():
+	global _session
+	with _session_lock:
+		if _session is None:
+			import requests
+
+			_session = requests.Session()
+		return _session
+
+
+def _cached_plan(prompt: str) -> Optional[List[dict]]:
+	with _plan_cache_lock:
+		steps = _plan_cache.get(prompt)
+		if steps is not None:
+			_plan_cache.move_to_end(prompt)
+		return steps
+
+
+def _remember_plan(prompt: str, steps: List[dict]) -> None:
+	if PLAN_CACHE_SIZE <= 0:
+		return
+	with _plan_cache_lock:
+		_plan_cache[prompt] = steps
+		_plan_cache.move_to_end(prompt)
+		while len(_plan_cache) > PLAN_CACHE_SIZE:
+			_plan_cache.popitem(last=False)
 
 
 def _desktop_inventory() -> str:
@@ -34,11 +76,12 @@ def _build_prompt(user_text: str) -> str:
 	return (
 		"You are a command planner for a Windows desktop assistant. "
 		"Produce ONLY JSON array of steps with no extra text. "
-		"Allowed actions: open, rename, delete, create, get, help, exit. "
+		"Allowed actions: open, rename, delete, create, get, close, help, exit. "
 		"For create use args: kind ('file'|'folder'), name, ext (for files). "
 		"For delete use args: target, confirm (true/false). "
 		"For rename use args: old, new. "
 		"For open/get use args: target/filter. "
+		"For close (quit a running program) use args: target. "
 		"If the request is unclear, return an empty array []. "
 		f"User request: {user_text} "
 		f"Context: {_desktop_inventory()}"
@@ -64,11 +107,37 @@ def _call_llm(text: str) -> Union[List[Command], str]:
 	if not API_KEY:
 		return "Пустой ключ API. Установите AI_API_KEY"
 
+	with span("llm.call", model=MODEL_NAME) as current:
+		prompt = _build_prompt(text)
+		steps_json = _cached_plan(prompt)
+		current.set(cached=steps_json is not None)
+		if steps_json is None:
+			steps_json = _request_plan(prompt)
+			if isinstance(steps_json, str):
+				current.set(error=steps_json)
+				return steps_json
+
+	commands: List[Command] = []
+	for step in steps_json:
+		if not isinstance(step, dict):
+			continue
+		action = step.get("action", "")
+		args = step.get("args", {}) if isinstance(step.get("args", {}), dict) else {}
+		commands.append(Command(action, dict(args)))
+
+	if not commands:
+		return "LLM не вернул шаги"
+
+	_remember_plan(prompt, steps_json)
+	return commands
+
+
+def _request_plan(prompt: str) -> Union[List[dict], str]:
 	payload = {
 		"model": MODEL_NAME,
 		"messages": [
 			{"role": "system", "content": "You output only JSON arrays of steps."},
-			{"role": "user", "content": _build_prompt(text)},
+			{"role": "user", "content": prompt},
 		],
 		"temperature": 0.2,
 	}
@@ -84,8 +153,10 @@ def _call_llm(text: str) -> Union[List[Command], str]:
 
 	url = API_BASE.rstrip("/") + "/chat/completions"
 
+	import requests
+
 	try:
-		resp = requests.post(url, headers=headers, json=payload, timeout=30)
+		resp = _get_session().post(url, headers=headers, json=payload, timeout=30)
 	except requests.RequestException as exc:
 		return f"Ошибка сети при обращении к LLM: {exc}"
 
@@ -100,29 +171,32 @@ def _call_llm(text: str) -> Union[List[Command], str]:
 	)
 
 	steps_json = _extract_json(content)
-	if steps_json is None:
+	if not isinstance(steps_json, list):
 		return "Не удалось разобрать ответ LLM"
+	return steps_json
 
-	commands: List[Command] = []
-	for step in steps_json:
-		if not isinstance(step, dict):
-			continue
-		action = step.get("action", "")
-		args = step.get("args", {}) if isinstance(step.get("args", {}), dict) else {}
-		commands.append(Command(action, args))
 
-	if not commands:
-		return "LLM не вернул шаги"
+def _plan_offline(text: str) -> Optional[List[Command]]:
+	"""Single-step requests the local intent classifier is confident about."""
+	if not INTENT_ENABLED or len(split_clauses(text)) != 1:
+		return None
+	from intent import plan_locally
 
-	return commands
+	with span("intent.classify") as current:
+		command = plan_locally(text)
+		current.set(local=command is not None)
+	return [command] if command is not None else None
 
 
 def parse_with_llm(text: str) -> Union[List[Command], str]:
 	"""Convert free-form text into a list of Commands via LLM or fallback parser."""
 	if not text.strip():
-		return "Пустая команда"
+		return EMPTY_COMMAND
 
 	if API_KEY:
+		local = _plan_offline(text)
+		if local is not None:
+			return local
 		llm_result = _call_llm(text)
 		if isinstance(llm_result, list):
 			return llm_result
@@ -132,5 +206,8 @@ def parse_with_llm(text: str) -> Union[List[Command], str]:
 	# No API key: direct fallback, but signal that LLM is disabled
 	parsed = parse_command(text)
 	if isinstance(parsed, str):
+		local = _plan_offline(text)
+		if local is not None:
+			return local
 		return f"LLM отключена (нет AI_API_KEY). {parsed}"
 	return [parsed]
@@ -1,27 +1,177 @@
+"""Session logging.
+
+`log()` only puts the record on a queue; a QueueListener thread formats it
+and does the disk I/O, so callers (often the Qt UI thread) never block on
+the file. The session file rotates by size (LOG_MAX_BYTES) or time
+(LOG_ROTATE_WHEN, e.g. "midnight"), keeps LOG_BACKUP_COUNT rotated files,
+optionally gzipped (LOG_COMPRESS=1), and old sessions are pruned beyond
+LOG_KEEP_SESSIONS or LOG_KEEP_DAYS.
+
+`shutdown_logger()` (also registered with atexit) drains the queue before
+returning; anything logged afterwards is written synchronously.
+"""
+
+import atexit
+import gzip
 import logging
+import logging.handlers
+import os
+import queue
+import shutil
+import time
+from datetime import datetime
 from pathlib import Path
 from typing import Optional
 
+LOG_MAX_BYTES = int(os.environ.get("LOG_MAX_BYTES", str(5 * 1024 * 1024)))
+LOG_ROTATE_WHEN = os.environ.get("LOG_ROTATE_WHEN") or None
+LOG_BACKUP_COUNT = int(os.environ.get("LOG_BACKUP_COUNT", "5"))
+LOG_COMPRESS = os.environ.get("LOG_COMPRESS", "0") == "1"
+LOG_KEEP_SESSIONS = int(os.environ.get("LOG_KEEP_SESSIONS", "20"))
+LOG_KEEP_DAYS = float(os.environ.get("LOG_KEEP_DAYS", "14"))
+
 _logger: Optional[logging.Logger] = None
 _log_path: Optional[Path] = None
+_listener: Optional[logging.handlers.QueueListener] = None
+_queue_handler: Optional[logging.Handler] = None
+_file_handler: Optional[logging.Handler] = None
+
+
+class _QueueHandler(logging.handlers.QueueHandler):
+    """Enqueue the record as is; the listener thread does all formatting.
+
+    The stock prepare() formats and copies every record on the caller's
+    thread. That is only needed when other handlers share the record or it
+    carries a traceback, and neither applies to plain `log()` calls.
+    """
 
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        if record.exc_info or record.stack_info:
+            return super().prepare(record)
+        return record
 
-def init_logger(log_path: Path) -> None:
-    """Configure a module-level logger writing to the given path."""
-    global _logger, _log_path
+
+def _gzip_rotator(source: str, dest: str) -> None:
+    with open(source, "rb") as src, gzip.open(dest, "wb") as dst:
+        shutil.copyfileobj(src, dst)
+    os.remove(source)
+
+
+def _file_handler_for(log_path: Path, compress: bool) -> logging.Handler:
+    if LOG_ROTATE_WHEN:
+        handler: logging.handlers.BaseRotatingHandler = logging.handlers.TimedRotatingFileHandler(
+            log_path, when=LOG_ROTATE_WHEN, backupCount=LOG_BACKUP_COUNT, encoding="utf-8", delay=True
+        )
+    else:
+        handler = logging.handlers.RotatingFileHandler(
+            log_path, maxBytes=LOG_MAX_BYTES, backupCount=LOG_BACKUP_COUNT, encoding="utf-8", delay=True
+        )
+    if compress:
+        handler.namer = lambda name: name + ".gz"
+        handler.rotator = _gzip_rotator
+    return handler
+
+
+def init_logger(log_path: Path, compress: Optional[bool] = None) -> None:
+    """Configure the module-level logger to write to `log_path` in the background."""
+    global _logger, _log_path, _listener, _queue_handler, _file_handler
+    shutdown_logger()
+    if _file_handler is not None:
+        _file_handler.close()
     _log_path = log_path
     _logger = logging.getLogger("voice_assistant")
     _logger.handlers.clear()
     _logger.setLevel(logging.INFO)
 
-    handler = logging.FileHandler(log_path, encoding="utf-8")
+    handler = _file_handler_for(log_path, LOG_COMPRESS if compress is None else compress)
     handler.setLevel(logging.INFO)
     formatter = logging.Formatter("%(asctime)s [%(levelname)s] %(message)s")
     handler.setFormatter(formatter)
 
-    _logger.addHandler(handler)
+    records: "queue.SimpleQueue[logging.LogRecord]" = queue.SimpleQueue()
+    _queue_handler = _QueueHandler(records)
+    _file_handler = handler
+    _listener = logging.handlers.QueueListener(records, handler, respect_handler_level=True)
+    _listener.start()
+
+    _logger.addHandler(_queue_handler)
     _logger.propagate = False
     _logger.info("Logger initialized")
+    prune_sessions(log_path.parent, keep=LOG_KEEP_SESSIONS, max_age_days=LOG_KEEP_DAYS, current=log_path)
+
+
+def shutdown_logger() -> None:
+    """Flush queued records and switch the logger to direct writes."""
+    global _listener, _queue_handler
+    listener, _listener = _listener, None
+    if listener is None:
+        return
+    listener.stop()  # processes everything already queued, then joins
+    if _logger is not None and _queue_handler is not None:
+        _logger.removeHandler(_queue_handler)
+        _logger.addHandler(_file_handler)
+    _queue_handler = None
+    if _file_handler is not None:
+        _file_handler.flush()
+
+
+atexit.register(shutdown_logger)
+
+
+def _session_id(path: Path) -> str:
+    # session-20240101-120000.log.2.gz / .trace.jsonl -> session-20240101-120000
+    # profile-session-20240101-120000 (profiling.py) -> session-20240101-120000
+    return path.name.split(".", 1)[0].replace("profile-", "", 1)
+
+
+def prune_sessions(
+    logs_dir: Path,
+    keep: int = LOG_KEEP_SESSIONS,
+    max_age_days: float = LOG_KEEP_DAYS,
+    current: Optional[Path] = None,
+) -> int:
+    """Delete files and profile directories of sessions beyond the newest `keep`
+    or older than `max_age_days`."""
+    sessions: dict = {}
+    for pattern in ("session-*", "profile-session-*"):
+        for path in Path(logs_dir).glob(pattern):
+            sessions.setdefault(_session_id(path), []).append(path)
+    current_id = _session_id(current) if current is not None else None
+    cutoff = time.time() - max_age_days * 86400 if max_age_days > 0 else None
+    removed = 0
+    for index, session in enumerate(sorted(sessions, reverse=True)):
+        if session == current_id:
+            continue
+        files = sessions[session]
+        too_many = keep > 0 and index >= keep
+        too_old = cutoff is not None and max(_mtime(path) for path in files) < cutoff
+        if not (too_many or too_old):
+            continue
+        for path in files:
+            try:
+                if path.is_dir():
+                    shutil.rmtree(path)
+                else:
+                    path.unlink()
+                removed += 1
+            except OSError:
+                pass
+    return removed
+
+
+def _mtime(path: Path) -> float:
+    try:
+        return path.stat().st_mtime
+    except OSError:
+        return 0.0
+
+
+def new_session_log_path(logs_dir: Optional[Path] = None) -> Path:
+    """Return logs/session-<timestamp>.log, creating the logs directory."""
+    logs_dir = Path(logs_dir or os.path.join(os.getcwd(), "logs"))
+    logs_dir.mkdir(parents=True, exist_ok=True)
+    timestamp = datetime.now().strftime("%Y%m%d-%H%M%S")
+    return logs_dir / f"session-{timestamp}.log"
 
 
 def get_logger() -> logging.Logger:
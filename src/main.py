@@ -1,24 +1,51 @@
+"""Entry point: the Qt window by default, `--headless` for the text CLI.
+
+Heavy dependencies (PyQt6, numpy/sounddevice, whisper/torch, requests) are
+imported only by the feature that needs them, so a text command never pays
+for the GUI or speech stack.
+"""
+
+import argparse
 import sys
-from ui.app import init
-from asr import transcribe_once
-from core.desktop import Command, execute, help_text, parse_command
-from llm_parser import parse_with_llm
-from pipeline import coerce_steps, run_plan
+import threading
+from typing import Optional
+
+import profiling
+from pipeline import CANCELLED, coerce_steps, run_plan
+
 
+@profiling.profiled
+def parse_and_run(text: str, cancel: Optional[threading.Event] = None) -> str:
+    from llm_parser import parse_with_llm
 
-def parse_and_run(text: str) -> str:
     plan = parse_with_llm(text)
     if isinstance(plan, str):
         # error string from parser
         return plan
+    if cancel is not None and cancel.is_set():
+        return CANCELLED
     commands = coerce_steps(plan)
-    return run_plan(commands)
+    return run_plan(commands, cancel)
 
 def main() -> None:
-    init(parse_and_run)
+    if "--headless" in sys.argv[1:]:
+        from cli import main as cli_main
+
+        sys.exit(cli_main([arg for arg in sys.argv[1:] if arg != "--headless"]))
+
+    parser = argparse.ArgumentParser(description="Voice assistant (GUI)")
+    parser.add_argument("--profile", nargs="?", type=int, const=1, metavar="N",
+                        help="profile every Nth command into logs/profile-<session>")
+    args = parser.parse_args()
+    if args.profile:
+        profiling.enable(args.profile)
+
+    from ui.app import init
+
+    init()
 
 
 if __name__ == "__main__":
     if sys.platform != "win32":
-        print("Предупреждение: код рассчитан на Windows")
+        print("Предупреждение: код рассчитан на Windows", file=sys.stderr)
     main()
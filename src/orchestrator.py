@@ -0,0 +1,417 @@
+"""Asyncio orchestrator: capture -> ASR -> plan -> execute -> speak.
+
+Each stage is a coroutine reading from a bounded asyncio.Queue and feeding
+the next one, so a slow downstream stage makes producers wait instead of
+piling up work. Blocking work (recording, Whisper, the LLM call, desktop
+operations, playback) runs in the default executor, which lets stages
+overlap: the result of step 1 is spoken while step 2 executes, and the next
+recording can start while the previous one is still being transcribed.
+
+`Orchestrator` lives on an event loop; `OrchestratorThread` runs one on a
+background thread with a blocking API for the Qt UI.
+"""
+
+import asyncio
+import concurrent.futures
+import contextvars
+import itertools
+import threading
+import time
+from dataclasses import dataclass, field
+from typing import Any, Callable, Dict, List, Optional, Tuple, Union
+
+import profiling
+from core.desktop import Command
+from logger import log
+from pipeline import TranscriptionError, cancelled_result, coerce_steps, run_step
+
+STAGES = ("capture", "asr", "plan", "execute", "speak")
+
+EventCallback = Callable[[str, Any], None]
+
+
+@dataclass
+class Request:
+    id: int
+    text: Optional[str] = None
+    audio: Any = None
+    record_sec: float = 5.0
+    cancel: threading.Event = field(default_factory=threading.Event)
+    on_event: Optional[EventCallback] = None
+    plan: Optional[List[Command]] = None
+    results: List[str] = field(default_factory=list)
+    timings: Dict[str, float] = field(default_factory=dict)
+    future: Optional[asyncio.Future] = None
+    active_stage: Optional[Tuple[str, float]] = None
+    profile: Optional[profiling.CommandProfile] = None
+
+    def close_stage(self, only: Optional[str] = None) -> None:
+        """Add the time spent in the running stage (if it is `only`) to `timings`."""
+        if self.active_stage is not None and only in (None, self.active_stage[0]):
+            name, started = self.active_stage
+            self.timings[name] = self.timings.get(name, 0.0) + time.perf_counter() - started
+            self.active_stage = None
+
+    def emit(self, event: str, payload: Any = None) -> None:
+        if self.on_event is not None:
+            self.on_event(event, payload)
+
+
+@dataclass
+class Speech:
+    request: Request
+    text: str
+
+    @property
+    def cancel(self) -> threading.Event:
+        return self.request.cancel
+
+
+def _default_capture(duration_sec: float):
+    from asr import _record_audio
+
+    return _record_audio(duration_sec)
+
+
+def _default_transcribe(audio) -> str:
+    from asr import transcribe_audio
+
+    return transcribe_audio(audio)
+
+
+def _default_plan(text: str) -> Union[List[Command], str]:
+    from llm_parser import parse_with_llm
+
+    plan = parse_with_llm(text)
+    if isinstance(plan, str):
+        return plan
+    return coerce_steps(plan)
+
+
+class Orchestrator:
+    """Runs requests through the stage pipeline on the current event loop."""
+
+    def __init__(
+        self,
+        plan: Callable[[str], Union[List[Command], str]] = _default_plan,
+        execute: Callable[[Command], Tuple[str, bool]] = run_step,
+        transcribe: Callable[[Any], str] = _default_transcribe,
+        capture: Callable[[float], Any] = _default_capture,
+        speak: Optional[Callable[[str], None]] = None,
+        stop_speech: Optional[Callable[[], None]] = None,
+        queue_size: int = 2,
+    ):
+        self._plan = plan
+        self._execute = execute
+        self._transcribe = transcribe
+        self._capture = capture
+        self._speak = speak
+        self._stop_speech = stop_speech
+        self._queue_size = queue_size
+        self._ids = itertools.count(1)
+        self._queues: Dict[str, asyncio.Queue] = {}
+        self._tasks: List[asyncio.Task] = []
+        self._current: Dict[str, Tuple[Any, asyncio.Future]] = {}
+        self._running = False
+
+    async def start(self) -> None:
+        if self._running:
+            return
+        self._running = True
+        self._queues = {name: asyncio.Queue(maxsize=self._queue_size) for name in STAGES}
+        handlers = {
+            "capture": self._do_capture,
+            "asr": self._do_asr,
+            "plan": self._do_plan,
+            "execute": self._do_execute,
+            "speak": self._do_speak,
+        }
+        self._tasks = [
+            asyncio.create_task(self._stage_loop(name, handlers[name]), name=f"stage-{name}")
+            for name in STAGES
+        ]
+
+    async def stop(self) -> None:
+        """Cancel the stage tasks, resolving every request still in the pipeline.
+
+        Queued requests and those a stage is working on are finished as
+        cancelled right away: after shutdown no stage would ever finish them,
+        and callers waiting on `request.future` must not hang.
+        """
+        self._running = False
+        self.cancel_all()
+        for item, _work in list(self._current.values()):
+            request = getattr(item, "request", item)
+            self._finish(request, self._cancelled(request))
+        for task in self._tasks:
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+        self._tasks = []
+
+    async def submit_text(
+        self,
+        text: str,
+        cancel: Optional[threading.Event] = None,
+        on_event: Optional[EventCallback] = None,
+    ) -> Request:
+        request = self._new_request(cancel, on_event)
+        request.text = text
+        await self._queues["plan"].put(request)
+        return request
+
+    async def submit_voice(
+        self,
+        audio: Any = None,
+        record_sec: float = 5.0,
+        cancel: Optional[threading.Event] = None,
+        on_event: Optional[EventCallback] = None,
+    ) -> Request:
+        """Queue a voice request; without `audio` it is recorded first."""
+        request = self._new_request(cancel, on_event)
+        request.audio = audio
+        request.record_sec = record_sec
+        await self._queues["capture" if audio is None else "asr"].put(request)
+        return request
+
+    async def run_text(self, text: str, **kwargs) -> str:
+        request = await self.submit_text(text, **kwargs)
+        return await request.future
+
+    def cancel_request(self, request: Request) -> None:
+        """Cancel one request wherever it currently is in the pipeline.
+
+        Blocking work cannot be interrupted on its executor thread, so a
+        request whose capture, ASR, plan or execute step is running resolves
+        only once that step has returned; the result then lists the steps
+        that completed. Speech is stopped right away.
+        """
+        request.cancel.set()
+        running = False
+        for name, (item, work) in list(self._current.items()):
+            if getattr(item, "request", item) is not request:
+                continue
+            if name == "speak":
+                self.cancel_stage(name)
+            else:
+                running = True
+        if not running:
+            self._finish(request, self._cancelled(request))
+
+    def cancel_stage(self, name: str) -> None:
+        """Abandon whatever the given stage is awaiting right now.
+
+        Only the await is cancelled; blocking work in the executor keeps
+        running, so this is meant for the speak stage, which `stop_speech`
+        interrupts.
+        """
+        current = self._current.get(name)
+        if current is not None:
+            current[1].cancel()
+        if name == "speak" and self._stop_speech is not None:
+            self._stop_speech()
+
+    def cancel_all(self) -> None:
+        for name in STAGES:
+            for item in self._drain(name):
+                item.cancel.set()
+                if isinstance(item, Request):
+                    self._finish(item, self._cancelled(item))
+                # A dropped Speech belongs to a request another stage finishes.
+            current = self._current.get(name)
+            if current is not None:
+                current[0].cancel.set()
+                if name == "speak":
+                    self.cancel_stage(name)
+
+    @staticmethod
+    def _cancelled(request: Request) -> str:
+        return cancelled_result(request.results, len(request.plan or []))
+
+    def _new_request(self, cancel, on_event) -> Request:
+        if not self._running:
+            raise RuntimeError("Orchestrator is not started")
+        request = Request(id=next(self._ids), cancel=cancel or threading.Event(), on_event=on_event)
+        request.future = asyncio.get_running_loop().create_future()
+        request.profile = profiling.sample()
+        return request
+
+    def _drain(self, name: str) -> List[Any]:
+        queue = self._queues.get(name)
+        items = []
+        while queue is not None and not queue.empty():
+            items.append(queue.get_nowait())
+        return items
+
+    def _finish(self, request: Request, result: str) -> None:
+        request.close_stage()
+        if request.future is not None and not request.future.done():
+            if request.profile is not None:
+                request.profile.finish(request.text or "")
+            request.future.set_result(result)
+            request.emit("finished", result)
+
+    async def _run_blocking(self, fn, *args):
+        # Run in a copy of this task's context so spans opened in the worker
+        # thread nest under the stage's current span.
+        context = contextvars.copy_context()
+        return await asyncio.get_running_loop().run_in_executor(None, context.run, fn, *args)
+
+    async def _run_profiled(self, request: Request, fn, *args):
+        if request.profile is None:
+            return await self._run_blocking(fn, *args)
+        return await self._run_blocking(request.profile.run, fn, *args)
+
+    async def _stage_loop(self, name: str, handler) -> None:
+        queue = self._queues[name]
+        while True:
+            item = await queue.get()
+            request = getattr(item, "request", item)
+            if item.cancel.is_set():
+                self._finish(request, self._cancelled(request))
+                continue
+            if item is request:
+                request.active_stage = (name, time.perf_counter())
+            work = asyncio.ensure_future(handler(item))
+            self._current[name] = (item, work)
+            try:
+                await work
+            except asyncio.CancelledError:
+                if not self._running:
+                    raise
+                if name != "speak":
+                    self._finish(request, self._cancelled(request))
+            except Exception as exc:
+                log(f"Unhandled error (stage {name}): {exc}")
+                self._finish(request, "Произошла ошибка")
+            finally:
+                self._current.pop(name, None)
+                if item is request:
+                    request.close_stage(only=name)
+            if item is request and request.cancel.is_set():
+                # The step that was running when the request got cancelled
+                # has returned; now the request can honestly report it.
+                self._finish(request, self._cancelled(request))
+
+    async def _do_capture(self, request: Request) -> None:
+        request.emit("progress", "capture")
+        request.audio = await self._run_blocking(self._capture, request.record_sec)
+        await self._forward(request, "asr")
+
+    async def _do_asr(self, request: Request) -> None:
+        request.emit("progress", "asr")
+        try:
+            request.text = await self._run_blocking(self._transcribe, request.audio)
+        except TranscriptionError as exc:
+            # ffmpeg or the model is missing: tell the user, plan nothing.
+            log(f"Transcription failed: {exc}")
+            request.audio = None
+            await self._say(request, str(exc))
+            self._finish(request, str(exc))
+            return
+        request.audio = None
+        request.emit("recognized", request.text)
+        if not request.text:
+            self._finish(request, "")
+            return
+        await self._forward(request, "plan")
+
+    async def _do_plan(self, request: Request) -> None:
+        request.emit("progress", "plan")
+        plan = await self._run_profiled(request, self._plan, request.text)
+        if isinstance(plan, str):
+            await self._say(request, plan)
+            self._finish(request, plan)
+            return
+        request.plan = plan
+        await self._forward(request, "execute")
+
+    async def _do_execute(self, request: Request) -> None:
+        request.emit("progress", "execute")
+        for step in request.plan or []:
+            if request.cancel.is_set():
+                self._finish(request, self._cancelled(request))
+                return
+            output, ok = await self._run_profiled(request, self._execute, step)
+            request.results.append(output)
+            request.emit("step", output)
+            if output != "exit":
+                await self._say(request, output)
+            if not ok:
+                break
+        self._finish(request, "\n".join(request.results))
+
+    async def _forward(self, request: Request, stage: str) -> None:
+        # Time spent waiting in the next queue belongs to no stage.
+        request.close_stage()
+        await self._queues[stage].put(request)
+
+    async def _say(self, request: Request, text: str) -> None:
+        if self._speak is not None and text:
+            await self._queues["speak"].put(Speech(request, text))
+
+    async def _do_speak(self, item: Speech) -> None:
+        await self._run_blocking(self._speak, item.text)
+
+
+class OrchestratorThread:
+    """An Orchestrator on its own event loop thread, with a blocking API."""
+
+    def __init__(self, **kwargs):
+        self._loop = asyncio.new_event_loop()
+        self.orchestrator = Orchestrator(**kwargs)
+        self._thread = threading.Thread(target=self._loop.run_forever, name="orchestrator", daemon=True)
+        self._closed = threading.Event()
+        self._thread.start()
+        self._call(self.orchestrator.start())
+
+    def _call(self, coro):
+        return asyncio.run_coroutine_threadsafe(coro, self._loop).result()
+
+    def run_text(self, text: str, cancel: Optional[threading.Event] = None, on_event: Optional[EventCallback] = None) -> str:
+        request = self._call(self.orchestrator.submit_text(text, cancel=cancel, on_event=on_event))
+        return self._wait(request)
+
+    def run_voice(
+        self,
+        record_sec: float = 5.0,
+        cancel: Optional[threading.Event] = None,
+        on_event: Optional[EventCallback] = None,
+    ) -> str:
+        request = self._call(self.orchestrator.submit_voice(record_sec=record_sec, cancel=cancel, on_event=on_event))
+        return self._wait(request)
+
+    def _wait(self, request: Request) -> str:
+        """Block until the request finishes.
+
+        Once `request.cancel` is set the request is cancelled in the
+        orchestrator, and this still waits for the step that is running to
+        return, so the result says what actually happened. After `close`
+        it gives up and reports the request as cancelled.
+        """
+        future = asyncio.run_coroutine_threadsafe(self._result(request), self._loop)
+        cancelling = False
+        while True:
+            try:
+                return future.result(timeout=0.05)
+            except concurrent.futures.TimeoutError:
+                if self._closed.is_set() or not self._loop.is_running():
+                    # stop() resolved the request; its wake-up may never run now.
+                    if request.future.done():
+                        return request.future.result()
+                    return self.orchestrator._cancelled(request)
+                if request.cancel.is_set() and not cancelling:
+                    cancelling = True
+                    self._loop.call_soon_threadsafe(self.orchestrator.cancel_request, request)
+
+    @staticmethod
+    async def _result(request: Request) -> str:
+        return await request.future
+
+    def cancel_all(self) -> None:
+        self._loop.call_soon_threadsafe(self.orchestrator.cancel_all)
+
+    def close(self) -> None:
+        self._call(self.orchestrator.stop())
+        self._closed.set()
+        self._loop.call_soon_threadsafe(self._loop.stop)
+        self._thread.join(timeout=2)
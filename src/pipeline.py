@@ -1,18 +1,65 @@
-from typing import List, Union
+import re
+import threading
+import time
+from typing import Callable, List, Optional, Tuple, Union
 
-from core.desktop import Command, execute
+from core.desktop import Command, execute, parse_command
+from tracing import span
 
+# A bare "а"/"и" before "потом" stays in the previous clause: it may be a
+# name ("создай папку а потом ..."); after a comma it is a connector.
+CLAUSE_SEPARATORS = re.compile(
+    r"\s*(?:[,;]|\.(?=\s|$))+\s*(?:(?:а|и)\s+(?=(?:потом|затем|then)\s))?"
+    r"|\s+(?=(?:потом|затем|then)\s)",
+    re.IGNORECASE,
+)
+CLAUSE_CONNECTOR = re.compile(r"^(?:(?:а|и)\s+)?(?:потом|затем|then)\s+", re.IGNORECASE)
+# Actions safe to run before the user has finished speaking.
+FAST_PATH_ACTIONS = ("open", "create", "get", "help")
+CANCELLED = "Отменено"
 
-def run_plan(steps: List[Command]) -> str:
-    """Validate and execute a list of commands, returning combined output."""
+
+class TranscriptionError(RuntimeError):
+    """Speech could not be transcribed; the message is shown to the user.
+
+    Defined here rather than in asr.py so the orchestrator can handle it
+    without importing numpy and Whisper.
+    """
+
+
+def cancelled_result(done: List[str], total: int) -> str:
+    """Outputs of the steps that ran before a cancellation, then how many did."""
+    if not done:
+        return CANCELLED
+    return "\n".join(done + [f"{CANCELLED}: выполнено шагов {len(done)} из {total}"])
+
+
+def run_plan(steps: List[Command], cancel: Optional[threading.Event] = None) -> str:
+    """Validate and execute a list of commands, returning combined output.
+
+    If `cancel` gets set, the remaining steps are skipped; a running step
+    always completes first.
+    """
     results: List[str] = []
-    for step in steps:
+    with span("plan.run", steps=len(steps)):
+        for step in steps:
+            if cancel is not None and cancel.is_set():
+                return cancelled_result(results, len(steps))
+            output, ok = run_step(step)
+            results.append(output)
+            if not ok:
+                break
+    return "\n".join(results)
+
+
+def run_step(step: Command) -> Tuple[str, bool]:
+    """Validate and execute one command; False means the plan should stop."""
+    with span("plan.step", action=step.action) as current:
         error = step.validate()
         if error:
-            results.append(error)
-            break
-        results.append(execute(step))
-    return "\n".join(results)
+            current.set(ok=False)
+            return error, False
+        return execute(step), True
 
 
 def command_from_dict(step: dict) -> Command:
@@ -28,4 +75,64 @@ def coerce_steps(steps: List[Union[Command, dict, str]]) -> List[Command]:
             prepared.append(command_from_dict(step))
         else:
             raise ValueError("Unsupported step type")
-    return prepared
\ No newline at end of file
+    return prepared
+
+def split_clauses(text: str) -> List[str]:
+    """Split a multi-step utterance on commas and "потом"/"затем"/"then"."""
+    clauses = (CLAUSE_CONNECTOR.sub("", part.strip()) for part in CLAUSE_SEPARATORS.split(text))
+    return [clause for clause in clauses if clause]
+
+
+class ClauseRunner:
+    """Execute leading clauses of a growing transcript as soon as they are final.
+
+    `feed` receives committed (stable) text while the user is still talking;
+    every clause followed by a separator is parsed with the rule-based parser
+    and, if it is a safe fast-path command, executed right away. The first
+    clause that cannot take the fast path stops early execution; `finish`
+    sends it and everything after it through `run_text` (the full planner).
+    """
+
+    def __init__(self, run_text: Optional[Callable[[str], str]] = None):
+        self._run_text = run_text
+        self._done = 0
+        self._blocked = False
+        self.results: List[str] = []
+        self.first_action_at: Optional[float] = None
+
+    def feed(self, stable_text: str, cancel: Optional[threading.Event] = None) -> None:
+        """Execute newly finished clauses; stops between clauses once `cancel` is set."""
+        clauses = split_clauses(stable_text)
+        # The last clause may still be growing unless punctuation closes it.
+        if not re.search(r"[,;.]\s*$", stable_text):
+            clauses = clauses[:-1]
+        for clause in clauses[self._done:]:
+            if self._blocked or (cancel is not None and cancel.is_set()):
+                return
+            parsed = parse_command(clause)
+            if (
+                not isinstance(parsed, Command)
+                or parsed.action not in FAST_PATH_ACTIONS
+                or parsed.validate()
+            ):
+                self._blocked = True
+                return
+            self.results.append(execute(parsed))
+            self.mark_action()
+            self._done += 1
+
+    def finish(self, final_text: str, run_text: Optional[Callable[[str], str]] = None) -> str:
+        """Run the clauses not executed early; `run_text` overrides the planner."""
+        rest = split_clauses(final_text)[self._done:]
+        if rest:
+            run_text = run_text or self._run_text
+            if run_text is None:
+                raise ValueError("ClauseRunner.finish needs run_text for the remaining clauses")
+            self.results.append(run_text(", ".join(rest)))
+            self.mark_action()  # in case run_text did not report its first step
+        return "\n".join(self.results)
+
+    def mark_action(self) -> None:
+        """Record when the first action completed; `run_text` may call it per step."""
+        if self.first_action_at is None:
+            self.first_action_at = time.perf_counter()
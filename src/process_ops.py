@@ -0,0 +1,329 @@
+"""Running-process index and graceful application shutdown.
+
+`ProcessTable` is a snapshot of processes (pid, name, exe, start time)
+refreshed at most every PROCESS_TTL_SEC and incrementally: only pids that
+appeared since the last refresh are inspected, vanished ones are dropped.
+Names are indexed the way desktop items are (lower-cased, with and without
+the extension), and a desktop shortcut is matched through the program it
+points to, so "закрой telegram" finds Telegram.exe.
+
+`close_app` returns at once; termination runs on a background thread:
+ask politely (SIGTERM; on Windows `taskkill` without /f, which posts
+WM_CLOSE so the program can save and exit), wait up to CLOSE_TIMEOUT_SEC,
+then kill whatever is left.
+
+Sources: /proc on Linux; psutil when installed, else `tasklist`/`taskkill`
+on Windows.
+"""
+
+import concurrent.futures
+import csv
+import io
+import ntpath
+import os
+import signal
+import subprocess
+import sys
+import threading
+import time
+from dataclasses import dataclass
+from typing import Dict, Iterable, List, Optional, Set, Tuple
+
+from core.desktop import NO_CLOSE_TARGET
+from logger import log
+
+PROCESS_TTL_SEC = float(os.environ.get("PROCESS_TTL_SEC", "1.0"))
+CLOSE_TIMEOUT_SEC = float(os.environ.get("CLOSE_TIMEOUT_SEC", "3.0"))
+
+APP_NOT_RUNNING = "Программа не запущена"
+
+# Responses without variable parts; pre-synthesized by the TTS phrase cache.
+FIXED_RESPONSES = (
+    NO_CLOSE_TARGET,
+    APP_NOT_RUNNING,
+)
+
+
+@dataclass(frozen=True)
+class ProcessInfo:
+    pid: int
+    name: str
+    exe: Optional[str]
+    start_time: Optional[float]  # opaque, only compared to detect pid reuse
+
+
+def _name_keys(name: str) -> Tuple[str, ...]:
+    """Index keys for a program or item name: "Telegram.exe" -> ("telegram.exe", "telegram")."""
+    key = ntpath.basename(name).lower()
+    stem, dot, _ = key.rpartition(".")
+    return (key, stem) if dot and stem else (key,)
+
+
+def _same_path(left: str, right: str) -> bool:
+    return os.path.normcase(os.path.normpath(left)) == os.path.normcase(os.path.normpath(right))
+
+
+# Platform backends: list pids, describe one pid, signal it.
+
+
+def _psutil():
+    try:
+        import psutil
+    except ImportError:
+        return None
+    return psutil
+
+
+def _proc_pids() -> Set[int]:
+    return {int(entry) for entry in os.listdir("/proc") if entry.isdigit()}
+
+
+def _proc_stat(pid: int) -> Optional[Tuple[str, float]]:
+    """(state, start time in clock ticks) from /proc/<pid>/stat."""
+    try:
+        with open(f"/proc/{pid}/stat", "rb") as handle:
+            stat = handle.read().decode("utf-8", "replace")
+    except OSError:
+        return None
+    fields = stat[stat.rfind(")") + 2:].split()  # comm may contain spaces
+    return fields[0], float(fields[19])
+
+
+def _proc_info(pid: int) -> Optional[ProcessInfo]:
+    stat = _proc_stat(pid)
+    if stat is None or stat[0] == "Z":
+        return None
+    try:
+        exe: Optional[str] = os.readlink(f"/proc/{pid}/exe")
+    except OSError:
+        exe = None  # kernel thread or another user's process
+    try:
+        with open(f"/proc/{pid}/comm", encoding="utf-8", errors="replace") as handle:
+            comm = handle.read().strip()
+    except OSError:
+        return None
+    # comm is cut to 15 characters; the executable name is the full one.
+    name = os.path.basename(exe) if exe and os.path.basename(exe).startswith(comm) else comm
+    return ProcessInfo(pid, name, exe, stat[1])
+
+
+def _psutil_pids() -> Set[int]:
+    return set(_psutil().pids())
+
+
+def _psutil_info(pid: int) -> Optional[ProcessInfo]:
+    psutil = _psutil()
+    try:
+        process = psutil.Process(pid)
+        with process.oneshot():
+            name = process.name()
+            try:
+                exe: Optional[str] = process.exe() or None
+            except psutil.AccessDenied:
+                exe = None
+            return ProcessInfo(pid, name, exe, process.create_time())
+    except (psutil.NoSuchProcess, psutil.AccessDenied, psutil.ZombieProcess):
+        return None
+
+
+def _tasklist() -> Dict[int, ProcessInfo]:
+    output = subprocess.run(
+        ["tasklist", "/fo", "csv", "/nh"], capture_output=True, text=True, check=True
+    ).stdout
+    table: Dict[int, ProcessInfo] = {}
+    for row in csv.reader(io.StringIO(output)):
+        if len(row) >= 2 and row[1].isdigit():
+            table[int(row[1])] = ProcessInfo(int(row[1]), row[0], None, None)
+    return table
+
+
+# Snapshot index
+
+
+class ProcessTable:
+    """A TTL-refreshed, incrementally updated snapshot of running processes."""
+
+    def __init__(self, ttl_sec: float = PROCESS_TTL_SEC):
+        self.ttl_sec = ttl_sec
+        self._processes: Dict[int, ProcessInfo] = {}
+        self._by_name: Dict[str, Set[int]] = {}
+        self._refreshed_at = float("-inf")
+        self._lock = threading.Lock()
+
+    def _add(self, info: ProcessInfo) -> None:
+        self._processes[info.pid] = info
+        keys = set(_name_keys(info.name))
+        if info.exe:
+            keys.update(_name_keys(info.exe))
+        for key in keys:
+            self._by_name.setdefault(key, set()).add(info.pid)
+
+    def _remove(self, pid: int) -> None:
+        info = self._processes.pop(pid)
+        for key in set(_name_keys(info.name) + (_name_keys(info.exe) if info.exe else ())):
+            pids = self._by_name.get(key)
+            if pids is not None:
+                pids.discard(pid)
+                if not pids:
+                    del self._by_name[key]
+
+    def refresh(self, force: bool = False) -> None:
+        with self._lock:
+            if not force and time.monotonic() - self._refreshed_at < self.ttl_sec:
+                return
+            if sys.platform.startswith("linux"):
+                self._update(_proc_pids(), _proc_info)
+            elif _psutil() is not None:
+                self._update(_psutil_pids(), _psutil_info)
+            else:
+                current = _tasklist()
+                self._update(set(current), current.get)
+            self._refreshed_at = time.monotonic()
+
+    def _update(self, pids: Set[int], describe) -> None:
+        for pid in set(self._processes) - pids:
+            self._remove(pid)
+        for pid in pids - set(self._processes):
+            if pid == os.getpid():
+                continue
+            info = describe(pid)
+            if info is not None:
+                self._add(info)
+
+    def invalidate(self, pids: Iterable[int]) -> None:
+        """Forget processes we just signalled so the next lookup re-reads them."""
+        with self._lock:
+            for pid in pids:
+                if pid in self._processes:
+                    self._remove(pid)
+
+    def find(self, name: str, exe: Optional[str] = None) -> List[ProcessInfo]:
+        """Processes whose name or executable matches `name`, or whose exe is `exe`."""
+        self.refresh()
+        with self._lock:
+            pids: Set[int] = set()
+            for key in _name_keys(name):
+                pids |= self._by_name.get(key, set())
+            if exe:
+                pids |= {
+                    pid for pid in self._by_name.get(_name_keys(exe)[0], set())
+                    if self._processes[pid].exe and _same_path(self._processes[pid].exe, exe)
+                }
+            return sorted((self._processes[pid] for pid in pids), key=lambda info: info.pid)
+
+    def __len__(self) -> int:
+        return len(self._processes)
+
+
+_table: Optional[ProcessTable] = None
+_table_lock = threading.Lock()
+_executor: Optional[concurrent.futures.ThreadPoolExecutor] = None
+
+
+def get_process_table() -> ProcessTable:
+    global _table
+    with _table_lock:
+        if _table is None:
+            _table = ProcessTable()
+        return _table
+
+
+def find_app(name: str) -> List[ProcessInfo]:
+    """Resolve a spoken app name to processes, through desktop shortcuts if any."""
+    from dekstop_ops import resolve_item, shortcut_target
+
+    exe = None
+    item = resolve_item(name)
+    if item is not None and item.suffix.lower() == ".lnk":
+        exe = shortcut_target(item)
+    elif item is not None and item.suffix.lower() == ".exe":
+        exe = str(item)
+    matches = get_process_table().find(name, exe)
+    if not matches and exe:
+        # Without exe paths (tasklist) fall back to the target's file name.
+        matches = get_process_table().find(ntpath.basename(exe))
+    return matches
+
+
+# Termination
+
+
+def _is_alive(info: ProcessInfo) -> bool:
+    """True while the pid still belongs to the same (non-zombie) process."""
+    if sys.platform.startswith("linux"):
+        stat = _proc_stat(info.pid)
+        return stat is not None and stat[0] != "Z" and stat[1] == info.start_time
+    psutil = _psutil()
+    if psutil is not None:
+        try:
+            process = psutil.Process(info.pid)
+            return process.status() != psutil.STATUS_ZOMBIE and (
+                info.start_time is None or process.create_time() == info.start_time
+            )
+        except psutil.NoSuchProcess:
+            return False
+    return info.pid in _tasklist()
+
+
+def _signal(info: ProcessInfo, force: bool) -> None:
+    if not _is_alive(info):
+        return  # gone, or the pid was reused by another process
+    psutil = _psutil()
+    if os.name != "nt":
+        os.kill(info.pid, signal.SIGKILL if force else signal.SIGTERM)
+    elif force and psutil is not None:
+        psutil.Process(info.pid).kill()
+    else:
+        # psutil's terminate() is TerminateProcess, a hard kill on Windows;
+        # plain taskkill sends WM_CLOSE to the program's windows instead.
+        args = ["taskkill", "/pid", str(info.pid)] + (["/f"] if force else [])
+        subprocess.run(args, capture_output=True, check=False)
+
+
+def terminate(processes: List[ProcessInfo], timeout_sec: float = CLOSE_TIMEOUT_SEC) -> Dict[int, str]:
+    """Terminate, wait up to `timeout_sec`, then kill; returns pid -> outcome."""
+    outcome: Dict[int, str] = {}
+    for info in processes:
+        try:
+            _signal(info, force=False)
+            outcome[info.pid] = "terminated"
+        except (ProcessLookupError, PermissionError, OSError) as exc:
+            outcome[info.pid] = f"error: {exc}"
+    deadline = time.monotonic() + timeout_sec
+    pending = [info for info in processes if outcome[info.pid] == "terminated"]
+    while pending and time.monotonic() < deadline:
+        time.sleep(0.05)
+        pending = [info for info in pending if _is_alive(info)]
+    for info in pending:
+        try:
+            _signal(info, force=True)
+            outcome[info.pid] = "killed"
+        except (ProcessLookupError, PermissionError, OSError) as exc:
+            outcome[info.pid] = f"error: {exc}"
+    get_process_table().invalidate(info.pid for info in processes)
+    return outcome
+
+
+def terminate_async(processes: List[ProcessInfo], timeout_sec: float = CLOSE_TIMEOUT_SEC) -> concurrent.futures.Future:
+    global _executor
+    with _table_lock:
+        if _executor is None:
+            _executor = concurrent.futures.ThreadPoolExecutor(max_workers=2, thread_name_prefix="close")
+    future = _executor.submit(terminate, processes, timeout_sec)
+    future.add_done_callback(
+        lambda done: log(f"close: {done.result() if not done.exception() else done.exception()}")
+    )
+    return future
+
+
+def close_app(name: str) -> str:
+    if not name:
+        return NO_CLOSE_TARGET
+    own = {os.getpid(), os.getppid()}
+    processes = [info for info in find_app(name) if info.pid not in own]
+    if not processes:
+        return APP_NOT_RUNNING
+    log(f"close: {name} -> {[(info.pid, info.exe or info.name) for info in processes]}")
+    terminate_async(processes, CLOSE_TIMEOUT_SEC)
+    suffix = f" (процессов: {len(processes)})" if len(processes) > 1 else ""
+    return f"Закрываю {processes[0].name}{suffix}"
@@ -0,0 +1,255 @@
+"""Sampled per-command profiling with cProfile and tracemalloc.
+
+When enabled (`--profile [N]`, PROFILE_EVERY=N, or `enable(N)` at runtime)
+every Nth command is profiled: the plan and execute calls run under one
+cProfile.Profile, and the tracemalloc difference between the start and the
+end of the command gives the top allocation sites. Each sampled command
+leaves two files in logs/profile-<session>/:
+
+    cmd-0007.pstats      load with pstats / snakeviz
+    cmd-0007.alloc.json  [{"site": "file.py:42", "size_kb": ..., "count": ...}, ...]
+
+Other commands pay one counter increment, and nothing is imported until
+profiling is enabled. tracemalloc slows every allocation down, so it only
+runs while a sampled command does. It is process-wide, so with concurrent
+commands the allocation report includes their allocations.
+
+Summary: python src/profiling.py summary logs/profile-<session> [--top 25]
+"""
+
+import argparse
+import functools
+import itertools
+import json
+import os
+import sys
+import threading
+import time
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional
+
+PROFILE_EVERY = int(os.environ.get("PROFILE_EVERY", "0"))
+ALLOC_TOP = 25
+
+_lock = threading.Lock()
+_every = 0
+_directory: Optional[Path] = None
+_commands = itertools.count(1)
+_tracing_users = 0  # sampled commands in flight that started tracemalloc
+
+
+class CommandProfile:
+    """Profiler state for one sampled command."""
+
+    def __init__(self, number: int, directory: Path):
+        import cProfile
+        import tracemalloc
+
+        self.number = number
+        self.directory = directory
+        self.profile = cProfile.Profile()
+        self._owns_tracing = _start_tracing()
+        self.started = time.perf_counter()
+        self._before = tracemalloc.take_snapshot() if tracemalloc.is_tracing() else None
+        self._lock = threading.Lock()  # one thread may profile at a time
+
+    def run(self, fn: Callable, *args: Any) -> Any:
+        """Call `fn(*args)` with the profiler enabled on the calling thread."""
+        with self._lock:
+            self.profile.enable()
+            try:
+                return fn(*args)
+            finally:
+                self.profile.disable()
+
+    def finish(self, label: str = "") -> Path:
+        """Write the .pstats and allocation report; return the .pstats path."""
+        import tracemalloc
+
+        elapsed_ms = (time.perf_counter() - self.started) * 1000
+        sites: List[Dict[str, Any]] = []
+        if self._before is not None and tracemalloc.is_tracing():
+            after = tracemalloc.take_snapshot().filter_traces(
+                (tracemalloc.Filter(False, tracemalloc.__file__),)
+            )
+            for stat in after.compare_to(self._before, "lineno")[:ALLOC_TOP]:
+                if stat.size_diff <= 0:
+                    continue
+                frame = stat.traceback[0]
+                sites.append({
+                    "site": f"{frame.filename}:{frame.lineno}",
+                    "size_kb": round(stat.size_diff / 1024, 3),
+                    "count": stat.count_diff,
+                })
+        if self._owns_tracing:
+            self._owns_tracing = False
+            _stop_tracing()
+        self.directory.mkdir(parents=True, exist_ok=True)
+        stem = self.directory / f"cmd-{self.number:04d}"
+        self.profile.dump_stats(str(stem) + ".pstats")
+        report = {"command": label, "ms": round(elapsed_ms, 3), "allocations": sites}
+        Path(str(stem) + ".alloc.json").write_text(json.dumps(report, ensure_ascii=False, indent=1), encoding="utf-8")
+        return Path(str(stem) + ".pstats")
+
+
+def _start_tracing() -> bool:
+    """Start tracemalloc for a sampled command; False if someone else runs it."""
+    global _tracing_users
+    import tracemalloc
+
+    with _lock:
+        if _tracing_users == 0:
+            if tracemalloc.is_tracing():
+                return False  # PYTHONTRACEMALLOC or another tool owns it
+            tracemalloc.start()
+        _tracing_users += 1
+        return True
+
+
+def _stop_tracing() -> None:
+    global _tracing_users
+    import tracemalloc
+
+    with _lock:
+        _tracing_users -= 1
+        if _tracing_users == 0:
+            tracemalloc.stop()
+
+
+def default_directory() -> Path:
+    from logger import _log_path
+
+    if _log_path is not None:
+        return _log_path.parent / f"profile-{_log_path.name.split('.', 1)[0]}"
+    return Path(os.getcwd()) / "logs" / f"profile-{time.strftime('%Y%m%d-%H%M%S')}"
+
+
+def enable(every: int = 1, directory: Optional[Path] = None) -> None:
+    """Profile every `every`-th command from now on (runtime toggle)."""
+    global _every, _directory
+
+    with _lock:
+        _every = max(1, every)
+        _directory = directory or _directory
+
+
+def disable() -> None:
+    global _every
+
+    with _lock:
+        _every = 0
+
+
+def is_enabled() -> bool:
+    return _every > 0
+
+
+def status() -> Dict[str, Any]:
+    return {"every": _every, "directory": str(_directory) if _directory else None}
+
+
+def sample() -> Optional[CommandProfile]:
+    """Return a profile if the next command is to be sampled, else None."""
+    global _directory
+    if not _every:
+        return None
+    with _lock:
+        number = next(_commands)
+        if not _every or number % _every:
+            return None
+        if _directory is None:
+            _directory = default_directory()  # the session log is known by now
+        directory = _directory
+    # Constructed outside _lock: CommandProfile takes it in _start_tracing.
+    return CommandProfile(number, directory)
+
+
+def profiled(fn: Callable) -> Callable:
+    """Wrap a whole synchronous command function (e.g. parse_and_run)."""
+
+    @functools.wraps(fn)
+    def wrapper(text: str, *args, **kwargs):
+        profile = sample()
+        if profile is None:
+            return fn(text, *args, **kwargs)
+        try:
+            return profile.run(lambda: fn(text, *args, **kwargs))
+        finally:
+            profile.finish(text)
+
+    return wrapper
+
+
+def summarize_session(directory: Path, top: int = 25, sort: str = "cumulative") -> Dict[str, Any]:
+    """Aggregate every cmd-*.pstats and cmd-*.alloc.json in `directory`."""
+    import pstats
+
+    stats_files = sorted(directory.glob("cmd-*.pstats"))
+    functions: List[Dict[str, Any]] = []
+    if stats_files:
+        stats = pstats.Stats(str(stats_files[0]))
+        for path in stats_files[1:]:
+            stats.add(str(path))
+        key = {"cumulative": 3, "tottime": 2, "calls": 1}[sort]
+        rows = sorted(stats.stats.items(), key=lambda item: item[1][key], reverse=True)
+        for (filename, lineno, name), (_, calls, tottime, cumtime, _) in rows[:top]:
+            functions.append({
+                "function": f"{filename}:{lineno}({name})",
+                "calls": calls,
+                "tottime_ms": round(tottime * 1000, 3),
+                "cumtime_ms": round(cumtime * 1000, 3),
+            })
+
+    sites: Dict[str, Dict[str, float]] = {}
+    durations: List[float] = []
+    for path in sorted(directory.glob("cmd-*.alloc.json")):
+        report = json.loads(path.read_text(encoding="utf-8"))
+        durations.append(report.get("ms", 0.0))
+        for site in report.get("allocations", []):
+            entry = sites.setdefault(site["site"], {"size_kb": 0.0, "count": 0, "commands": 0})
+            entry["size_kb"] += site["size_kb"]
+            entry["count"] += site["count"]
+            entry["commands"] += 1
+    top_sites = sorted(sites.items(), key=lambda item: item[1]["size_kb"], reverse=True)[:top]
+
+    from stats import summarize
+
+    return {
+        "commands": len(stats_files),
+        "command_ms": summarize(durations, (50, 95, 99)),
+        "functions": functions,
+        "allocations": [{"site": site, **{k: round(v, 3) for k, v in entry.items()}} for site, entry in top_sites],
+    }
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="Profiling tools")
+    sub = parser.add_subparsers(dest="command", required=True)
+    summary = sub.add_parser("summary", help="aggregate hot functions and allocation sites of a session")
+    summary.add_argument("directory", type=Path, help="logs/profile-<session>")
+    summary.add_argument("--top", type=int, default=25)
+    summary.add_argument("--sort", choices=("cumulative", "tottime", "calls"), default="cumulative")
+    summary.add_argument("--json", action="store_true")
+    args = parser.parse_args(argv)
+
+    report = summarize_session(args.directory, args.top, args.sort)
+    if args.json:
+        print(json.dumps(report, ensure_ascii=False, indent=2))
+        return 0
+    print(f"Команд в профиле: {report['commands']}, время p50/p95: "
+          f"{report['command_ms']['p50']} / {report['command_ms']['p95']} мс")
+    print(f"\n{'cum ms':>10} {'tot ms':>10} {'calls':>8}  function")
+    for row in report["functions"]:
+        print(f"{row['cumtime_ms']:>10.2f} {row['tottime_ms']:>10.2f} {row['calls']:>8}  {row['function']}")
+    print(f"\n{'KiB':>10} {'blocks':>8} {'cmds':>5}  allocation site")
+    for row in report["allocations"]:
+        print(f"{row['size_kb']:>10.1f} {int(row['count']):>8} {int(row['commands']):>5}  {row['site']}")
+    return 0
+
+
+if PROFILE_EVERY > 0:
+    enable(PROFILE_EVERY)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
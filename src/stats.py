@@ -0,0 +1,18 @@
+"""Small statistics helpers shared by evaluation and benchmark tools."""
+
+import math
+from typing import Dict, Optional, Sequence
+
+
+def percentile(values: Sequence[float], pct: float) -> Optional[float]:
+    """Nearest-rank percentile; None for an empty sequence."""
+    if not values:
+        return None
+    ordered = sorted(values)
+    rank = max(1, math.ceil(pct / 100 * len(ordered)))
+    return ordered[rank - 1]
+
+
+def summarize(values: Sequence[float], percentiles: Sequence[int] = (50, 95)) -> Dict[str, Optional[float]]:
+    """Return {"p50": ..., "p95": ...} for the requested percentiles."""
+    return {f"p{pct}": percentile(values, pct) for pct in percentiles}
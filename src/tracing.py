@@ -0,0 +1,233 @@
+"""Lightweight spans written to a per-session JSONL trace file.
+
+    with span("llm.request", model=MODEL_NAME) as current:
+        ...
+        current.set(status=resp.status_code)
+
+    @traced("desktop.scan")
+    def get_desktop_items(): ...
+
+Each finished span becomes one JSON line: name, start (epoch seconds),
+duration in ms, thread, span id, parent span id, attributes and the error
+type if the body raised. Nesting is tracked per thread/task via contextvars.
+Until `init_tracing` is called spans only cost a couple of clock reads.
+
+Finished spans only go on a queue; a writer thread serializes them and does
+the file I/O, as the session logger does. `close_tracing()` (also registered
+with atexit) drains the queue before returning.
+
+Report: python src/tracing.py report logs/*.trace.jsonl [--json]
+"""
+
+import argparse
+import atexit
+import contextvars
+import functools
+import itertools
+import json
+import os
+import queue
+import sys
+import threading
+import time
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Any, Callable, Dict, Iterable, Iterator, List, Optional, TextIO
+
+TRACE_ENABLED = os.environ.get("TRACE_ENABLED", "1") != "0"
+
+_path: Optional[Path] = None
+_records: "Optional[queue.SimpleQueue[Optional[Dict[str, Any]]]]" = None
+_writer: Optional[threading.Thread] = None
+_lock = threading.Lock()
+_ids = itertools.count(1)
+_current: contextvars.ContextVar[Optional["Span"]] = contextvars.ContextVar("current_span", default=None)
+
+
+class Span:
+    __slots__ = ("name", "id", "parent", "attrs", "start", "_started")
+
+    def __init__(self, name: str, parent: Optional["Span"], attrs: Dict[str, Any]):
+        self.name = name
+        self.id = next(_ids)
+        self.parent = parent.id if parent is not None else None
+        self.attrs = attrs
+        self.start = time.time()
+        self._started = time.perf_counter()
+
+    def set(self, **attrs: Any) -> None:
+        self.attrs.update(attrs)
+
+    def finish(self, error: Optional[BaseException] = None) -> None:
+        duration_ms = (time.perf_counter() - self._started) * 1000
+        record = {
+            "name": self.name,
+            "start": round(self.start, 6),
+            "ms": round(duration_ms, 3),
+            "thread": threading.current_thread().name,
+            "id": self.id,
+            "parent": self.parent,
+        }
+        if self.attrs:
+            record["attrs"] = self.attrs
+        if error is not None:
+            record["error"] = type(error).__name__
+        _write(record)
+
+
+def trace_path_for(log_path: Path) -> Path:
+    """logs/session-<ts>.log -> logs/session-<ts>.trace.jsonl"""
+    return log_path.with_suffix(".trace.jsonl")
+
+
+def init_tracing(path: Path) -> None:
+    """Start writing spans to `path` (appending); no-op when TRACE_ENABLED=0."""
+    global _path, _records, _writer
+    if not TRACE_ENABLED:
+        return
+    close_tracing()
+    path.parent.mkdir(parents=True, exist_ok=True)
+    handle = open(path, "a", encoding="utf-8")
+    records: "queue.SimpleQueue[Optional[Dict[str, Any]]]" = queue.SimpleQueue()
+    writer = threading.Thread(target=_write_loop, args=(records, handle), name="trace-writer", daemon=True)
+    writer.start()
+    with _lock:
+        _path, _records, _writer = path, records, writer
+
+
+def close_tracing() -> None:
+    """Stop tracing after every span finished so far is on disk."""
+    global _path, _records, _writer
+    with _lock:
+        records, writer = _records, _writer
+        _path, _records, _writer = None, None, None
+    if records is not None:
+        records.put(None)
+    if writer is not None:
+        writer.join()
+
+
+atexit.register(close_tracing)
+
+
+def trace_path() -> Optional[Path]:
+    return _path
+
+
+def _write(record: Dict[str, Any]) -> None:
+    records = _records
+    if records is not None:
+        records.put(record)
+
+
+def _write_loop(records: "queue.SimpleQueue[Optional[Dict[str, Any]]]", handle: TextIO) -> None:
+    """Writer thread: one JSON line per record, flushed whenever the queue runs dry."""
+    with handle:
+        while True:
+            record = records.get()
+            if record is None:
+                return
+            handle.write(json.dumps(record, ensure_ascii=False, default=str) + "\n")
+            if records.empty():
+                handle.flush()
+
+
+@contextmanager
+def span(name: str, **attrs: Any) -> Iterator[Span]:
+    """Time the enclosed block as a child of the current span."""
+    current = Span(name, _current.get(), attrs)
+    token = _current.set(current)
+    try:
+        yield current
+    except BaseException as exc:
+        _current.reset(token)
+        current.finish(exc)
+        raise
+    _current.reset(token)
+    current.finish()
+
+
+def traced(name: Optional[str] = None) -> Callable[[Callable], Callable]:
+    """Decorator form of `span`; the span is named after the function by default."""
+
+    def decorate(fn: Callable) -> Callable:
+        span_name = name or f"{fn.__module__}.{fn.__qualname__}"
+
+        @functools.wraps(fn)
+        def wrapper(*args, **kwargs):
+            with span(span_name):
+                return fn(*args, **kwargs)
+
+        return wrapper
+
+    return decorate
+
+
+def read_spans(paths: Iterable[Path]) -> Iterator[Dict[str, Any]]:
+    for path in paths:
+        with open(path, encoding="utf-8") as handle:
+            for line in handle:
+                line = line.strip()
+                if not line:
+                    continue
+                try:
+                    yield json.loads(line)
+                except json.JSONDecodeError:
+                    continue  # torn last line of a crashed session
+
+
+def report(paths: Iterable[Path]) -> Dict[str, Dict[str, Any]]:
+    """Per span name: count, errors, total and p50/p95/p99 duration in ms."""
+    from stats import summarize
+
+    durations: Dict[str, List[float]] = {}
+    errors: Dict[str, int] = {}
+    for record in read_spans(paths):
+        name = record.get("name")
+        name = "<unnamed>" if name is None else str(name)
+        durations.setdefault(name, []).append(float(record.get("ms", 0.0)))
+        if "error" in record:
+            errors[name] = errors.get(name, 0) + 1
+    return {
+        name: {
+            "count": len(values),
+            "errors": errors.get(name, 0),
+            "total_ms": round(sum(values), 3),
+            **summarize(values, (50, 95, 99)),
+        }
+        for name, values in sorted(durations.items())
+    }
+
+
+def _format_table(rows: Dict[str, Dict[str, Any]]) -> str:
+    header = f"{'stage':<28} {'count':>7} {'err':>5} {'p50 ms':>10} {'p95 ms':>10} {'p99 ms':>10} {'total ms':>12}"
+    lines = [header, "-" * len(header)]
+    for name, row in rows.items():
+        lines.append(
+            f"{name:<28} {row['count']:>7} {row['errors']:>5} "
+            f"{row['p50']:>10.2f} {row['p95']:>10.2f} {row['p99']:>10.2f} {row['total_ms']:>12.1f}"
+        )
+    return "\n".join(lines)
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="Trace file tools")
+    sub = parser.add_subparsers(dest="command", required=True)
+    report_cmd = sub.add_parser("report", help="latency percentiles per stage")
+    report_cmd.add_argument("paths", nargs="+", type=Path, help="*.trace.jsonl files or log directories")
+    report_cmd.add_argument("--json", action="store_true", help="print JSON instead of a table")
+    args = parser.parse_args(argv)
+
+    paths: List[Path] = []
+    for path in args.paths:
+        paths.extend(sorted(path.glob("*.trace.jsonl")) if path.is_dir() else [path])
+    if not paths:
+        print("Нет файлов трассировки", file=sys.stderr)
+        return 1
+    rows = report(paths)
+    print(json.dumps(rows, ensure_ascii=False, indent=2) if args.json else _format_table(rows))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -1,17 +1,234 @@
-"""Text-to-speech via edge-tts."""
+"""Text-to-speech via edge-tts with an on-disk phrase cache.
+
+`SpeechWorker` keeps one event loop alive on a background thread and
+pipelines speech sentence by sentence: sentence k+1 is synthesized while
+sentence k plays, and `cancel` drops everything queued.
+"""
 
 import asyncio
-from typing import Optional
+import re
+import shutil
+import subprocess
+import sys
+import threading
+import time
+from pathlib import Path
+from typing import Callable, Iterable, List, Optional
 
-import edge_tts
+from logger import log
+from tts_cache import PhraseCache
 
 DEFAULT_VOICE = "ru-RU-DmitryNeural"
+SENTENCE_SPLIT = re.compile(r"(?<=[.!?…])\s+|\n+")
+
+_cache: Optional[PhraseCache] = None
+_cache_lock = threading.Lock()
+
+
+async def synthesize_async(text: str, voice: str = DEFAULT_VOICE, rate: Optional[str] = None) -> bytes:
+    """Return MP3 bytes for `text` from edge-tts."""
+    import edge_tts
+
+    communicate = edge_tts.Communicate(text, voice=voice, rate=rate or "+0%")
+    chunks = []
+    async for chunk in communicate.stream():
+        if chunk["type"] == "audio":
+            chunks.append(chunk["data"])
+    return b"".join(chunks)
+
+
+def synthesize(text: str, voice: str = DEFAULT_VOICE, rate: Optional[str] = None) -> bytes:
+    return asyncio.run(synthesize_async(text, voice=voice, rate=rate))
+
+
+def get_cache() -> PhraseCache:
+    global _cache
+    with _cache_lock:
+        if _cache is None:
+            _cache = PhraseCache(synthesize=synthesize)
+        return _cache
+
+
+def known_responses() -> Iterable[str]:
+    """Fixed assistant responses worth synthesizing ahead of time."""
+    from core.desktop import FIXED_RESPONSES as command_responses
+    from dekstop_ops import FIXED_RESPONSES as desktop_responses
+    from process_ops import FIXED_RESPONSES as process_responses
+
+    return tuple(dict.fromkeys(desktop_responses + process_responses + command_responses))
+
+
+def prewarm(voice: str = DEFAULT_VOICE, rate: Optional[str] = None) -> int:
+    """Fill the phrase cache with `known_responses`; returns phrases added."""
+    return get_cache().prewarm(known_responses(), voice, rate)
+
+
+def split_sentences(text: str) -> List[str]:
+    return [part.strip() for part in SENTENCE_SPLIT.split(text) if part.strip()]
+
+
+def play_file(path: Path, stop: Optional[threading.Event] = None) -> None:
+    """Play an MP3 file on the default output device until done or `stop` is set."""
+    if sys.platform == "win32":
+        import ctypes
+
+        mci = ctypes.windll.winmm.mciSendStringW  # type: ignore[attr-defined]
+        alias = f"tts{threading.get_ident()}"
+        status = ctypes.create_unicode_buffer(32)
+        mci(f'open "{path}" type mpegvideo alias {alias}', None, 0, None)
+        try:
+            mci(f"play {alias}", None, 0, None)
+            while not (stop is not None and stop.wait(0.05)):
+                mci(f"status {alias} mode", status, len(status), None)
+                if status.value != "playing":
+                    break
+        finally:
+            mci(f"stop {alias}", None, 0, None)
+            mci(f"close {alias}", None, 0, None)
+        return
+
+    if shutil.which("ffplay") is None:
+        raise RuntimeError("ffplay не найден в PATH — установите ffmpeg")
+    proc = subprocess.Popen(
+        ["ffplay", "-nodisp", "-autoexit", "-loglevel", "quiet", str(path)],
+        stdin=subprocess.DEVNULL,
+    )
+    while True:
+        try:
+            proc.wait(timeout=0.05)
+            return
+        except subprocess.TimeoutExpired:
+            if stop is not None and stop.is_set():
+                proc.terminate()
+                proc.wait()
+                return
+
+
+async def fetch_async(text: str, voice: str = DEFAULT_VOICE, rate: Optional[str] = None) -> Path:
+    """Return a cached audio file for `text`, synthesizing it on a miss."""
+    cache = get_cache()
+    path = cache.lookup(text, voice, rate)
+    if path is None:
+        path = cache.store(text, voice, rate, await synthesize_async(text, voice=voice, rate=rate))
+    return path
 
 
 async def speak_async(text: str, voice: str = DEFAULT_VOICE, rate: Optional[str] = None) -> None:
-    communicate = edge_tts.Communicate(text, voice=voice, rate=rate)
-    await communicate.stream()  # plays audio through default output
+    path = await fetch_async(text, voice=voice, rate=rate)
+    await asyncio.get_running_loop().run_in_executor(None, play_file, path)
 
 
 def speak(text: str, voice: str = DEFAULT_VOICE, rate: Optional[str] = None) -> None:
-    asyncio.run(speak_async(text, voice=voice, rate=rate))
+    play_file(get_cache().get(text, voice, rate))
+
+
+class SpeechWorker:
+    """Long-lived TTS thread with its own event loop and a sentence queue.
+
+    `say` is thread-safe and returns immediately. While a sentence plays,
+    at most two more are synthesized: one waits in the one-slot audio queue
+    and the synthesis loop holds the other until the slot frees up. `cancel`
+    stops the current sentence and discards everything queued, e.g. when
+    the user issues a new command.
+    `on_first_audio` receives the time-to-first-audio of each utterance in
+    milliseconds.
+    """
+
+    def __init__(
+        self,
+        voice: str = DEFAULT_VOICE,
+        rate: Optional[str] = None,
+        on_first_audio: Optional[Callable[[float], None]] = None,
+    ):
+        self.voice = voice
+        self.rate = rate
+        self.on_first_audio = on_first_audio
+        self.last_time_to_first_audio: Optional[float] = None
+        self._generation = 0
+        self._stop_playback = threading.Event()
+        self._loop = asyncio.new_event_loop()
+        self._ready = threading.Event()
+        self._thread = threading.Thread(target=self._run, name="tts-worker", daemon=True)
+        self._thread.start()
+        self._ready.wait()
+
+    def _run(self) -> None:
+        asyncio.set_event_loop(self._loop)
+        self._sentences: asyncio.Queue = asyncio.Queue()
+        self._audio: asyncio.Queue = asyncio.Queue(maxsize=1)
+        tasks = [
+            self._loop.create_task(self._synth_loop()),
+            self._loop.create_task(self._play_loop()),
+        ]
+        self._ready.set()
+        self._loop.run_forever()
+        for task in tasks:
+            task.cancel()
+        self._loop.run_until_complete(asyncio.gather(*tasks, return_exceptions=True))
+        self._loop.close()
+
+    def say(self, text: str) -> None:
+        self._loop.call_soon_threadsafe(self._enqueue, self._generation, text, time.perf_counter())
+
+    def prewarm(self) -> None:
+        """Fill the phrase cache in the background without blocking speech."""
+        self._loop.call_soon_threadsafe(
+            lambda: self._loop.run_in_executor(None, self._prewarm)
+        )
+
+    def _prewarm(self) -> None:
+        try:
+            added = prewarm(self.voice, self.rate)
+        except Exception as exc:
+            log(f"tts prewarm failed: {exc!r}")
+            return
+        log(f"tts prewarm: {added} phrases synthesized")
+
+    def cancel(self) -> None:
+        self._generation += 1
+        self._stop_playback.set()
+        self._loop.call_soon_threadsafe(self._drain)
+
+    def close(self) -> None:
+        self.cancel()
+        self._loop.call_soon_threadsafe(self._loop.stop)
+        self._thread.join(timeout=2)
+
+    def _enqueue(self, generation: int, text: str, requested_at: float) -> None:
+        for index, sentence in enumerate(split_sentences(text)):
+            self._sentences.put_nowait((generation, sentence, requested_at if index == 0 else None))
+
+    def _drain(self) -> None:
+        for queue in (self._sentences, self._audio):
+            while not queue.empty():
+                queue.get_nowait()
+
+    async def _synth_loop(self) -> None:
+        while True:
+            generation, sentence, requested_at = await self._sentences.get()
+            if generation != self._generation:
+                continue
+            try:
+                path = await fetch_async(sentence, voice=self.voice, rate=self.rate)
+            except Exception as exc:
+                # Network hiccup: skip the sentence, keep the worker alive.
+                log(f"tts synthesis failed for {sentence!r}: {exc!r}")
+                continue
+            if generation == self._generation:
+                await self._audio.put((generation, path, requested_at))
+
+    async def _play_loop(self) -> None:
+        while True:
+            generation, path, requested_at = await self._audio.get()
+            self._stop_playback.clear()
+            if generation != self._generation:
+                continue
+            if requested_at is not None:
+                self.last_time_to_first_audio = (time.perf_counter() - requested_at) * 1000
+                if self.on_first_audio is not None:
+                    self.on_first_audio(self.last_time_to_first_audio)
+            try:
+                await self._loop.run_in_executor(None, play_file, path, self._stop_playback)
+            except Exception as exc:
+                log(f"tts playback failed for {path}: {exc!r}")
+                continue
@@ -0,0 +1,138 @@
+"""On-disk cache of synthesized phrases.
+
+Audio is stored content-addressed: the file name is a hash of
+(text, voice, rate), so identical responses are synthesized once. The
+cache has a byte cap and evicts least recently used entries; file mtimes
+record access order so it survives restarts.
+"""
+
+import hashlib
+import os
+import tempfile
+import threading
+from collections import OrderedDict
+from pathlib import Path
+from typing import Callable, Iterable, Optional
+
+DEFAULT_CACHE_DIR = Path(os.environ.get("TTS_CACHE_DIR", os.path.join(os.getcwd(), "cache", "tts")))
+DEFAULT_MAX_BYTES = int(os.environ.get("TTS_CACHE_MAX_BYTES", str(32 * 1024 * 1024)))
+AUDIO_SUFFIX = ".mp3"
+
+Synthesizer = Callable[[str, str, Optional[str]], bytes]
+
+
+def cache_key(text: str, voice: str, rate: Optional[str]) -> str:
+    raw = "\0".join((text.strip(), voice, rate or ""))
+    return hashlib.sha256(raw.encode("utf-8")).hexdigest()
+
+
+class PhraseCache:
+    """LRU-capped directory of synthesized audio keyed by (text, voice, rate)."""
+
+    def __init__(
+        self,
+        directory: Path = DEFAULT_CACHE_DIR,
+        max_bytes: int = DEFAULT_MAX_BYTES,
+        synthesize: Optional[Synthesizer] = None,
+    ):
+        self.directory = Path(directory)
+        self.max_bytes = max_bytes
+        self._synthesize = synthesize
+        self._lock = threading.Lock()
+        self._entries: "OrderedDict[str, int]" = OrderedDict()  # key -> size, oldest first
+        self._total = 0
+        self.hits = 0
+        self.misses = 0
+        self._scan()
+
+    def _scan(self) -> None:
+        self.directory.mkdir(parents=True, exist_ok=True)
+        files = []
+        for entry in self.directory.glob(f"*{AUDIO_SUFFIX}"):
+            stat = entry.stat()
+            files.append((stat.st_mtime, entry.stem, stat.st_size))
+        for _, key, size in sorted(files):
+            self._entries[key] = size
+            self._total += size
+
+    def _path(self, key: str) -> Path:
+        return self.directory / f"{key}{AUDIO_SUFFIX}"
+
+    @property
+    def total_bytes(self) -> int:
+        return self._total
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def lookup(self, text: str, voice: str, rate: Optional[str] = None) -> Optional[Path]:
+        """Return the cached file and mark it recently used, or None."""
+        key = cache_key(text, voice, rate)
+        with self._lock:
+            if key not in self._entries:
+                self.misses += 1
+                return None
+            path = self._path(key)
+            if not path.exists():
+                self._total -= self._entries.pop(key)
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+        try:
+            os.utime(path)
+        except OSError:
+            pass
+        return path
+
+    def store(self, text: str, voice: str, rate: Optional[str], data: bytes) -> Path:
+        """Write audio for a phrase and evict old entries beyond the cap."""
+        key = cache_key(text, voice, rate)
+        path = self._path(key)
+        # A temp file of its own, so concurrent stores of one phrase never
+        # rename each other's half-written file.
+        with tempfile.NamedTemporaryFile(dir=self.directory, suffix=".tmp", delete=False) as tmp:
+            tmp.write(data)
+        try:
+            os.replace(tmp.name, path)
+        except OSError:
+            os.unlink(tmp.name)
+            raise
+        with self._lock:
+            self._total -= self._entries.pop(key, 0)
+            self._entries[key] = len(data)
+            self._total += len(data)
+            self._evict(keep=key)
+        return path
+
+    def get(self, text: str, voice: str, rate: Optional[str] = None) -> Path:
+        """Return cached audio, synthesizing and storing it on a miss."""
+        path = self.lookup(text, voice, rate)
+        if path is not None:
+            return path
+        if self._synthesize is None:
+            raise RuntimeError("PhraseCache has no synthesizer")
+        return self.store(text, voice, rate, self._synthesize(text, voice, rate))
+
+    def prewarm(self, phrases: Iterable[str], voice: str, rate: Optional[str] = None) -> int:
+        """Synthesize any phrases not cached yet; returns how many were added."""
+        if self._synthesize is None:
+            raise RuntimeError("PhraseCache has no synthesizer")
+        added = 0
+        for phrase in phrases:
+            if self.lookup(phrase, voice, rate) is None:
+                self.store(phrase, voice, rate, self._synthesize(phrase, voice, rate))
+                added += 1
+        return added
+
+    def _evict(self, keep: str) -> None:
+        while self._total > self.max_bytes and len(self._entries) > 1:
+            key, size = next(iter(self._entries.items()))
+            if key == keep:
+                break
+            del self._entries[key]
+            self._total -= size
+            try:
+                self._path(key).unlink()
+            except OSError:
+                pass
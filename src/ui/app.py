@@ -1,26 +1,58 @@
 import os
 import sys
-from datetime import datetime
-from pathlib import Path
-from typing import Callable
+import threading
+from typing import TYPE_CHECKING
 
+from PyQt6.QtCore import QObject, pyqtSignal
 from PyQt6.QtWidgets import QApplication, QLabel, QLineEdit, QPushButton, QVBoxLayout, QWidget
-from logger import init_logger, log
-from asr import transcribe_once
+from logger import init_logger, log, new_session_log_path, shutdown_logger
+from tracing import close_tracing, init_tracing, trace_path_for
+from orchestrator import OrchestratorThread
+from pipeline import ClauseRunner
+from ui.workers import POLICY_PREEMPT, POLICY_QUEUE, AssistantTask, TaskRunner
+
+if TYPE_CHECKING:
+    from asr import PushToTalk
 
 LOG_PATH = None
+PTT_HOTKEY = os.environ.get("PTT_HOTKEY")
+TTS_ENABLED = os.environ.get("TTS_ENABLED", "").lower() in ("1", "true", "yes")
+SPEAKER = None
+SUBMIT_POLICY = os.environ.get("UI_SUBMIT_POLICY", POLICY_PREEMPT)
+RUNNER = None
+ORCHESTRATOR = None
+
+
+class _VoiceBridge(QObject):
+    """Carries push-to-talk events from the hotkey thread to the Qt thread."""
+
+    partial = pyqtSignal(str)
+    stable = pyqtSignal(object, str)  # ClauseRunner, committed text
+    pressed = pyqtSignal()
+    transcribed = pyqtSignal(str)
+    failed = pyqtSignal(str)
 
 
-def init(parse_and_run: Callable[[str], str]) -> None:
-    global LOG_PATH
-    logs_dir = os.path.join(os.getcwd(), "logs")
-    os.makedirs(logs_dir, exist_ok=True)
-    timestamp = datetime.now().strftime("%Y%m%d-%H%M%S")
-    LOG_PATH = os.path.join(logs_dir, f"session-{timestamp}.log")
-    init_logger(Path(LOG_PATH))
+def init() -> None:
+    global LOG_PATH, SPEAKER, RUNNER, ORCHESTRATOR
+    LOG_PATH = new_session_log_path()
+    init_logger(LOG_PATH)
+    init_tracing(trace_path_for(LOG_PATH))
     log("Application started")
+    if TTS_ENABLED:
+        from tts import SpeechWorker
+
+        SPEAKER = SpeechWorker(
+            on_first_audio=lambda ms: log(f"tts time to first audio: {ms:.0f} ms")
+        )
+        SPEAKER.prewarm()
+    ORCHESTRATOR = OrchestratorThread(
+        speak=SPEAKER.say if SPEAKER is not None else None,
+        stop_speech=SPEAKER.cancel if SPEAKER is not None else None,
+    )
             
     app = QApplication(sys.argv)
+    RUNNER = TaskRunner(SUBMIT_POLICY)
     window = QWidget()
     window.setWindowTitle("Voice Assistant")
     window.setGeometry(100, 100, 300, 200)
@@ -33,12 +65,12 @@ def init(parse_and_run: Callable[[str], str]) -> None:
     
     submit_button = QPushButton("Submit")
     submit_button.clicked.connect(
-        lambda: on_submit(app, window, input_field, result_label, parse_and_run)
+        lambda: on_submit(app, window, input_field, result_label)
     )
 
     rec_button = QPushButton("Record Voice Command")
     rec_button.clicked.connect(
-        lambda: on_voice(app, result_label, parse_and_run)
+        lambda: on_voice(app, result_label)
     )
     
     result_label = QLabel("")
@@ -55,44 +87,215 @@ def init(parse_and_run: Callable[[str], str]) -> None:
     
     window.setLayout(layout)
     window.show()
-    sys.exit(app.exec())
-            
+
+    ptt = None
+    if PTT_HOTKEY:
+        bridge = _VoiceBridge()
+        bridge.partial.connect(result_label.setText)
+        bridge.failed.connect(result_label.setText)
+        ptt = start_push_to_talk(PTT_HOTKEY, bridge, app, result_label)
+    code = app.exec()
+    RUNNER.cancel_all()
+    ORCHESTRATOR.close()
+    if ptt is not None:
+        ptt.close()
+    if SPEAKER is not None:
+        SPEAKER.close()
+    log("Application closed")
+    close_tracing()
+    shutdown_logger()
+    sys.exit(code)
+
+
+def start_push_to_talk(
+    hotkey: str,
+    bridge: _VoiceBridge,
+    app: QApplication,
+    result_label: QLabel,
+) -> "PushToTalk":
+    """Open the always-on input stream and bind press/release of `hotkey`.
+
+    While the key is held the capture is transcribed incrementally; partial
+    text goes to `bridge.partial` and finished safe clauses run before the
+    key is released. Pressing the key preempts running tasks the way a new
+    submission does. Early clauses and, once the final transcript is ready,
+    the rest of the utterance run as AssistantTasks on RUNNER (the rest
+    through the orchestrator), so cancellation and the submit policy apply
+    to every desktop operation. Tasks of one utterance queue behind each
+    other instead of preempting one another.
+    """
+    from asr import PushToTalk, StreamingTranscriber, TranscriptionError
+    from hotkey import register_push_to_talk
+
+    ptt = PushToTalk()
+    ptt.start()
+    transcribing = threading.Event()
+    state = {}
+
+    def on_partial(stable: str, tentative: str) -> None:
+        bridge.stable.emit(state["runner"], stable)
+        bridge.partial.emit(f"Слушаю: {stable} {tentative}".rstrip())
+
+    transcriber = StreamingTranscriber(ptt, on_partial=on_partial)
+
+    def on_press() -> None:
+        if transcribing.is_set() or ptt.active:
+            return
+        state["runner"] = ClauseRunner()
+        transcriber.begin()
+        bridge.pressed.emit()
+
+    def on_release() -> None:
+        if not ptt.active or transcribing.is_set():
+            return
+        transcribing.set()
+
+        def finish_transcript() -> None:
+            try:
+                bridge.transcribed.emit(transcriber.finish())
+            except TranscriptionError as exc:
+                log(f"Push-to-talk transcription failed: {exc}")
+                bridge.failed.emit(str(exc))
+            except Exception as exc:
+                log(f"Unhandled error (push-to-talk): {exc}")
+                bridge.failed.emit("Произошла ошибка")
+            finally:
+                transcribing.clear()
+
+        # Only the final decode runs here; execution goes through RUNNER.
+        threading.Thread(target=finish_transcript, name="ptt-transcribe", daemon=True).start()
+
+    def on_pressed() -> None:
+        interrupt_speech()
+        if RUNNER.policy == POLICY_PREEMPT:
+            RUNNER.cancel_all()
+
+    def run_early_clauses(runner: ClauseRunner, stable: str) -> AssistantTask:
+        def work(cancel: threading.Event, signals) -> str:
+            done = len(runner.results)
+            runner.feed(stable, cancel)
+            say("\n".join(runner.results[done:]))
+            return ""
+
+        return RUNNER.submit(AssistantTask(work, name="push-to-talk clause"), POLICY_QUEUE)
+
+    def on_transcribed(text: str) -> AssistantTask:
+        runner = state["runner"]
+        released_at = transcriber.released_at
+
+        def work(cancel: threading.Event, signals) -> str:
+            if not text:
+                return ""
+            done = len(runner.results)
+            runner.feed(text, cancel)
+            say("\n".join(runner.results[done:]))  # the orchestrator speaks the rest
+
+            def on_event(event: str, payload) -> None:
+                if event == "step":
+                    runner.mark_action()
+
+            result = runner.finish(text, lambda rest: ORCHESTRATOR.run_text(rest, cancel, on_event))
+            if runner.first_action_at is not None:
+                latency_ms = (runner.first_action_at - released_at) * 1000
+                log(f"voice latency: end of speech -> first action {latency_ms:.0f} ms")
+            return result
+
+        task = AssistantTask(work, name="push-to-talk")
+        task.signals.finished.connect(
+            lambda result: show_voice_result(app, result_label, text, result, speak=False)
+        )
+        return RUNNER.submit(task, POLICY_QUEUE)  # after this utterance's early clauses
+
+    bridge.pressed.connect(on_pressed)
+    bridge.stable.connect(run_early_clauses)
+    bridge.transcribed.connect(on_transcribed)
+    register_push_to_talk(hotkey, on_press, on_release)
+    log(f"Push-to-talk bound to {hotkey}")
+    return ptt
+
+
 def on_submit(
     app: QApplication,
     window: QWidget,
     input_field: QLineEdit,
     result_label: QLabel,
-    parse_and_run: Callable[[str], str],
-):
+) -> AssistantTask:
     text = input_field.text()
-    try:
-        result = parse_and_run(text)
-    except Exception as exc:  # safeguard to keep UI alive
-        log(f"Unhandled error: {exc}")
-        result = "Произошла ошибка"
+    interrupt_speech()
+
+    def work(cancel: threading.Event, signals) -> str:
+        signals.progress.emit("Выполняю...")
+        return ORCHESTRATOR.run_text(text, cancel)
+
+    task = AssistantTask(work, name="submit")
+    task.signals.progress.connect(result_label.setText)
+    task.signals.finished.connect(
+        lambda result: show_result(app, result_label, result)
+    )
+    return RUNNER.submit(task)
+
+
+def on_voice(
+    app: QApplication,
+    result_label: QLabel,
+) -> AssistantTask:
+    interrupt_speech()
+    recognized = {"text": ""}
+
+    def work(cancel: threading.Event, signals) -> str:
+        def on_event(event: str, payload) -> None:
+            if event == "progress" and payload == "capture":
+                signals.progress.emit("Слушаю...")
+            elif event == "recognized" and payload:
+                signals.partial.emit(payload)
+                signals.progress.emit(f"Распознано: {payload}\nВыполняю...")
+
+        return ORCHESTRATOR.run_voice(5, cancel, on_event)
+
+    def on_partial(text: str) -> None:
+        recognized["text"] = text
+
+    task = AssistantTask(work, name="voice")
+    task.signals.progress.connect(result_label.setText)
+    task.signals.partial.connect(on_partial)
+    task.signals.finished.connect(
+        lambda result: show_voice_result(app, result_label, recognized["text"], result, speak=False)
+    )
+    return RUNNER.submit(task)
+
 
-    if result == "exit":
+def show_result(app: QApplication, result_label: QLabel, result: str):
+    # Spoken per step by the orchestrator already.
+    if result == "exit" or result.endswith("\nexit"):
         app.quit()
     else:
         result_label.setText(result)
 
 
-def on_voice(
+def show_voice_result(
     app: QApplication,
     result_label: QLabel,
-    parse_and_run: Callable[[str], str],
+    text: str,
+    result: str,
+    speak: bool = True,
 ):
-    text = transcribe_once(timeout_sec=5)
     if not text:
-        result_label.setText("Не удалось распознать речь")
+        result_label.setText(result or "Не удалось распознать речь")  # result: why ASR failed
         return
-    try:
-        result = parse_and_run(text)
-    except Exception as exc:
-        log(f"Unhandled error (voice): {exc}")
-        result = "Произошла ошибка"
-
-    if result == "exit":
+    if result == "exit" or result.endswith("\nexit"):
         app.quit()
     else:
-        result_label.setText(f"Распознано: {text}\n{result}")
\ No newline at end of file
+        result_label.setText(f"Распознано: {text}\n{result}")
+        if speak:
+            say(result)
+
+
+def say(text: str) -> None:
+    if SPEAKER is not None and text:
+        SPEAKER.say(text)
+
+
+def interrupt_speech() -> None:
+    """Drop queued speech when a new command arrives."""
+    if SPEAKER is not None:
+        SPEAKER.cancel()
\ No newline at end of file
@@ -0,0 +1,109 @@
+"""Background execution of assistant requests for the Qt UI.
+
+Parsing, ASR and command execution run on a QThreadPool; results come back
+to the GUI thread through Qt signals, so the window never blocks on a
+recording, a model load or an LLM round-trip.
+"""
+
+import threading
+from typing import Callable, Optional, Set
+
+from PyQt6.QtCore import QObject, QRunnable, QThreadPool, pyqtSignal
+
+from logger import log
+
+POLICY_QUEUE = "queue"
+POLICY_PREEMPT = "preempt"
+
+# fn(cancel, signals) -> result text; should return early once `cancel` is set.
+TaskFn = Callable[[threading.Event, "TaskSignals"], str]
+
+
+class TaskSignals(QObject):
+    progress = pyqtSignal(str)
+    partial = pyqtSignal(str)
+    finished = pyqtSignal(str)
+    cancelled = pyqtSignal()
+
+
+class AssistantTask(QRunnable):
+    def __init__(self, fn: TaskFn, name: str = "task"):
+        super().__init__()
+        self.fn = fn
+        self.name = name
+        self.signals = TaskSignals()
+        self.cancel_event = threading.Event()
+
+    def cancel(self) -> None:
+        self.cancel_event.set()
+
+    def run(self) -> None:
+        if self.cancel_event.is_set():
+            self.signals.cancelled.emit()
+            return
+        try:
+            result = self.fn(self.cancel_event, self.signals)
+        except Exception as exc:  # safeguard to keep UI alive
+            log(f"Unhandled error ({self.name}): {exc}")
+            result = "Произошла ошибка"
+        if self.cancel_event.is_set():
+            self.signals.cancelled.emit()
+        else:
+            self.signals.finished.emit(result)
+
+
+class TaskRunner(QObject):
+    """Runs AssistantTasks one at a time on a private thread pool.
+
+    With POLICY_QUEUE new submissions wait for the running one; with
+    POLICY_PREEMPT they drop queued tasks and cancel the running one.
+    Cancellation is cooperative: the running task stops at its next check of
+    `cancel` (the orchestrator checks between stages and plan steps), so a
+    blocking call already in progress - a recording, an LLM request, one
+    desktop operation - completes before the new task starts.
+    """
+
+    busy_changed = pyqtSignal(bool)
+
+    def __init__(self, policy: str = POLICY_PREEMPT, parent: Optional[QObject] = None):
+        super().__init__(parent)
+        if policy not in (POLICY_QUEUE, POLICY_PREEMPT):
+            raise ValueError(f"Unknown submit policy: {policy}")
+        self.policy = policy
+        self.pool = QThreadPool(self)
+        self.pool.setMaxThreadCount(1)
+        self._tasks: Set[AssistantTask] = set()
+
+    @property
+    def busy(self) -> bool:
+        return bool(self._tasks)
+
+    def submit(self, task: AssistantTask, policy: Optional[str] = None) -> AssistantTask:
+        """Queue `task`; `policy` overrides the runner's policy for this task only."""
+        if (policy or self.policy) == POLICY_PREEMPT:
+            self.cancel_all()
+        task.setAutoDelete(False)
+        self._tasks.add(task)
+        task.signals.finished.connect(lambda _result: self._done(task))
+        task.signals.cancelled.connect(lambda: self._done(task))
+        self.pool.start(task)
+        self.busy_changed.emit(True)
+        return task
+
+    def cancel_all(self) -> None:
+        tasks = list(self._tasks)
+        # Flag every task first: once the running one stops, the pool may
+        # start a queued task before tryTake reaches it.
+        for task in tasks:
+            task.cancel()
+        for task in tasks:
+            if self.pool.tryTake(task):
+                task.signals.cancelled.emit()  # never started; listeners still need to know
+
+    def wait(self, msecs: int = -1) -> bool:
+        return self.pool.waitForDone(msecs)
+
+    def _done(self, task: AssistantTask) -> None:
+        self._tasks.discard(task)
+        if not self._tasks:
+            self.busy_changed.emit(False)
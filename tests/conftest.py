@@ -0,0 +1,28 @@
+"""Put src/ on the import path, as the entry points do when run from it."""
+
+import os
+import sys
+from pathlib import Path
+
+import pytest
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / "src"))
+
+
+@pytest.fixture(scope="session", autouse=True)
+def session_log(tmp_path_factory):
+    """Code under test logs through the session logger; send it to a temp file."""
+    from logger import init_logger, shutdown_logger
+
+    path = tmp_path_factory.mktemp("logs") / "session-test.log"
+    init_logger(path)
+    yield path
+    shutdown_logger()
+
+
+@pytest.fixture(scope="session")
+def qt_app():
+    """One QApplication on the offscreen platform, shared by the UI tests."""
+    os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")
+    QtWidgets = pytest.importorskip("PyQt6.QtWidgets")
+    return QtWidgets.QApplication.instance() or QtWidgets.QApplication([])
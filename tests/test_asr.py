@@ -0,0 +1,155 @@
+import threading
+import time
+
+import numpy as np
+import pytest
+
+import asr
+from asr import SAMPLE_RATE, PushToTalk, StreamingTranscriber
+
+
+def frames(start, stop):
+    return np.arange(start, stop, dtype=np.float32)
+
+
+class FakeModel:
+    """Whisper stand-in for audio whose samples are their absolute ring positions.
+
+    Each started second of audio is one segment named after its first
+    position ("s16000"), so the text tells exactly which audio was decoded.
+    While `hold` is set, every decode waits for it before reading the audio.
+    """
+
+    def __init__(self):
+        self.calls = []
+        self.hold = None
+        self.entered = threading.Event()
+
+    def transcribe(self, audio, language, fp16, initial_prompt, condition_on_previous_text):
+        self.entered.set()
+        if self.hold is not None:
+            assert self.hold.wait(5)
+        first = int(audio[0])
+        # Consecutive positions only: anything else is reordered or clobbered audio.
+        np.testing.assert_array_equal(audio, frames(first, first + audio.shape[0]))
+        self.calls.append((first, audio.shape[0], initial_prompt))
+        segments = []
+        for offset in range(0, audio.shape[0], SAMPLE_RATE):
+            end = min(offset + SAMPLE_RATE, audio.shape[0]) / SAMPLE_RATE
+            segments.append({"start": offset / SAMPLE_RATE, "end": end, "text": f" s{first + offset}"})
+        return {"text": "".join(segment["text"] for segment in segments), "segments": segments}
+
+
+@pytest.fixture
+def model(monkeypatch):
+    fake = FakeModel()
+    monkeypatch.setattr(asr, "_model", fake)
+    return fake
+
+
+def test_release_returns_preroll_and_capture():
+    ptt = PushToTalk(preroll_sec=0.25, max_duration_sec=1.0)
+    ptt.ring.write(frames(0, SAMPLE_RATE))
+    ptt.press()
+    ptt.press()  # key repeat keeps the first mark
+    ptt.ring.write(frames(SAMPLE_RATE, 2 * SAMPLE_RATE))
+    np.testing.assert_array_equal(ptt.release(), frames(12000, 2 * SAMPLE_RATE))
+    assert not ptt.active
+    assert ptt.release().size == 0
+
+
+def test_release_after_ring_wraparound():
+    ptt = PushToTalk(preroll_sec=0.5, max_duration_sec=1.0)  # 24000 frames
+    ptt.ring.write(frames(0, 20000))
+    ptt.press()
+    for start in range(20000, 36000, 1024):  # wraps past the end of the ring
+        ptt.ring.write(frames(start, min(start + 1024, 36000)))
+    np.testing.assert_array_equal(ptt.release(), frames(12000, 36000))
+
+
+def test_capture_longer_than_the_ring_keeps_the_newest_audio():
+    ptt = PushToTalk(preroll_sec=0.5, max_duration_sec=1.0)
+    ptt.ring.write(frames(0, 8000))
+    ptt.press()
+    ptt.ring.write(frames(8000, 60000))
+    assert ptt.capture_start == 60000 - 24000
+    np.testing.assert_array_equal(ptt.release(), frames(36000, 60000))
+
+
+def _transcriber(ptt, partials, **kwargs):
+    def on_partial(stable, tentative):
+        partials.append((stable, tentative))
+
+    options = dict(step_sec=0.02, overlap_sec=0.5, min_window_sec=1.0)
+    options.update(kwargs)
+    return StreamingTranscriber(ptt, on_partial=on_partial, **options)
+
+
+def _wait_for(condition, timeout=5.0):
+    deadline = time.monotonic() + timeout
+    while not condition():
+        assert time.monotonic() < deadline
+        time.sleep(0.01)
+
+
+def test_partials_while_recording_and_final_text(model):
+    ptt = PushToTalk(preroll_sec=0, max_duration_sec=10)
+    partials = []
+    transcriber = _transcriber(ptt, partials)
+    transcriber.begin()
+    ptt.ring.write(frames(0, 3 * SAMPLE_RATE))
+    _wait_for(lambda: partials)
+
+    # 3 s decoded: two segments end before the 0.5 s overlap and are committed.
+    assert partials[0] == ("s0 s16000", "s32000")
+    assert transcriber.committed_text == "s0 s16000"
+
+    assert transcriber.finish() == "s0 s16000 s32000"
+    first, length, prompt = model.calls[-1]
+    assert (first, length, prompt) == (32000, SAMPLE_RATE, "s0 s16000")  # committed audio is not decoded again
+    assert not ptt.active
+
+
+def test_streaming_over_a_wrapped_ring(model):
+    ptt = PushToTalk(preroll_sec=0, max_duration_sec=2.0)  # 32000 frames
+    ptt.ring.write(frames(0, SAMPLE_RATE))
+    partials = []
+    transcriber = _transcriber(ptt, partials)
+    transcriber.begin()
+    ptt.ring.write(frames(SAMPLE_RATE, 40000))  # wraps
+    _wait_for(lambda: partials)
+
+    assert partials[0] == ("s16000", "s32000")
+    assert transcriber.finish() == "s16000 s32000"
+    assert model.calls[-1] == (32000, 8000, "s16000")
+
+
+def test_finish_without_speech_needs_no_model(monkeypatch):
+    monkeypatch.setattr(asr, "_model", None)
+    transcriber = StreamingTranscriber(PushToTalk(preroll_sec=0, max_duration_sec=1.0))
+    assert transcriber.finish() == ""
+
+
+def test_new_capture_cannot_clobber_audio_being_decoded(model):
+    ptt = PushToTalk(preroll_sec=0, max_duration_sec=5)
+    transcriber = _transcriber(ptt, [], step_sec=10)  # no partial decodes
+    transcriber.begin()
+    ptt.ring.write(frames(0, SAMPLE_RATE))
+    model.hold = threading.Event()
+    outcome = {}
+    finishing = threading.Thread(target=lambda: outcome.update(text=transcriber.finish()))
+    finishing.start()
+    assert model.entered.wait(5)
+
+    # Key pressed and released again while the final decode still runs.
+    transcriber.begin()
+    ptt.ring.write(frames(SAMPLE_RATE, 2 * SAMPLE_RATE))
+    assert ptt.release().size == 0
+    model.hold.set()
+    finishing.join(5)
+
+    assert outcome == {"text": "s0"}  # FakeModel checked the audio was intact
+    assert model.calls == [(0, SAMPLE_RATE, None)]
+    transcriber.begin()  # allowed again once the decode is done
+    assert ptt.active
+    transcriber.finish()
@@ -0,0 +1,117 @@
+import wave
+
+import numpy as np
+import pytest
+
+from asr import SAMPLE_RATE
+from asr_eval import collect_dataset, load_wav, normalize_words, word_errors
+
+
+@pytest.mark.parametrize(
+    "reference, hypothesis, errors",
+    [
+        ("открой телеграм", "открой телеграм", 0),
+        ("открой телеграм", "закрой телеграм", 1),  # substitution
+        ("открой телеграм", "открой мне телеграм", 1),  # insertion
+        ("создай папку отчёты", "создай отчёты", 1),  # deletion
+        ("создай папку отчёты", "", 3),
+        ("", "привет", 1),
+        ("", "", 0),
+        ("a b c d", "b c d e", 2),  # deletion at the start, insertion at the end
+        ("a b c", "c b a", 2),
+    ],
+)
+def test_word_errors(reference, hypothesis, errors):
+    assert word_errors(reference.split(), hypothesis.split()) == errors
+
+
+@pytest.mark.parametrize(
+    "text, words",
+    [
+        ("Открой Telegram!", ["открой", "telegram"]),
+        ("Создай папку «Отчёты», потом — удали её.", ["создай", "папку", "отчеты", "потом", "удали", "ее"]),
+        ("ЁЛКА ёжик", ["елка", "ежик"]),
+        ("  ", []),
+        ("file_2024 v2.0", ["file_2024", "v2", "0"]),
+    ],
+)
+def test_normalize_words(text, words):
+    assert normalize_words(text) == words
+
+
+def _write_wav(path, samples, rate, width=2, channels=1):
+    if width == 1:
+        data = np.asarray(samples, dtype=np.uint8)
+    else:
+        data = np.asarray(samples, dtype={2: np.int16, 4: np.int32}[width])
+    with wave.open(str(path), "wb") as wf:
+        wf.setnchannels(channels)
+        wf.setsampwidth(width)
+        wf.setframerate(rate)
+        wf.writeframes(data.tobytes())
+
+
+@pytest.mark.parametrize(
+    "width, samples, expected",
+    [
+        (2, [0, 16384, -32768], [0.0, 0.5, -1.0]),
+        (4, [0, 1 << 30, -(1 << 31)], [0.0, 0.5, -1.0]),
+        (1, [128, 192, 0], [0.0, 0.5, -1.0]),
+    ],
+)
+def test_load_wav_sample_widths(tmp_path, width, samples, expected):
+    path = tmp_path / "a.wav"
+    _write_wav(path, samples, SAMPLE_RATE, width=width)
+    audio = load_wav(path)
+    assert audio.dtype == np.float32
+    np.testing.assert_allclose(audio, expected)
+
+
+def test_load_wav_mixes_stereo_to_mono(tmp_path):
+    path = tmp_path / "stereo.wav"
+    _write_wav(path, [16384, 0, -16384, -16384], SAMPLE_RATE, channels=2)  # L/R interleaved
+    np.testing.assert_allclose(load_wav(path), [0.25, -0.5])
+
+
+@pytest.mark.parametrize("rate", [8000, 44100, 48000])
+def test_load_wav_resamples_to_sample_rate(tmp_path, rate):
+    path = tmp_path / "tone.wav"
+    seconds = 0.5
+    t = np.arange(int(rate * seconds)) / rate
+    _write_wav(path, np.round(np.sin(2 * np.pi * 440 * t) * 16000), rate)
+
+    audio = load_wav(path)
+
+    assert audio.dtype == np.float32
+    assert audio.shape[0] == int(SAMPLE_RATE * seconds)
+    expected = np.sin(2 * np.pi * 440 * np.arange(audio.shape[0]) / SAMPLE_RATE) * 16000 / 32768
+    # The last output sample of an upsample lies past the input and repeats its edge.
+    np.testing.assert_allclose(audio[:-2], expected[:-2], atol=0.02)
+
+
+def test_load_wav_rejects_unsupported_width(tmp_path):
+    path = tmp_path / "24bit.wav"
+    with wave.open(str(path), "wb") as wf:
+        wf.setnchannels(1)
+        wf.setsampwidth(3)
+        wf.setframerate(SAMPLE_RATE)
+        wf.writeframes(b"\0" * 6)
+    with pytest.raises(ValueError, match="24bit.wav"):
+        load_wav(path)
+
+
+def test_collect_dataset_pairs_wavs_with_references(tmp_path):
+    for name in ("b", "a", "no_reference"):
+        _write_wav(tmp_path / f"{name}.wav", [0], SAMPLE_RATE)
+    (tmp_path / "a.txt").write_text("  открой телеграм\n", encoding="utf-8")
+    (tmp_path / "b.txt").write_text("создай папку", encoding="utf-8")
+    (tmp_path / "orphan.txt").write_text("без звука", encoding="utf-8")
+
+    assert collect_dataset(tmp_path) == [
+        (tmp_path / "a.wav", "открой телеграм"),
+        (tmp_path / "b.wav", "создай папку"),
+    ]
+
+
+def test_collect_dataset_of_an_empty_directory(tmp_path):
+    assert collect_dataset(tmp_path) == []
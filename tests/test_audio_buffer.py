@@ -0,0 +1,71 @@
+import numpy as np
+import pytest
+
+from audio_buffer import RingBuffer
+
+
+def frames(start, stop):
+    return np.arange(start, stop, dtype=np.float32)
+
+
+def test_rejects_empty_capacity():
+    with pytest.raises(ValueError):
+        RingBuffer(0)
+
+
+def test_read_before_wraparound():
+    buffer = RingBuffer(8)
+    buffer.write(frames(0, 5))
+    assert buffer.position == 5
+    assert buffer.oldest == 0
+    np.testing.assert_array_equal(buffer.read(1, 4), frames(1, 4))
+    np.testing.assert_array_equal(buffer.read(0), frames(0, 5))
+
+
+def test_wraparound_keeps_order():
+    buffer = RingBuffer(8)
+    buffer.write(frames(0, 6))
+    buffer.write(frames(6, 11))  # wraps: slots 6, 7, then 0..2
+    assert buffer.position == 11
+    np.testing.assert_array_equal(buffer.read(5, 11), frames(5, 11))
+    np.testing.assert_array_equal(buffer.read(buffer.oldest), frames(3, 11))
+
+
+def test_write_longer_than_capacity_keeps_newest():
+    buffer = RingBuffer(4)
+    buffer.write(frames(0, 10))
+    assert buffer.position == 10
+    np.testing.assert_array_equal(buffer.read(0), frames(6, 10))
+
+
+def test_read_longer_than_capacity_is_clipped_to_held_frames():
+    buffer = RingBuffer(4)
+    buffer.write(frames(0, 3))
+    buffer.write(frames(3, 7))
+    np.testing.assert_array_equal(buffer.read(0, 100), frames(3, 7))
+
+
+def test_read_into_short_out_keeps_newest():
+    buffer = RingBuffer(8)
+    buffer.write(frames(0, 8))
+    out = np.empty(3, dtype=np.float32)
+    view = buffer.read(0, out=out)
+    np.testing.assert_array_equal(view, frames(5, 8))
+    assert view.base is out or view is out
+
+
+def test_oldest_after_overflow():
+    buffer = RingBuffer(5)
+    buffer.write(frames(0, 3))
+    assert buffer.oldest == 0
+    buffer.write(frames(3, 12))
+    assert buffer.oldest == 7
+    assert buffer.read(0, 7).size == 0  # already overwritten
+    np.testing.assert_array_equal(buffer.read(buffer.oldest), frames(7, 12))
+
+
+def test_empty_write_is_noop():
+    buffer = RingBuffer(4)
+    buffer.write(np.empty(0, dtype=np.float32))
+    assert buffer.position == 0
+    assert buffer.read(0).size == 0
@@ -0,0 +1,96 @@
+import io
+import json
+import time
+
+import pytest
+
+import cli
+import logger
+import tracing
+from core.desktop import Command
+from orchestrator import Orchestrator
+
+
+def test_read_script_skips_blanks_and_comments(tmp_path):
+    script = tmp_path / "commands.txt"
+    script.write_text("# setup\nоткрой telegram\n\n   \n  # indented comment\n  создай папку отчёты  \n", encoding="utf-8")
+    assert cli.read_script(str(script)) == ["открой telegram", "создай папку отчёты"]
+
+
+def test_read_script_from_stdin(monkeypatch):
+    monkeypatch.setattr(cli.sys, "stdin", io.StringIO("help\n# skip\nexit\n"))
+    assert cli.read_script("-") == ["help", "exit"]
+
+
+class FakeSteps:
+    """One step per word; "slow" takes 50 ms and "exit" ends the session."""
+
+    def __init__(self):
+        self.executed = []
+
+    def plan(self, text):
+        return [Command("open", {"target": word}) for word in text.split()]
+
+    @tracing.traced("fake.step")
+    def execute(self, step):
+        target = step.args["target"]
+        if target == "slow":
+            time.sleep(0.05)
+        self.executed.append(target)
+        return target, True
+
+
+@pytest.fixture
+def run_cli(tmp_path, monkeypatch, session_log):
+    """Call cli.main with fake stages, logging into tmp_path; returns (code, stdout lines)."""
+    steps = FakeSteps()
+    monkeypatch.setattr(cli, "Orchestrator", lambda: Orchestrator(plan=steps.plan, execute=steps.execute))
+    monkeypatch.setattr(cli, "new_session_log_path", lambda: tmp_path / "session-cli.log")
+    monkeypatch.setattr(tracing, "TRACE_ENABLED", True)
+
+    def run(argv, capsys):
+        code = cli.main(argv)
+        return code, capsys.readouterr().out.splitlines()
+
+    run.steps = steps
+    yield run
+    logger.init_logger(session_log)  # main() shut the session logger down
+
+
+def test_commands_run_in_order_until_exit(run_cli, capsys):
+    code, lines = run_cli(["-c", "первая", "-c", "вторая третья", "-c", "exit", "-c", "после"], capsys)
+    assert code == 0
+    assert lines == ["первая", "вторая", "третья"]
+    assert run_cli.steps.executed == ["первая", "вторая", "третья", "exit"]
+
+
+def test_json_output_has_result_and_stage_timings(run_cli, capsys):
+    code, lines = run_cli(["--json", "-c", "slow fast", "-c", "fast"], capsys)
+    assert code == 0
+    first, second = (json.loads(line) for line in lines)
+    assert first["command"] == "slow fast"
+    assert first["result"] == "slow\nfast"
+    assert {"plan", "execute"} <= set(first["stages_ms"])
+    assert first["stages_ms"]["execute"] >= 50  # the slow step
+    assert first["ms"] >= first["stages_ms"]["execute"]
+    assert second["result"] == "fast"
+    assert second["stages_ms"]["execute"] < 50
+
+
+def test_script_file(run_cli, capsys, tmp_path):
+    script = tmp_path / "commands.txt"
+    script.write_text("# comment\nраз\n\nдва\n", encoding="utf-8")
+    assert run_cli(["--script", str(script)], capsys) == (0, ["раз", "два"])
+
+
+def test_missing_script_file(run_cli, capsys, tmp_path):
+    assert cli.main(["--script", str(tmp_path / "missing.txt")]) == 2
+    assert "missing.txt" in capsys.readouterr().err
+
+
+def test_logs_and_trace_are_flushed_on_exit(run_cli, capsys, tmp_path):
+    run_cli(["-c", "раз два"], capsys)
+    assert tracing.trace_path() is None
+    assert "CLI started" in (tmp_path / "session-cli.log").read_text(encoding="utf-8")
+    spans = list(tracing.read_spans([tmp_path / "session-cli.trace.jsonl"]))
+    assert [span["name"] for span in spans] == ["fake.step", "fake.step"]
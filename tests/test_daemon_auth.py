@@ -0,0 +1,82 @@
+import stat
+import sys
+import threading
+from multiprocessing import AuthenticationError
+
+import pytest
+
+import daemon_client
+from daemon import AssistantDaemon
+from daemon_client import DaemonClient, load_authkey, recv_message
+
+pytestmark = pytest.mark.skipif(sys.platform == "win32", reason="Unix socket transport")
+
+
+@pytest.fixture
+def running_daemon(tmp_path, monkeypatch):
+    monkeypatch.setenv("ASSISTANT_AUTHKEY_FILE", str(tmp_path / "keys" / "daemon.key"))
+    monkeypatch.setenv("USERPROFILE", str(tmp_path))
+    monkeypatch.setattr(AssistantDaemon, "warm_up", lambda self: None)
+    daemon = AssistantDaemon(str(tmp_path / "assistant.sock"))
+    thread = threading.Thread(target=daemon.serve_forever, daemon=True)
+    thread.start()
+    # The socket file exists from bind(); connecting before listen() is refused.
+    assert daemon.ready.wait(5)
+    yield daemon
+    daemon.stop()
+    thread.join(5)
+    assert not thread.is_alive()
+
+
+def test_key_file_is_private_and_stable(tmp_path, monkeypatch):
+    path = tmp_path / "keys" / "daemon.key"
+    monkeypatch.setenv("ASSISTANT_AUTHKEY_FILE", str(path))
+    with pytest.raises(FileNotFoundError):
+        load_authkey()
+    key = load_authkey(create=True)
+    assert len(key) == 32
+    assert stat.S_IMODE(path.stat().st_mode) == 0o600
+    assert load_authkey() == key == load_authkey(create=True)
+
+
+def test_client_with_the_key_is_served(running_daemon):
+    with DaemonClient(running_daemon.address) as client:
+        assert client.request({"cmd": "ping"}) == {"ok": True, "result": "pong"}
+
+
+def test_client_without_the_key_is_rejected(running_daemon):
+    with pytest.raises(AuthenticationError):
+        DaemonClient(running_daemon.address, authkey=b"not the key")
+    # The daemon keeps serving legitimate clients afterwards.
+    with DaemonClient(running_daemon.address) as client:
+        assert client.request({"cmd": "ping"})["ok"]
+
+
+@pytest.mark.parametrize(
+    "message, error",
+    [
+        (["cmd", "ping"], "Некорректный запрос к демону"),
+        ("ping", "Некорректный запрос к демону"),
+        ({"cmd": "profile", "every": "often"}, "Некорректное значение every: 'often'"),
+        ({"cmd": "profile", "every": [2]}, "Некорректное значение every: [2]"),
+        ({"cmd": "reboot"}, "Неизвестная команда демона: reboot"),
+    ],
+)
+def test_malformed_message_gets_an_error_reply(running_daemon, message, error):
+    with DaemonClient(running_daemon.address) as client:
+        assert client.request(message) == {"ok": False, "error": error}
+        assert client.request({"cmd": "ping"}) == {"ok": True, "result": "pong"}
+
+
+def test_undecodable_frame_gets_an_error_reply(running_daemon):
+    with DaemonClient(running_daemon.address) as client:
+        client._conn.send_bytes(b"\xff not json")
+        assert recv_message(client._conn) == {"ok": False, "error": "Некорректный запрос к демону"}
+        assert client.request({"cmd": "ping"})["ok"]
+
+
+def test_default_key_location_is_per_user(monkeypatch):
+    monkeypatch.delenv("ASSISTANT_AUTHKEY_FILE", raising=False)
+    monkeypatch.setenv("XDG_CONFIG_HOME", "/home/someone/.config")
+    monkeypatch.setattr(daemon_client.sys, "platform", "linux")
+    assert daemon_client.authkey_path() == "/home/someone/.config/pc-assistant/daemon.key"
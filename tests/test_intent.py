@@ -0,0 +1,89 @@
+import pytest
+
+import dekstop_ops
+import intent
+import llm_parser
+
+
+@pytest.fixture
+def desktop(tmp_path, monkeypatch):
+    root = tmp_path / "Desktop"
+    root.mkdir()
+    for name in ("report.txt", "notes.md", "Telegram.lnk"):
+        (root / name).touch()
+    (root / "Проекты").mkdir()
+    monkeypatch.setenv("USERPROFILE", str(tmp_path))
+    monkeypatch.setenv("PUBLIC", str(tmp_path / "Public"))
+    monkeypatch.setattr(dekstop_ops, "_items_cache", None)
+    yield root
+    dekstop_ops._items_cache = None
+
+
+@pytest.fixture
+def llm_calls(monkeypatch):
+    calls = []
+
+    def fake_llm(text):
+        calls.append(text)
+        return []
+
+    monkeypatch.setattr(llm_parser, "API_KEY", "test")
+    monkeypatch.setattr(llm_parser, "INTENT_ENABLED", True)
+    monkeypatch.setattr(llm_parser, "_call_llm", fake_llm)
+    return calls
+
+
+@pytest.mark.parametrize("text", [
+    "удалять report.txt не надо",
+    "не удаляй report.txt",
+    "don't delete report.txt",
+    "send report.txt to boss",
+    "move notes.md to trash",
+    "выйди из хрома",
+    "открой проекты и удали notes.md",
+    "rename report.txt to boss",
+    "quit chrome",
+])
+def test_risky_requests_go_to_the_llm(desktop, llm_calls, text):
+    assert intent.plan_locally(text) is None
+    assert llm_parser.parse_with_llm(text) == []
+    assert llm_calls == [text]
+
+
+@pytest.mark.parametrize("action, args", [
+    ("delete", {"target": "report.txt", "confirm": False}),
+    ("rename", {"old": "report.txt", "new": "boss"}),
+    ("close", {"target": "chrome"}),
+    ("exit", {}),
+])
+def test_confident_destructive_prediction_is_not_planned(desktop, monkeypatch, action, args):
+    plan = intent.LocalPlan(intent.Command(action, args), action, confidence=1.0)
+    monkeypatch.setattr(intent, "classify", lambda text: plan)
+    assert intent.plan_locally("something vague") is None
+
+
+@pytest.mark.parametrize("text, action, args", [
+    ("удали report.txt", "delete", {"target": "report.txt", "confirm": False}),
+    ("переименуй report.txt -> summary.txt", "rename", {"old": "report.txt", "new": "summary.txt"}),
+    ("закрыть telegram", "close", {"target": "telegram"}),
+    ("выход", "exit", {}),
+    ("help", "help", {}),
+])
+def test_exact_rule_matches_run_locally(desktop, llm_calls, text, action, args):
+    steps = llm_parser.parse_with_llm(text)
+    assert [(step.action, step.args) for step in steps] == [(action, args)]
+    assert llm_calls == []
+
+
+@pytest.mark.parametrize("text", [
+    "удали отчёт",                   # no such item
+    "переименуй report.txt summary",  # no "->"
+])
+def test_inexact_destructive_rules_are_not_local(desktop, text):
+    assert intent.exact_command(text) is None
+
+
+def test_classifier_plans_safe_actions(desktop, llm_calls):
+    steps = llm_parser.parse_with_llm("запусти пожалуйста notes.md")
+    assert [(step.action, step.args) for step in steps] == [("open", {"target": "notes.md"})]
+    assert llm_calls == []
@@ -0,0 +1,79 @@
+import os
+import threading
+import time
+
+import pytest
+
+from logger import init_logger, log, prune_sessions, shutdown_logger
+
+
+def _session(logs, stamp, age_days=0.0, profile=False):
+    paths = [logs / f"session-{stamp}.log", logs / f"session-{stamp}.trace.jsonl"]
+    for path in paths:
+        path.write_text("x", encoding="utf-8")
+    if profile:
+        directory = logs / f"profile-session-{stamp}"
+        directory.mkdir()
+        (directory / "cmd-0001.pstats").write_bytes(b"x")
+        paths.append(directory)
+    mtime = time.time() - age_days * 86400
+    for path in paths:
+        os.utime(path, (mtime, mtime))
+    return paths
+
+
+def test_prune_removes_profile_directories_with_their_session(tmp_path):
+    old = _session(tmp_path, "20240101-120000", profile=True)
+    kept = _session(tmp_path, "20240102-120000", profile=True)
+    current = _session(tmp_path, "20240103-120000")
+
+    prune_sessions(tmp_path, keep=2, max_age_days=0, current=current[0])
+
+    assert not any(path.exists() for path in old)
+    assert all(path.exists() for path in kept + current)
+
+
+def test_prune_removes_old_profile_directories(tmp_path):
+    old = _session(tmp_path, "20240101-120000", age_days=30, profile=True)
+    fresh = _session(tmp_path, "20240102-120000", profile=True)
+
+    prune_sessions(tmp_path, keep=0, max_age_days=14)
+
+    assert not any(path.exists() for path in old)
+    assert all(path.exists() for path in fresh)
+
+
+@pytest.fixture
+def fresh_log(tmp_path, session_log):
+    """A logger writing to its own file; the session logger is restored afterwards."""
+    path = tmp_path / "session-20240101-120000.log"
+    init_logger(path, compress=False)
+    yield path
+    init_logger(session_log)
+
+
+def test_shutdown_writes_every_queued_record(fresh_log):
+    count = 5000
+
+    def emit(worker):
+        for index in range(count // 4):
+            log(f"record {worker}-{index}")
+
+    threads = [threading.Thread(target=emit, args=(worker,)) for worker in range(4)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    shutdown_logger()
+
+    lines = fresh_log.read_text(encoding="utf-8").splitlines()
+    assert lines[0].endswith("Logger initialized")
+    records = [line.rsplit(" ", 1)[1] for line in lines[1:]]
+    assert len(records) == count
+    assert set(records) == {f"{worker}-{index}" for worker in range(4) for index in range(count // 4)}
+
+
+def test_records_after_shutdown_are_written_directly(fresh_log):
+    shutdown_logger()
+    log("after shutdown")
+    assert fresh_log.read_text(encoding="utf-8").splitlines()[-1].endswith("after shutdown")
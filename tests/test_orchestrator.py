@@ -0,0 +1,219 @@
+import asyncio
+import threading
+import time
+
+from core.desktop import Command
+from orchestrator import Orchestrator, OrchestratorThread
+from pipeline import CANCELLED, TranscriptionError
+
+
+class SlowSteps:
+    """execute() stand-in: the first step blocks until released."""
+
+    def __init__(self):
+        self.started = threading.Event()
+        self.release = threading.Event()
+        self.executed = []
+
+    def plan(self, text):
+        return [Command("open", {"target": name}) for name in text.split()]
+
+    def execute(self, step):
+        target = step.args["target"]
+        if not self.executed:
+            self.started.set()
+            self.release.wait(5)
+        self.executed.append(target)
+        return f"done {target}", True
+
+
+def test_cancel_waits_for_running_step_and_reports_it():
+    steps = SlowSteps()
+
+    async def scenario():
+        orchestrator = Orchestrator(plan=steps.plan, execute=steps.execute)
+        await orchestrator.start()
+        try:
+            request = await orchestrator.submit_text("a b c")
+            await asyncio.get_running_loop().run_in_executor(None, steps.started.wait, 5)
+            orchestrator.cancel_request(request)
+            await asyncio.sleep(0.1)
+            assert not request.future.done()  # step "a" is still running
+            steps.release.set()
+            return await asyncio.wait_for(request.future, 5)
+        finally:
+            await orchestrator.stop()
+
+    result = asyncio.run(scenario())
+    assert steps.executed == ["a"]
+    assert result == f"done a\n{CANCELLED}: выполнено шагов 1 из 3"
+
+
+def test_cancel_before_any_step():
+    steps = SlowSteps()
+
+    async def scenario():
+        orchestrator = Orchestrator(plan=steps.plan, execute=steps.execute)
+        await orchestrator.start()
+        try:
+            cancel = threading.Event()
+            cancel.set()
+            request = await orchestrator.submit_text("a b", cancel=cancel)
+            return await asyncio.wait_for(request.future, 5)
+        finally:
+            await orchestrator.stop()
+
+    assert asyncio.run(scenario()) == CANCELLED
+    assert steps.executed == []
+
+
+def test_thread_wrapper_returns_only_after_the_step_returns():
+    steps = SlowSteps()
+    orchestrator = OrchestratorThread(plan=steps.plan, execute=steps.execute)
+    cancel = threading.Event()
+    outcome = {}
+    try:
+        caller = threading.Thread(target=lambda: outcome.update(result=orchestrator.run_text("a b", cancel)))
+        caller.start()
+        assert steps.started.wait(5)
+        cancel.set()
+        caller.join(0.3)
+        assert caller.is_alive()  # not reported as cancelled while "a" runs
+        steps.release.set()
+        caller.join(5)
+    finally:
+        orchestrator.close()
+    assert outcome["result"] == f"done a\n{CANCELLED}: выполнено шагов 1 из 2"
+    assert steps.executed == ["a"]
+
+
+def test_close_resolves_requests_still_in_flight():
+    steps = SlowSteps()
+    orchestrator = OrchestratorThread(plan=steps.plan, execute=steps.execute)
+    outcome = {}
+    caller = threading.Thread(target=lambda: outcome.update(result=orchestrator.run_text("a b")), daemon=True)
+    queued = threading.Thread(target=lambda: outcome.update(queued=orchestrator.run_text("c")), daemon=True)
+    try:
+        caller.start()
+        assert steps.started.wait(5)
+        queued.start()
+        deadline = time.monotonic() + 5
+        while orchestrator.orchestrator._queues["execute"].qsize() < 1:  # "c" waits behind "a b"
+            assert time.monotonic() < deadline
+            time.sleep(0.01)
+        orchestrator.close()  # "a" is still blocked in execute
+        caller.join(2)
+        queued.join(2)
+        assert not caller.is_alive() and not queued.is_alive()
+    finally:
+        steps.release.set()
+    assert outcome == {"result": CANCELLED, "queued": CANCELLED}
+
+
+class Timeline:
+    """Fake stages that record when each step executes and is spoken."""
+
+    def __init__(self, step_sec=0.1):
+        self.step_sec = step_sec
+        self.spans = {}
+        self.executed = []
+        self._lock = threading.Lock()
+
+    def _record(self, key, started):
+        with self._lock:
+            self.spans[key] = (started, time.perf_counter())
+
+    def plan(self, text):
+        return [Command("open", {"target": name}) for name in text.split()]
+
+    def execute(self, step):
+        started = time.perf_counter()
+        time.sleep(self.step_sec)
+        target = step.args["target"]
+        self.executed.append(target)
+        self._record(("execute", target), started)
+        return target, True
+
+    def speak(self, text):
+        started = time.perf_counter()
+        time.sleep(self.step_sec)
+        self._record(("speak", text), started)
+
+
+def overlaps(first, second):
+    return first[0] < second[1] and second[0] < first[1]
+
+
+def test_step_is_spoken_while_the_next_one_executes():
+    timeline = Timeline()
+
+    async def scenario():
+        orchestrator = Orchestrator(plan=timeline.plan, execute=timeline.execute, speak=timeline.speak)
+        await orchestrator.start()
+        try:
+            result = await asyncio.wait_for(orchestrator.run_text("a b c"), 5)
+            await asyncio.sleep(2 * timeline.step_sec)  # let "c" finish speaking
+            return result
+        finally:
+            await orchestrator.stop()
+
+    assert asyncio.run(scenario()) == "a\nb\nc"
+    spans = timeline.spans
+    assert overlaps(spans[("speak", "a")], spans[("execute", "b")])
+    assert overlaps(spans[("speak", "b")], spans[("execute", "c")])
+    # Three steps plus speech of the last one, not six sequential sleeps.
+    total = spans[("speak", "c")][1] - spans[("execute", "a")][0]
+    assert total < 5.5 * timeline.step_sec
+
+
+def test_full_speak_queue_blocks_execute():
+    release = threading.Event()
+    executed = []
+
+    def execute(step):
+        executed.append(step.args["target"])
+        return step.args["target"], True
+
+    async def scenario():
+        orchestrator = Orchestrator(
+            plan=lambda text: [Command("open", {"target": name}) for name in text.split()],
+            execute=execute,
+            speak=lambda text: release.wait(5),
+            queue_size=1,
+        )
+        await orchestrator.start()
+        try:
+            request = await orchestrator.submit_text("a b c d e")
+            await asyncio.sleep(0.3)
+            # "a" is being spoken, "b" fills the queue, putting "c" blocks execute.
+            stalled = list(executed)
+            assert not request.future.done()
+            release.set()
+            result = await asyncio.wait_for(request.future, 5)
+            return stalled, result
+        finally:
+            release.set()
+            await orchestrator.stop()
+
+    stalled, result = asyncio.run(scenario())
+    assert stalled == ["a", "b", "c"]
+    assert result == "a\nb\nc\nd\ne"
+
+
+def test_transcription_error_is_reported_not_planned():
+    planned = []
+
+    def transcribe(audio):
+        raise TranscriptionError("ffmpeg не найден")
+
+    async def scenario():
+        orchestrator = Orchestrator(transcribe=transcribe, plan=lambda text: planned.append(text) or [])
+        await orchestrator.start()
+        try:
+            request = await orchestrator.submit_voice(audio=b"pcm")
+            return await asyncio.wait_for(request.future, 5)
+        finally:
+            await orchestrator.stop()
+
+    assert asyncio.run(scenario()) == "ffmpeg не найден"
+    assert planned == []
@@ -0,0 +1,39 @@
+import pytest
+
+from pipeline import ClauseRunner, split_clauses
+
+
+@pytest.mark.parametrize("text, expected", [
+    ("создай папку а потом открой б", ["создай папку а", "открой б"]),
+    ("открой хром, а потом открой стим", ["открой хром", "открой стим"]),
+    ("открой хром, потом справка. и затем помощь", ["открой хром", "справка", "помощь"]),
+    ("open a then open b", ["open a", "open b"]),
+])
+def test_split_clauses(text, expected):
+    assert split_clauses(text) == expected
+
+
+def test_first_action_marked_after_planned_steps_run():
+    calls = []
+
+    def run_text(text):
+        calls.append(("run", runner.first_action_at))
+        return "done"
+
+    runner = ClauseRunner(run_text)
+    assert runner.finish("удали отчет") == "done"
+    assert calls == [("run", None)]
+    assert runner.first_action_at is not None
+
+
+def test_run_text_can_report_its_first_step():
+    def run_text(text):
+        runner.mark_action()
+        first = runner.first_action_at
+        runner.mark_action()
+        assert runner.first_action_at == first
+        return "done"
+
+    runner = ClauseRunner(run_text)
+    runner.finish("удали отчет")
+    assert runner.first_action_at is not None
@@ -0,0 +1,89 @@
+"""Closing programs against real child processes (Linux /proc backend)."""
+
+import os
+import shutil
+import signal
+import subprocess
+import sys
+import time
+
+import pytest
+
+import process_ops
+
+pytestmark = pytest.mark.skipif(not sys.platform.startswith("linux"), reason="uses /proc")
+
+
+@pytest.fixture
+def fresh_table(monkeypatch, tmp_path):
+    # An empty desktop, so find_app matches processes by name only.
+    home = tmp_path / "home"
+    (home / "Desktop").mkdir(parents=True)
+    monkeypatch.setenv("USERPROFILE", str(home))
+    monkeypatch.setenv("PUBLIC", str(home / "Public"))
+    table = process_ops.ProcessTable(ttl_sec=0)
+    monkeypatch.setattr(process_ops, "_table", table)
+    return table
+
+
+@pytest.fixture
+def spawn(tmp_path):
+    """Start `sleep` under a unique program name; kill leftovers afterwards."""
+    children = []
+
+    def start(name, ignore_sigterm=False):
+        program = tmp_path / name
+        shutil.copy(shutil.which("sleep"), program)
+        preexec = (lambda: signal.signal(signal.SIGTERM, signal.SIG_IGN)) if ignore_sigterm else None
+        # Popen returns after exec, and an ignored SIGTERM survives exec.
+        child = subprocess.Popen([str(program), "30"], preexec_fn=preexec)
+        children.append(child)
+        return child
+
+    yield start
+    for child in children:
+        if child.poll() is None:
+            child.kill()
+            child.wait()
+
+
+def test_close_app_sends_sigterm(fresh_table, spawn):
+    name = f"zzterm{os.getpid()}"
+    child = spawn(name)
+
+    assert process_ops.close_app(name) == f"Закрываю {name}"
+    assert child.wait(timeout=5) == -signal.SIGTERM
+
+
+def test_child_ignoring_sigterm_is_killed_after_timeout(fresh_table, spawn, monkeypatch):
+    monkeypatch.setattr(process_ops, "CLOSE_TIMEOUT_SEC", 0.3)
+    name = f"zzstub{os.getpid()}"
+    child = spawn(name, ignore_sigterm=True)
+
+    started = time.monotonic()
+    process_ops.close_app(name)
+    assert child.wait(timeout=5) == -signal.SIGKILL
+    assert time.monotonic() - started >= 0.3
+
+
+def test_terminate_reports_escalation(fresh_table, spawn):
+    name = f"zzkill{os.getpid()}"
+    child = spawn(name, ignore_sigterm=True)
+    [info] = fresh_table.find(name)
+
+    assert process_ops.terminate([info], timeout_sec=0.2) == {child.pid: "killed"}
+    child.wait(timeout=5)
+
+
+def test_index_drops_dead_pids(fresh_table, spawn):
+    name = f"zzgone{os.getpid()}"
+    child = spawn(name)
+    [info] = fresh_table.find(name)
+    assert info.pid == child.pid
+
+    child.kill()
+    child.wait()
+    fresh_table.refresh(force=True)
+
+    assert fresh_table.find(name) == []
+    assert child.pid not in fresh_table._processes
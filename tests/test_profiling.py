@@ -0,0 +1,57 @@
+import tracemalloc
+
+import pytest
+
+import profiling
+
+
+@pytest.fixture(autouse=True)
+def restore_settings(monkeypatch):
+    """enable() leaves the output directory set; do not leak a deleted tmp_path."""
+    monkeypatch.setattr(profiling, "_every", profiling._every)
+    monkeypatch.setattr(profiling, "_directory", profiling._directory)
+
+
+@pytest.fixture
+def every_command(tmp_path):
+    profiling.enable(1, tmp_path)
+    yield tmp_path
+    profiling.disable()
+
+
+def test_tracemalloc_runs_only_during_sampled_commands(every_command):
+    seen = []
+
+    @profiling.profiled
+    def command(text):
+        seen.append(tracemalloc.is_tracing())
+        return [bytes(1024) for _ in range(100)]
+
+    assert not tracemalloc.is_tracing()
+    command("first")
+    command("second")
+    assert seen == [True, True]
+    assert not tracemalloc.is_tracing()
+    assert len(list(every_command.glob("cmd-*.pstats"))) == 2
+    assert len(list(every_command.glob("cmd-*.alloc.json"))) == 2
+
+
+def test_unsampled_commands_do_not_trace(tmp_path):
+    profiling.enable(1000, tmp_path)
+    try:
+        seen = []
+        command = profiling.profiled(lambda text: seen.append(tracemalloc.is_tracing()))
+        command("a")
+        command("b")
+    finally:
+        profiling.disable()
+    assert seen == [False, False]
+
+
+def test_overlapping_samples_keep_tracing_until_the_last_finishes(every_command):
+    first = profiling.sample()
+    second = profiling.sample()
+    first.finish("first")
+    assert tracemalloc.is_tracing()
+    second.finish("second")
+    assert not tracemalloc.is_tracing()
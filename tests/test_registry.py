@@ -0,0 +1,134 @@
+import subprocess
+import sys
+from pathlib import Path
+
+import pytest
+
+from core import registry
+from core.desktop import EMPTY_COMMAND, INVALID_COMMAND, parse_command
+from core.registry import Action, Trigger, TriggerTrie
+
+SRC = Path(__file__).resolve().parent.parent / "src"
+
+
+def parsed(text):
+    result = parse_command(text)
+    return result if isinstance(result, str) else (result.action, result.args)
+
+
+def test_longest_prefix_wins():
+    trie = TriggerTrie()
+    trie.insert(("создай",), Trigger("create"))
+    trie.insert(("создай", "папку"), Trigger("create", (("kind", "folder"),)))
+
+    trigger, consumed = trie.longest_prefix(["создай", "папку", "отчёты"])
+    assert (trigger.preset, consumed) == ((("kind", "folder"),), 2)
+    trigger, consumed = trie.longest_prefix(["создай", "файл", "a", "txt"])
+    assert (trigger.preset, consumed) == ((), 1)
+    assert trie.longest_prefix(["удали", "a"]) is None
+
+
+def test_exact_trigger_matches_only_the_whole_input():
+    trie = TriggerTrie()
+    trie.insert(("закрой",), Trigger("close"))
+    trie.insert(("закрой", "ассистент"), Trigger("exit", exact=True))
+
+    assert trie.longest_prefix(["закрой", "ассистент"])[0].action == "exit"
+    assert trie.longest_prefix(["закрой", "ассистент", "сейчас"]) == (Trigger("close"), 1)
+
+
+def test_duplicate_phrase_is_rejected():
+    trie = TriggerTrie()
+    trie.insert(("открой",), Trigger("open"))
+    with pytest.raises(ValueError, match="открой"):
+        trie.insert(("открой",), Trigger("launch"))
+
+    with pytest.raises(ValueError, match="'open'"):
+        registry.register("launch", lambda args: "", ("Открой",))
+    assert registry.get_action("launch") is None
+    assert parsed("открой a") == ("open", {"target": "a"})
+
+
+def test_handler_is_imported_on_first_run(tmp_path, monkeypatch):
+    (tmp_path / "lazy_handler_mod.py").write_text("def run(args):\n    return 'ran ' + args['x']\n")
+    monkeypatch.syspath_prepend(str(tmp_path))
+    action = Action("lazy", "lazy_handler_mod:run")
+
+    assert "lazy_handler_mod" not in sys.modules
+    assert action.run({"x": "1"}) == "ran 1"
+    assert "lazy_handler_mod" in sys.modules
+    monkeypatch.delitem(sys.modules, "lazy_handler_mod")
+
+
+def test_parsing_does_not_import_handlers():
+    code = (
+        "import sys; from core.desktop import parse_command; "
+        "[parse_command(t) for t in ('открой a', 'удали b', 'закрой c', 'help')]; "
+        "print(sorted({'core.handlers', 'dekstop_ops', 'process_ops'} & set(sys.modules)))"
+    )
+    output = subprocess.run([sys.executable, "-c", code], cwd=SRC, capture_output=True, text=True, check=True)
+    assert output.stdout.strip() == "[]"
+
+
+@pytest.mark.parametrize("text, expected", [
+    ("новая папка X", ("create", {"kind": "folder", "name": "X", "ext": None})),
+    ("create folder Проекты", ("create", {"kind": "folder", "name": "Проекты", "ext": None})),
+    ("новый файл notes txt", ("create", {"kind": "file", "name": "notes", "ext": "txt"})),
+    ("создай файл notes", ("create", {"kind": "file", "name": None, "ext": None})),
+])
+def test_preset_args(text, expected):
+    assert parsed(text) == expected
+
+
+# Output of the if/elif parse_command this registry replaced.
+BASELINE = [
+    ("открой telegram", ("open", {"target": "telegram"})),
+    ("Открой  Мой   Файл.txt", ("open", {"target": "Мой Файл.txt"})),
+    ("open", ("open", {"target": None})),
+    ("start Notepad", ("open", {"target": "Notepad"})),
+    ("переименуй a.txt b.txt", ("rename", {"old": "a.txt", "new": "b.txt"})),
+    ("переименуй Старый отчёт -> Новый отчёт", ("rename", {"old": "Старый отчёт", "new": "Новый отчёт"})),
+    ("rename a", ("rename", {"old": "a", "new": None})),
+    ("удали report.txt", ("delete", {"target": "report.txt", "confirm": False})),
+    ("remove a OK", ("delete", {"target": "a", "confirm": True})),
+    ("delete", ("delete", {"target": None, "confirm": False})),
+    ("создай папку Отчёты", ("create", {"kind": "folder", "name": "Отчёты", "ext": None})),
+    ("создай folder Проекты 2024", ("create", {"kind": "folder", "name": "Проекты 2024", "ext": None})),
+    ("создать файл a b txt", ("create", {"kind": "file", "name": "a b", "ext": "txt"})),
+    ("создай", ("create", {"kind": None, "name": None, "ext": None})),
+    ("create widget x", ("create", {"kind": None, "name": None, "ext": None})),
+    ("что", ("get", {"filter": None})),
+    ("какие pdf", ("get", {"filter": "pdf"})),
+    ("list Doc", ("get", {"filter": "Doc"})),
+    ("help", ("help", {})),
+    ("HELP me", ("help", {})),
+    ("выход", ("exit", {})),
+    ("Exit", ("exit", {})),
+    ("q", ("exit", {})),
+    ("quit now", INVALID_COMMAND),
+    ("exit please", INVALID_COMMAND),
+    ("", EMPTY_COMMAND),
+    ("   ", EMPTY_COMMAND),
+    ("привет", INVALID_COMMAND),
+]
+
+
+@pytest.mark.parametrize("text, expected", BASELINE)
+def test_parse_command_matches_the_old_parser(text, expected):
+    assert parsed(text) == expected
+
+
+# Phrases the registry added on purpose; the old parser rejected them, or
+# read "что на рабочем столе" as a filter that matched nothing.
+ADDED = [
+    ("что на рабочем столе", ("get", {"filter": None})),
+    ("покажи рабочий стол", ("get", {"filter": None})),
+    ("закрой telegram", ("close", {"target": "telegram"})),
+    ("закрой ассистент", ("exit", {})),
+    ("справка", ("help", {})),
+]
+
+
+@pytest.mark.parametrize("text, expected", ADDED)
+def test_registry_phrases(text, expected):
+    assert parsed(text) == expected
@@ -0,0 +1,132 @@
+import asyncio
+import json
+import threading
+
+import pytest
+
+import tracing
+from core.desktop import Command
+from orchestrator import Orchestrator
+
+
+@pytest.fixture
+def trace_file(tmp_path, monkeypatch):
+    monkeypatch.setattr(tracing, "TRACE_ENABLED", True)
+    path = tmp_path / "session-test.trace.jsonl"
+    tracing.init_tracing(path)
+    yield path
+    tracing.close_tracing()
+
+
+def _records(path):
+    tracing.close_tracing()
+    return list(tracing.read_spans([path]))
+
+
+def test_nested_spans_point_at_their_parent(trace_file):
+    with tracing.span("outer") as outer:
+        with tracing.span("inner", step=1) as inner:
+            pass
+        with tracing.span("sibling"):
+            pass
+
+    records = {record["name"]: record for record in _records(trace_file)}
+    assert records["outer"]["parent"] is None
+    assert records["inner"]["parent"] == outer.id
+    assert records["sibling"]["parent"] == outer.id
+    assert records["inner"]["id"] == inner.id
+    assert records["inner"]["attrs"] == {"step": 1}
+
+
+def test_spans_are_written_as_json_lines(trace_file):
+    @tracing.traced("work")
+    def work():
+        raise KeyError("x")
+
+    with tracing.span("request", model="test") as current:
+        current.set(status=200)
+    with pytest.raises(KeyError):
+        work()
+
+    records = _records(trace_file)
+    lines = trace_file.read_text(encoding="utf-8").splitlines()
+    assert len(lines) == 2
+    assert [json.loads(line) for line in lines] == records
+    request, failed = records
+    assert request["attrs"] == {"model": "test", "status": 200}
+    assert request["thread"] == threading.current_thread().name
+    assert request["ms"] >= 0 and request["start"] > 0
+    assert "error" not in request
+    assert failed["name"] == "work" and failed["error"] == "KeyError"
+
+
+def test_spans_from_many_threads_are_all_written(trace_file):
+    def emit():
+        for _ in range(200):
+            with tracing.span("worker"):
+                pass
+
+    threads = [threading.Thread(target=emit) for _ in range(4)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert len(_records(trace_file)) == 800
+
+
+def test_spans_are_dropped_when_tracing_is_off(tmp_path):
+    with tracing.span("ignored"):
+        pass
+    assert tracing.trace_path() is None
+
+
+def test_report_counts_errors_and_percentiles(tmp_path):
+    path = tmp_path / "a.trace.jsonl"
+    records = [{"name": "asr", "ms": float(ms)} for ms in range(1, 11)]
+    records.append({"name": "asr", "ms": 50.0, "error": "TimeoutError"})
+    records.append({"name": "llm", "ms": 7.0})
+    path.write_text("\n".join(json.dumps(record) for record in records) + '\n{"name": "to', encoding="utf-8")
+
+    rows = tracing.report([path])
+
+    assert list(rows) == ["asr", "llm"]
+    assert rows["asr"]["count"] == 11
+    assert rows["asr"]["errors"] == 1
+    assert rows["asr"]["total_ms"] == 105.0
+    assert rows["asr"]["p50"] == 6.0
+    assert rows["asr"]["p99"] == 50.0
+    assert rows["llm"] == {"count": 1, "errors": 0, "total_ms": 7.0, "p50": 7.0, "p95": 7.0, "p99": 7.0}
+
+
+def test_report_tolerates_missing_and_non_string_names(tmp_path, capsys):
+    path = tmp_path / "a.trace.jsonl"
+    records = [{"name": "asr", "ms": 1.0}, {"ms": 2.0}, {"name": None, "ms": 3.0}, {"name": 7, "ms": 4.0}]
+    path.write_text("\n".join(json.dumps(record) for record in records), encoding="utf-8")
+
+    rows = tracing.report([path])
+
+    assert rows["<unnamed>"]["count"] == 2
+    assert rows["7"]["count"] == 1
+    assert tracing.main(["report", str(path)]) == 0
+    assert "<unnamed>" in capsys.readouterr().out
+
+
+def test_executor_stages_keep_the_parent_span(trace_file):
+    @tracing.traced("step")
+    def execute(step):
+        return "ok", True
+
+    async def scenario():
+        orchestrator = Orchestrator(plan=lambda text: [Command("open", {"target": text})], execute=execute)
+        with tracing.span("session") as session:
+            await orchestrator.start()
+        try:
+            await asyncio.wait_for(orchestrator.run_text("a"), 5)
+        finally:
+            await orchestrator.stop()
+        return session.id
+
+    session_id = asyncio.run(scenario())
+    steps = [record for record in _records(trace_file) if record["name"] == "step"]
+    assert [step["parent"] for step in steps] == [session_id]
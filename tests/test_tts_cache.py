@@ -0,0 +1,117 @@
+import os
+import threading
+
+import dekstop_ops
+import process_ops
+import tts
+from core import desktop
+from tts_cache import PhraseCache
+
+VOICE = "test-voice"
+
+
+class CountingSynth:
+    """Stand-in for edge-tts: fixed-size fake audio, counts calls per phrase."""
+
+    def __init__(self, size=100):
+        self.size = size
+        self.calls = []
+
+    def __call__(self, text, voice, rate):
+        self.calls.append(text)
+        return text.encode("utf-8").ljust(self.size, b"\0")[:self.size]
+
+
+def test_repeated_fixed_phrases_are_synthesized_once(tmp_path):
+    synth = CountingSynth()
+    cache = PhraseCache(tmp_path, max_bytes=10_000, synthesize=synth)
+    for _ in range(3):
+        for phrase in (dekstop_ops.OPENED, dekstop_ops.DELETED, process_ops.APP_NOT_RUNNING):
+            assert cache.get(phrase, VOICE).read_bytes().startswith(phrase.encode("utf-8")[:10])
+    assert synth.calls == [dekstop_ops.OPENED, dekstop_ops.DELETED, process_ops.APP_NOT_RUNNING]
+    assert cache.hits == 6
+
+
+def test_voice_and_rate_are_part_of_the_key(tmp_path):
+    synth = CountingSynth()
+    cache = PhraseCache(tmp_path, synthesize=synth)
+    cache.get(dekstop_ops.OPENED, VOICE)
+    cache.get(dekstop_ops.OPENED, "other-voice")
+    cache.get(dekstop_ops.OPENED, VOICE, "+10%")
+    assert len(synth.calls) == 3
+
+
+def test_prewarm_then_speak_needs_no_synthesis(tmp_path):
+    synth = CountingSynth(size=10)
+    cache = PhraseCache(tmp_path, max_bytes=10_000, synthesize=synth)
+    phrases = tts.known_responses()
+    assert cache.prewarm(phrases, VOICE) == len(phrases)
+    assert cache.prewarm(phrases, VOICE) == 0
+    synth.calls.clear()
+    for phrase in phrases:
+        cache.get(phrase, VOICE)
+    assert synth.calls == []
+
+
+def test_lru_eviction_drops_least_recently_used(tmp_path):
+    synth = CountingSynth(size=100)
+    cache = PhraseCache(tmp_path, max_bytes=250, synthesize=synth)
+    first = cache.get("first", VOICE)
+    cache.get("second", VOICE)
+    cache.get("first", VOICE)  # now "second" is the oldest
+    cache.get("third", VOICE)
+    assert len(cache) == 2
+    assert cache.total_bytes == 200
+    assert first.exists()
+    assert cache.lookup("second", VOICE) is None
+    synth.calls.clear()
+    cache.get("second", VOICE)
+    assert synth.calls == ["second"]
+
+
+def test_lru_order_survives_restart(tmp_path):
+    synth = CountingSynth(size=100)
+    cache = PhraseCache(tmp_path, max_bytes=250, synthesize=synth)
+    old = cache.get("old", VOICE)
+    new = cache.get("new", VOICE)
+    os.utime(old, (1_000, 1_000))
+    os.utime(new, (2_000, 2_000))
+    reopened = PhraseCache(tmp_path, max_bytes=250, synthesize=synth)
+    assert len(reopened) == 2
+    reopened.get("newest", VOICE)
+    assert reopened.lookup("old", VOICE) is None
+    assert reopened.lookup("new", VOICE) is not None
+
+
+def test_concurrent_stores_of_one_phrase(tmp_path):
+    cache = PhraseCache(tmp_path, max_bytes=10_000)
+    start = threading.Barrier(8)
+    errors = []
+
+    def store(index):
+        start.wait()
+        try:
+            for _ in range(50):
+                cache.store("phrase", VOICE, None, bytes([index]) * 100)
+        except Exception as exc:
+            errors.append(exc)
+
+    threads = [threading.Thread(target=store, args=(index,)) for index in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert errors == []
+    assert len(cache) == 1 and cache.total_bytes == 100
+    assert len(set(cache.lookup("phrase", VOICE).read_bytes())) == 1  # one writer's bytes, not a mix
+    assert list(tmp_path.glob("*.tmp")) == []
+
+
+def test_fixed_responses_are_the_returned_messages():
+    responses = set(tts.known_responses())
+    assert {desktop.NO_OPEN_TARGET, desktop.INVALID_COMMAND, dekstop_ops.NOT_FOUND,
+            dekstop_ops.DESKTOP_EMPTY, process_ops.APP_NOT_RUNNING} <= responses
+    assert len(responses) == len(tts.known_responses())
+    assert dekstop_ops.delete_item("") == desktop.NO_DELETE_TARGET
+    assert process_ops.close_app("") == desktop.NO_CLOSE_TARGET
@@ -0,0 +1,127 @@
+import asyncio
+import threading
+import time
+
+import pytest
+
+import tts
+
+
+def test_synthesis_and_playback_failures_are_logged(monkeypatch):
+    messages = []
+    logged_playback = threading.Event()
+
+    def log(message):
+        messages.append(message)
+        if "playback failed" in message:
+            logged_playback.set()
+
+    async def fetch(text, voice, rate):
+        if text.startswith("broken"):
+            raise ConnectionError("no network")
+        return text
+
+    def play(path, stop=None):
+        raise RuntimeError("no audio device")
+
+    monkeypatch.setattr(tts, "fetch_async", fetch)
+    monkeypatch.setattr(tts, "play_file", play)
+    monkeypatch.setattr(tts, "log", log)
+    worker = tts.SpeechWorker()
+    try:
+        worker.say("broken sentence. Fine sentence.")
+        assert logged_playback.wait(2)
+    finally:
+        worker.close()
+    assert any("synthesis failed" in m and "no network" in m for m in messages)
+    assert any("playback failed" in m and "no audio device" in m for m in messages)
+
+
+class FakeAudio:
+    """fetch_async/play_file stand-ins; playback of each sentence waits for `release`."""
+
+    def __init__(self, fetch_sec=0.0):
+        self.fetch_sec = fetch_sec
+        self.fetched = []
+        self.played = []
+        self.stopped = []
+        self.release = threading.Event()
+        self.changed = threading.Condition()
+
+    async def fetch(self, text, voice, rate):
+        await asyncio.sleep(self.fetch_sec)
+        with self.changed:
+            self.fetched.append(text)
+            self.changed.notify_all()
+        return text
+
+    def play(self, path, stop=None):
+        with self.changed:
+            self.played.append(path)
+            self.changed.notify_all()
+        while not self.release.wait(0.01):
+            if stop is not None and stop.is_set():
+                with self.changed:
+                    self.stopped.append(path)
+                    self.changed.notify_all()
+                return
+
+    def wait_for(self, condition):
+        with self.changed:
+            assert self.changed.wait_for(condition, timeout=2)
+
+
+@pytest.fixture
+def audio(monkeypatch):
+    fake = FakeAudio()
+    monkeypatch.setattr(tts, "fetch_async", fake.fetch)
+    monkeypatch.setattr(tts, "play_file", fake.play)
+    return fake
+
+
+def test_next_sentence_is_synthesized_while_one_plays(audio):
+    worker = tts.SpeechWorker()
+    try:
+        worker.say("one. two. three. four.")
+        audio.wait_for(lambda: audio.fetched == ["one.", "two.", "three."])
+        time.sleep(0.1)
+        # "one." is still playing: "two." is queued, "three." waits for the slot.
+        assert audio.played == ["one."]
+        assert audio.fetched == ["one.", "two.", "three."]
+        audio.release.set()
+        audio.wait_for(lambda: audio.played == ["one.", "two.", "three.", "four."])
+    finally:
+        worker.close()
+
+
+def test_cancel_stops_playback_and_drops_queued_sentences(audio):
+    worker = tts.SpeechWorker()
+    try:
+        worker.say("one. two. three. four.")
+        audio.wait_for(lambda: len(audio.fetched) == 3)
+        worker.cancel()
+        audio.wait_for(lambda: audio.stopped == ["one."])
+        worker.say("after.")
+        audio.wait_for(lambda: "after." in audio.played)
+        audio.release.set()
+    finally:
+        worker.close()
+    assert audio.played == ["one.", "after."]
+    assert "four." not in audio.fetched
+
+
+def test_time_to_first_audio_is_reported_once_per_utterance(monkeypatch):
+    audio = FakeAudio(fetch_sec=0.05)
+    audio.release.set()
+    monkeypatch.setattr(tts, "fetch_async", audio.fetch)
+    monkeypatch.setattr(tts, "play_file", audio.play)
+    reported = []
+    worker = tts.SpeechWorker(on_first_audio=reported.append)
+    try:
+        worker.say("one. two.")
+        audio.wait_for(lambda: audio.played == ["one.", "two."])
+    finally:
+        worker.close()
+    assert len(reported) == 1
+    assert reported[0] >= 50  # includes synthesis of the first sentence
+    assert worker.last_time_to_first_audio == reported[0]
@@ -0,0 +1,187 @@
+"""ui.app request paths on the offscreen platform, with fake stages and devices."""
+
+import sys
+import threading
+import time
+import types
+
+import pytest
+
+QtWidgets = pytest.importorskip("PyQt6.QtWidgets")
+
+from core.desktop import Command  # noqa: E402
+from orchestrator import OrchestratorThread  # noqa: E402
+from ui import app as ui_app  # noqa: E402
+from ui.workers import POLICY_PREEMPT, POLICY_QUEUE, AssistantTask, TaskRunner  # noqa: E402
+
+
+def wait_until(app, condition, timeout=3.0):
+    deadline = time.monotonic() + timeout
+    while not condition():
+        assert time.monotonic() < deadline, "timed out waiting for Qt signals"
+        app.processEvents()
+        time.sleep(0.005)
+
+
+class QuitRecorder:
+    def __init__(self):
+        self.quit_called = False
+
+    def quit(self):
+        self.quit_called = True
+
+
+@pytest.fixture
+def wired(qt_app, monkeypatch):
+    """Install RUNNER and an ORCHESTRATOR whose plan/execute are fakes."""
+    executed = []
+
+    def execute(step):
+        executed.append((step.args["target"], threading.current_thread().name))
+        return step.args["target"], True
+
+    orchestrator = OrchestratorThread(
+        plan=lambda text: [Command("open", {"target": name}) for name in text.split()],
+        execute=execute,
+    )
+    runner = TaskRunner(POLICY_QUEUE)
+    monkeypatch.setattr(ui_app, "RUNNER", runner)
+    monkeypatch.setattr(ui_app, "ORCHESTRATOR", orchestrator)
+    yield runner, executed
+    runner.cancel_all()
+    runner.wait(2000)
+    orchestrator.close()
+
+
+def test_on_submit_runs_text_through_the_orchestrator(qt_app, wired):
+    runner, executed = wired
+    window, field, label = QtWidgets.QWidget(), QtWidgets.QLineEdit(), QtWidgets.QLabel()
+    field.setText("a b")
+
+    ui_app.on_submit(QuitRecorder(), window, field, label)
+    wait_until(qt_app, lambda: label.text() == "a\nb")
+    assert [name for name, _thread in executed] == ["a", "b"]
+    wait_until(qt_app, lambda: not runner.busy)
+
+
+def test_on_submit_exit_quits_the_app(qt_app, wired, monkeypatch):
+    monkeypatch.setattr(ui_app.ORCHESTRATOR, "run_text", lambda text, cancel=None: "exit")
+    app, field, label = QuitRecorder(), QtWidgets.QLineEdit(), QtWidgets.QLabel()
+    field.setText("выход")
+    ui_app.on_submit(app, QtWidgets.QWidget(), field, label)
+    wait_until(qt_app, lambda: app.quit_called)
+
+
+class FakePushToTalk:
+    def __init__(self):
+        self.active = False
+
+    def start(self):
+        pass
+
+    def close(self):
+        pass
+
+
+class FakeTranscriber:
+    """StreamingTranscriber stand-in: the test decides what is recognized."""
+
+    instance = None
+
+    def __init__(self, ptt, on_partial=None):
+        self.ptt = ptt
+        self.on_partial = on_partial
+        self.final_text = ""
+        self.released_at = None
+        FakeTranscriber.instance = self
+
+    def begin(self):
+        self.ptt.active = True
+
+    def finish(self):
+        self.ptt.active = False
+        self.released_at = time.perf_counter()
+        return self.final_text
+
+
+def occupy(runner):
+    """Keep the runner's only thread busy until the returned event is set."""
+    started, release = threading.Event(), threading.Event()
+
+    def work(cancel, signals):
+        started.set()
+        release.wait(5)
+        return ""
+
+    runner.submit(AssistantTask(work, name="busy"))
+    assert started.wait(2)
+    return release
+
+
+@pytest.fixture
+def push_to_talk(qt_app, wired, monkeypatch):
+    import asr
+    import pipeline
+
+    hooks = {}
+    monkeypatch.setitem(sys.modules, "hotkey", types.SimpleNamespace(
+        register_push_to_talk=lambda key, on_press, on_release: hooks.update(press=on_press, release=on_release),
+    ))
+    monkeypatch.setattr(asr, "PushToTalk", FakePushToTalk)
+    monkeypatch.setattr(asr, "StreamingTranscriber", FakeTranscriber)
+    early = []
+
+    def execute(command):
+        early.append((command.args["target"], threading.current_thread().name))
+        return f"opened {command.args['target']}"
+
+    monkeypatch.setattr(pipeline, "execute", execute)
+    bridge = ui_app._VoiceBridge()
+    label = QtWidgets.QLabel()
+    bridge.partial.connect(label.setText)  # as init() wires it
+    app = QuitRecorder()
+    ui_app.start_push_to_talk("f9", bridge, app, label)
+    return hooks, FakeTranscriber.instance, early, label
+
+
+def test_early_clauses_wait_for_the_running_task(qt_app, wired, push_to_talk):
+    runner, executed = wired
+    hooks, transcriber, early, label = push_to_talk
+    release = occupy(runner)
+
+    hooks["press"]()
+    partial = threading.Thread(target=transcriber.on_partial, args=("открой альфа,", ""), name="transcriber")
+    partial.start()
+    partial.join()
+    wait_until(qt_app, lambda: label.text().startswith("Слушаю"))
+    time.sleep(0.1)
+    assert early == []  # queued behind "busy", not run on the transcriber thread
+
+    release.set()
+    wait_until(qt_app, lambda: early)
+    assert early[0][0] == "альфа" and early[0][1] != "transcriber"
+
+    transcriber.final_text = "открой альфа, потом открой бета гамма"
+    hooks["release"]()
+    wait_until(qt_app, lambda: "гамма" in label.text())
+    assert [name for name, _thread in early] == ["альфа"]
+    # The rest went through the orchestrator as one request.
+    assert [name for name, _thread in executed] == ["открой", "бета", "гамма"]
+    assert label.text() == "Распознано: открой альфа, потом открой бета гамма\nopened альфа\nоткрой\nбета\nгамма"
+
+
+def test_press_preempts_early_clauses_of_the_previous_utterance(qt_app, wired, push_to_talk):
+    runner, _executed = wired
+    hooks, transcriber, early, _label = push_to_talk
+    runner.policy = POLICY_PREEMPT
+    release = occupy(runner)
+
+    hooks["press"]()
+    transcriber.on_partial("открой альфа,", "")
+    qt_app.processEvents()
+    transcriber.ptt.active = False  # the key went up without a transcript
+    hooks["press"]()  # a new utterance cancels the queued clause
+    qt_app.processEvents()
+    release.set()
+    wait_until(qt_app, lambda: not runner.busy)
+    assert early == []
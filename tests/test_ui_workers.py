@@ -0,0 +1,152 @@
+"""TaskRunner on a headless Qt platform: signals and submit policies."""
+
+import os
+import threading
+import time
+
+import pytest
+
+os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")
+QtCore = pytest.importorskip("PyQt6.QtCore")
+
+from ui.workers import POLICY_PREEMPT, POLICY_QUEUE, AssistantTask, TaskRunner  # noqa: E402
+
+
+def wait_until(app, condition, timeout=3.0):
+    deadline = time.monotonic() + timeout
+    while not condition():
+        assert time.monotonic() < deadline, "timed out waiting for Qt signals"
+        app.processEvents(QtCore.QEventLoop.ProcessEventsFlag.AllEvents, 20)
+        time.sleep(0.005)
+
+
+def track(task, events):
+    task.signals.finished.connect(lambda result: events.append((task.name, "finished", result)))
+    task.signals.cancelled.connect(lambda: events.append((task.name, "cancelled", None)))
+    return task
+
+
+def blocking_task(name, started, release, events, log):
+    """Waits for `release` or cancellation, checking `cancel` like a plan loop."""
+
+    def work(cancel, signals):
+        log.append(("start", name))
+        started.set()
+        while not release.is_set():
+            if cancel.wait(0.01):
+                log.append(("stop", name))
+                return "partial"
+        log.append(("stop", name))
+        return f"{name} done"
+
+    return track(AssistantTask(work, name=name), events)
+
+
+def quick_task(name, events, log):
+    def work(cancel, signals):
+        log.append(("start", name))
+        signals.progress.emit(f"{name} progress")
+        log.append(("stop", name))
+        return f"{name} done"
+
+    return track(AssistantTask(work, name=name), events)
+
+
+def test_result_and_progress_signals(qt_app):
+    runner = TaskRunner(POLICY_QUEUE)
+    events, log, progress = [], [], []
+    task = quick_task("one", events, log)
+    task.signals.progress.connect(progress.append)
+    runner.submit(task)
+    wait_until(qt_app, lambda: events)
+    assert events == [("one", "finished", "one done")]
+    assert progress == ["one progress"]
+    wait_until(qt_app, lambda: not runner.busy)
+
+
+def test_error_is_reported_as_result(qt_app):
+    runner = TaskRunner(POLICY_QUEUE)
+    events = []
+
+    def work(cancel, signals):
+        raise RuntimeError("boom")
+
+    runner.submit(track(AssistantTask(work, name="bad"), events))
+    wait_until(qt_app, lambda: events)
+    assert events == [("bad", "finished", "Произошла ошибка")]
+
+
+def test_queue_policy_runs_tasks_in_order(qt_app):
+    runner = TaskRunner(POLICY_QUEUE)
+    events, log = [], []
+    started, release = threading.Event(), threading.Event()
+    runner.submit(blocking_task("first", started, release, events, log))
+    assert started.wait(2)
+    runner.submit(quick_task("second", events, log))
+    time.sleep(0.05)
+    assert ("start", "second") not in log
+    release.set()
+    wait_until(qt_app, lambda: len(events) == 2)
+    assert events == [("first", "finished", "first done"), ("second", "finished", "second done")]
+    assert log == [("start", "first"), ("stop", "first"), ("start", "second"), ("stop", "second")]
+
+
+def test_preempt_cancels_running_and_drops_queued(qt_app):
+    runner = TaskRunner(POLICY_QUEUE)
+    events, log = [], []
+    started, release = threading.Event(), threading.Event()
+    runner.submit(blocking_task("running", started, release, events, log))
+    assert started.wait(2)
+    runner.submit(quick_task("queued", events, log))
+    runner.policy = POLICY_PREEMPT
+    runner.submit(quick_task("new", events, log))
+    wait_until(qt_app, lambda: ("new", "finished", "new done") in events)
+    wait_until(qt_app, lambda: not runner.busy)
+    assert ("running", "cancelled", None) in events
+    assert ("queued", "cancelled", None) in events
+    assert ("start", "queued") not in log
+    # Cooperative: the new task starts only after the running one returned.
+    assert log.index(("stop", "running")) < log.index(("start", "new"))
+    release.set()
+
+
+def test_cancel_all_before_start(qt_app):
+    runner = TaskRunner(POLICY_QUEUE)
+    events, log = [], []
+    started, release = threading.Event(), threading.Event()
+    runner.submit(blocking_task("running", started, release, events, log))
+    assert started.wait(2)
+    runner.submit(quick_task("waiting", events, log))
+    runner.cancel_all()
+    wait_until(qt_app, lambda: not runner.busy)
+    assert ("running", "cancelled", None) in events
+    assert ("waiting", "cancelled", None) in events
+    assert ("start", "waiting") not in log
+    release.set()
+
+
+def test_unknown_policy_is_rejected(qt_app):
+    with pytest.raises(ValueError):
+        TaskRunner("fifo")
+
+
+def test_event_loop_stays_responsive_while_a_task_blocks(qt_app):
+    runner = TaskRunner(POLICY_QUEUE)
+    events, ticks = [], []
+    timer = QtCore.QTimer()
+    timer.setInterval(10)
+    timer.timeout.connect(lambda: ticks.append(time.perf_counter()))
+
+    def work(cancel, signals):
+        time.sleep(0.4)  # a recording or an LLM round-trip
+        return "slow done"
+
+    timer.start()
+    try:
+        runner.submit(track(AssistantTask(work, name="slow"), events))
+        wait_until(qt_app, lambda: events)
+    finally:
+        timer.stop()
+    assert events == [("slow", "finished", "slow done")]
+    assert len(ticks) >= 15
+    assert max(later - earlier for earlier, later in zip(ticks, ticks[1:])) < 0.1